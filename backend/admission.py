@@ -0,0 +1,292 @@
+"""
+모듈명: backend.admission
+설명: 채팅 스트림 입장 제어(동시 업스트림 스트림 제한 및 공정 대기열)
+
+주요 기능:
+- 전체 동시 업스트림 스트림 수 제한
+- 세션(작업+세션 ID)당 하나만 진행, 새 요청이 오면 기존 요청을 대체
+- 작업별 라운드 로빈 대기열로 공정하게 순서 배정, 대기 시간 상한
+- 입장할 수 없는 요청은 Retry-After와 함께 즉시 거절
+
+의존성:
+- 표준 라이브러리만 사용
+"""
+
+# 1. 표준 라이브러리
+import asyncio
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict
+
+# 3. 로컬 애플리케이션
+from backend.metrics import CHAT_ADMISSION, CHAT_QUEUE_DEPTH, CHAT_QUEUE_WAIT
+from backend.sse import sse_event
+
+# 0이면 제한 없음
+CHAT_MAX_STREAMS = int(os.getenv("CHAT_MAX_STREAMS", "16"))
+CHAT_QUEUE_MAX = int(os.getenv("CHAT_QUEUE_MAX", "64"))
+CHAT_QUEUE_WAIT_S = float(os.getenv("CHAT_QUEUE_WAIT_S", "5"))
+CHAT_RETRY_AFTER_S = int(os.getenv("CHAT_RETRY_AFTER_S", "2"))
+# 업스트림이 클라이언트 전송보다 앞서 읽어 둘 수 있는 프레임 수
+STREAM_BUFFER_FRAMES = 8
+
+# 프레임 큐 종료/대체 신호
+_END = object()
+_SUPERSEDED = object()
+
+
+class AdmissionRejected(Exception):
+    """입장 거절(대기열 초과/대기 시간 초과/새 요청으로 대체)"""
+
+    def __init__(self, reason: str, status_code: int = 429, retry_after: int | None = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class StreamTicket:
+    """입장 허가된(또는 대기 중인) 채팅 스트림 하나"""
+
+    def __init__(self, key: str, group: str):
+        self.key = key
+        self.group = group
+        self.holds_slot = False
+        self.superseded = asyncio.Event()
+        self.granted: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def release(self) -> None:
+        """
+        스트림 종료 시 슬롯을 반납하고 다음 대기 요청을 입장시킵니다.
+        """
+        global _running
+        if _active.get(self.key) is self:
+            del _active[self.key]
+        if self.holds_slot:
+            self.holds_slot = False
+            _running -= 1
+            _dispatch()
+
+
+# 세션 키 -> 진행 중 티켓
+_active: Dict[str, StreamTicket] = {}
+# 세션 키 -> 대기 중 티켓
+_queued: Dict[str, StreamTicket] = {}
+# 작업 ID -> 대기 티켓, 순서는 라운드 로빈 차례
+_groups: Dict[str, Deque[StreamTicket]] = {}
+_turns: Deque[str] = deque()
+_running = 0
+
+CHAT_QUEUE_DEPTH.set_function(lambda: len(_queued))
+
+
+def _has_capacity() -> bool:
+    """
+    전체 동시 스트림 한도에 여유가 있는지 확인합니다.
+    """
+    return CHAT_MAX_STREAMS <= 0 or _running < CHAT_MAX_STREAMS
+
+
+def _grant(ticket: StreamTicket) -> None:
+    """
+    티켓에 슬롯을 배정하고 진행 중으로 등록합니다.
+    """
+    global _running
+    _running += 1
+    ticket.holds_slot = True
+    _active[ticket.key] = ticket
+    if not ticket.granted.done():
+        ticket.granted.set_result(True)
+
+
+def _dequeue(ticket: StreamTicket) -> None:
+    """
+    대기열에서 티켓을 제거합니다.
+    """
+    if _queued.get(ticket.key) is ticket:
+        del _queued[ticket.key]
+    group = _groups.get(ticket.group)
+    if group is not None and ticket in group:
+        group.remove(ticket)
+        if not group:
+            del _groups[ticket.group]
+            _turns.remove(ticket.group)
+
+
+def _dispatch() -> None:
+    """
+    여유 슬롯만큼 작업별로 돌아가며 대기 요청을 입장시킵니다.
+    """
+    while _turns and _has_capacity():
+        group_id = _turns.popleft()
+        group = _groups[group_id]
+        ticket = group.popleft()
+        if group:
+            _turns.append(group_id)
+        else:
+            del _groups[group_id]
+        del _queued[ticket.key]
+        _grant(ticket)
+
+
+def _supersede(key: str) -> StreamTicket | None:
+    """
+    같은 세션의 기존 요청을 대체하고, 진행 중이던 티켓을 반환합니다.
+    """
+    waiting = _queued.get(key)
+    if waiting is not None:
+        _dequeue(waiting)
+        if not waiting.granted.done():
+            waiting.granted.set_exception(
+                AdmissionRejected("새 요청으로 대체되었습니다", status_code=409)
+            )
+        CHAT_ADMISSION.inc(1, "superseded")
+    running = _active.get(key)
+    if running is not None:
+        running.superseded.set()
+        CHAT_ADMISSION.inc(1, "superseded")
+    return running
+
+
+async def admit(session_id: str, job_id: str | None) -> StreamTicket:
+    """
+    채팅 스트림 입장을 요청합니다.
+
+    같은 세션의 진행 중 스트림은 중단 신호를 받고 슬롯을 새 요청에 넘겨줍니다.
+    슬롯이 없으면 작업별 라운드 로빈 대기열에서 최대 CHAT_QUEUE_WAIT_S초 기다립니다.
+
+    Args:
+        session_id: 세션 ID
+        job_id: 작업 ID(공정 분배 단위)
+
+    Returns:
+        StreamTicket: 입장 티켓(스트림 종료 시 release 필요)
+
+    Raises:
+        AdmissionRejected: 대기열이 가득 찼거나 대기 시간이 지났거나 새 요청으로 대체됐을 때
+    """
+    global _running
+    group_id = job_id or "global"
+    key = f"{group_id}:{session_id}"
+    ticket = StreamTicket(key, group_id)
+
+    previous = _supersede(key)
+    if previous is not None and previous.holds_slot:
+        # 기존 스트림의 슬롯을 그대로 넘겨받아 대기 없이 시작
+        previous.holds_slot = False
+        _running -= 1
+        _grant(ticket)
+        CHAT_ADMISSION.inc(1, "admitted")
+        return ticket
+
+    if _has_capacity() and not _turns:
+        _grant(ticket)
+        CHAT_ADMISSION.inc(1, "admitted")
+        return ticket
+
+    if len(_queued) >= CHAT_QUEUE_MAX:
+        CHAT_ADMISSION.inc(1, "rejected")
+        raise AdmissionRejected("요청이 많아 처리할 수 없습니다", retry_after=CHAT_RETRY_AFTER_S)
+
+    _queued[key] = ticket
+    if group_id not in _groups:
+        _groups[group_id] = deque()
+        _turns.append(group_id)
+    _groups[group_id].append(ticket)
+    CHAT_ADMISSION.inc(1, "queued")
+
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(asyncio.shield(ticket.granted), CHAT_QUEUE_WAIT_S)
+    except asyncio.TimeoutError:
+        # 취소되는 사이 입장이 허가됐으면 받은 슬롯을 반납
+        if ticket.granted.done() and not ticket.granted.exception():
+            ticket.release()
+        else:
+            _dequeue(ticket)
+        CHAT_ADMISSION.inc(1, "timeout")
+        raise AdmissionRejected(
+            "대기 시간이 초과되었습니다", retry_after=CHAT_RETRY_AFTER_S
+        ) from None
+    except asyncio.CancelledError:
+        # 대기 중 클라이언트가 끊긴 경우
+        if ticket.granted.done() and not ticket.granted.exception():
+            ticket.release()
+        else:
+            _dequeue(ticket)
+        raise
+    finally:
+        CHAT_QUEUE_WAIT.observe(time.perf_counter() - started)
+    CHAT_ADMISSION.inc(1, "admitted")
+    return ticket
+
+
+async def _pump(frames: AsyncIterator[str], queue: asyncio.Queue) -> None:
+    """
+    업스트림 프레임을 큐로 옮깁니다. 예외는 큐로 전달하고, 취소되면 남은 프레임을 버리고 대체 신호를 넣습니다.
+    """
+    try:
+        async for frame in frames:
+            await queue.put(frame)
+    except asyncio.CancelledError:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(_SUPERSEDED)
+        raise
+    except Exception as e:
+        await queue.put(e)
+        return
+    await queue.put(_END)
+
+
+async def guarded_stream(ticket: StreamTicket, frames: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    입장 티켓이 유효한 동안 SSE 프레임을 전달하고, 종료 시 슬롯을 반납합니다.
+
+    프레임은 스트림당 하나의 태스크가 큐로 옮기므로 프레임마다 태스크/대기 Future를 만들지 않습니다.
+    같은 세션의 새 요청으로 대체되면 업스트림 대기 중이라도 그 태스크를 취소해 즉시 중단하고
+    done/superseded 이벤트를 보냅니다.
+
+    Args:
+        ticket: 입장 티켓
+        frames: 채팅 SSE 프레임 비동기 이터레이터
+
+    Yields:
+        str: SSE 프레임
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_BUFFER_FRAMES)
+    pump = asyncio.ensure_future(_pump(frames, queue))
+    stop = asyncio.ensure_future(ticket.superseded.wait())
+    stop.add_done_callback(lambda _: pump.cancel())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            if item is _SUPERSEDED:
+                yield sse_event({"done": True, "superseded": True})
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.cancel()
+        if not pump.done():
+            # 클라이언트 연결 종료로 취소된 경우 진행 중인 업스트림 대기도 정리
+            pump.cancel()
+        await asyncio.gather(pump, return_exceptions=True)
+        await frames.aclose()
+        ticket.release()
+
+
+def release_ticket(ticket: StreamTicket) -> None:
+    """
+    응답 본문이 시작되지 않아 guarded_stream이 정리하지 못한 슬롯을 반납합니다.
+
+    응답 후 백그라운드 작업으로 호출하며, 이미 반납한 티켓이면 아무것도 하지 않습니다.
+
+    Args:
+        ticket: 입장 티켓
+    """
+    ticket.release()
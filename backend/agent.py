@@ -0,0 +1,382 @@
+"""
+모듈명: backend.agent
+설명: 선제 메시지(프로액티브) 에이전트 엔진
+
+주요 기능:
+- 세션별 무응답 시간과 페르소나 메시지 시각 패턴 기반 체크인 예약
+- 전송 예정 시각 전에 선제 메시지를 백그라운드에서 미리 생성
+- SSE 푸시 전달 및 폴링용 O(1) 보관함
+
+의존성:
+- 표준 라이브러리만 사용(메시지 생성은 backend.chat)
+"""
+
+# 1. 표준 라이브러리
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+# 3. 로컬 애플리케이션
+from backend.chat import append_agent_message, generate_proactive_message
+from backend.metrics import AGENT_MESSAGES, AGENT_SESSIONS
+from backend.sse import HEARTBEAT_FRAME, SSE_HEARTBEAT_S, sse_event
+
+logger = logging.getLogger(__name__)
+
+AGENT_IDLE_MIN_SECONDS = float(os.getenv("AGENT_IDLE_MIN_SECONDS", "300"))
+AGENT_IDLE_MAX_SECONDS = float(os.getenv("AGENT_IDLE_MAX_SECONDS", "3600"))
+AGENT_PREFETCH_SECONDS = float(os.getenv("AGENT_PREFETCH_SECONDS", "60"))
+AGENT_MAX_CHECKINS = int(os.getenv("AGENT_MAX_CHECKINS", "1"))
+# 최대 활동량 대비 이 비율 미만인 시간대에는 보내지 않음
+AGENT_QUIET_HOUR_RATIO = 0.05
+# 예약 힙이 이 크기를 넘고 무효 항목이 절반 이상이면 유효 항목만으로 다시 만듦
+SCHEDULE_COMPACT_MIN = 1024
+
+# 세션 ID -> 상태(context, version, last_activity, due, checkins, prepared, prepare_task)
+_sessions: Dict[str, Dict[str, Any]] = {}
+# 폴링용 전달 대기 메시지(세션 ID -> 메시지)
+_outbox: Dict[str, str] = {}
+# 세션 ID -> SSE 구독 큐 목록
+_subscribers: Dict[str, List[asyncio.Queue]] = {}
+# (예정 시각, 순번, 세션 ID, 세션 버전, 작업) 최소 힙, 버전이 바뀐 항목은 꺼낼 때 무시
+_schedule: List[Tuple[float, int, str, int, str]] = []
+_sequence = itertools.count()
+_versions = itertools.count(1)
+_tasks: set = set()
+_wakeup: asyncio.Event | None = None
+_engine_task: asyncio.Task | None = None
+
+AGENT_SESSIONS.set_function(lambda: len(_sessions))
+
+
+def compute_check_in_delay(timing_profile: Dict[str, Any] | None, now: float) -> float:
+    """
+    페르소나의 침묵 후 재개 간격과 활동 시간대를 반영해 체크인까지의 지연(초)을 계산합니다.
+
+    대화 기록의 시각은 서버 현지 시각과 같은 시간대로 간주합니다.
+
+    Args:
+        timing_profile: build_timing_profile 결과
+        now: 기준 시각(epoch 초)
+
+    Returns:
+        float: 체크인까지 지연(초)
+    """
+    profile = timing_profile or {}
+    gap = profile.get("reinitiate_gap_seconds") or AGENT_IDLE_MIN_SECONDS
+    delay = min(max(float(gap), AGENT_IDLE_MIN_SECONDS), AGENT_IDLE_MAX_SECONDS)
+
+    hours = profile.get("active_hours") or []
+    if len(hours) != 24 or not any(hours):
+        return delay
+    threshold = max(hours) * AGENT_QUIET_HOUR_RATIO
+    due = now + delay
+    for _ in range(24):
+        moment = datetime.fromtimestamp(due)
+        if hours[moment.hour] > threshold:
+            break
+        # 조용한 시간대면 다음 정시로 미룸
+        due = moment.replace(minute=0, second=0, microsecond=0).timestamp() + 3600
+    return due - now
+
+
+def _compact_schedule() -> None:
+    """
+    재예약/취소로 무효가 된 항목을 예약 힙에서 제거합니다.
+    """
+    _schedule[:] = [
+        entry for entry in _schedule if _current_state(entry[2], entry[3]) is not None
+    ]
+    heapq.heapify(_schedule)
+
+
+def _push(due: float, session_id: str, version: int, action: str) -> None:
+    """
+    예약 힙에 작업을 추가하고 엔진을 깨웁니다.
+    """
+    # 세션당 유효 항목은 최대 2개이므로 세션 수의 4배를 넘으면 무효 항목이 절반 이상
+    if len(_schedule) > SCHEDULE_COMPACT_MIN and len(_schedule) > 4 * len(_sessions):
+        _compact_schedule()
+    heapq.heappush(_schedule, (due, next(_sequence), session_id, version, action))
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+def _cancel_prepare(state: Dict[str, Any] | None) -> None:
+    """
+    진행 중인 선제 메시지 미리 생성(LLM 호출)을 취소합니다.
+    """
+    task = state.get("prepare_task") if state else None
+    if task is not None and not task.done():
+        task.cancel()
+
+
+def _schedule_check_in(session_id: str, state: Dict[str, Any], now: float) -> None:
+    """
+    세션의 다음 체크인(미리 생성 + 전달)을 예약합니다.
+    """
+    state["version"] = next(_versions)
+    state["prepared"] = None
+    state["prepare_task"] = None
+    state["due"] = now + compute_check_in_delay(state["context"].get("timing_profile"), now)
+    state["idle_seconds"] = state["due"] - state["last_activity"]
+    _push(max(state["due"] - AGENT_PREFETCH_SECONDS, now), session_id, state["version"], "prepare")
+    _push(state["due"], session_id, state["version"], "deliver")
+
+
+def _current_state(session_id: str, version: int) -> Dict[str, Any] | None:
+    """
+    예약 당시 버전과 같을 때만 세션 상태를 반환합니다.
+    """
+    state = _sessions.get(session_id)
+    if state is None or state["version"] != version:
+        return None
+    return state
+
+
+def touch_session(session_id: str, context: Dict[str, Any]) -> None:
+    """
+    사용자 활동을 기록하고 체크인을 다시 예약합니다(기존 예약과 미리 생성한 메시지는 폐기).
+
+    Args:
+        session_id: 세션 ID
+        context: 메시지 생성에 필요한 페르소나 정보(job_id, persona_report, speaker_name,
+            style_examples, dialog_examples, style_signature, timing_profile)
+    """
+    now = time.time()
+    state = {"context": context, "last_activity": now, "checkins": 0}
+    _cancel_prepare(_sessions.get(session_id))
+    _sessions[session_id] = state
+    _schedule_check_in(session_id, state, now)
+
+
+def cancel_session(session_id: str) -> None:
+    """
+    세션의 예약을 취소합니다.
+
+    Args:
+        session_id: 세션 ID
+    """
+    _cancel_prepare(_sessions.pop(session_id, None))
+
+
+def cancel_job_sessions(job_id: str) -> int:
+    """
+    작업에 연결된 모든 세션의 예약과 전달 대기 메시지를 취소합니다(작업 삭제 시).
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        int: 취소한 세션 수
+    """
+    session_ids = [
+        session_id for session_id, state in _sessions.items()
+        if state["context"].get("job_id") == job_id
+    ]
+    for session_id in session_ids:
+        _cancel_prepare(_sessions.pop(session_id, None))
+        _outbox.pop(session_id, None)
+    return len(session_ids)
+
+
+def cancel_all_sessions() -> None:
+    """
+    모든 세션의 예약과 전달 대기 메시지를 취소합니다.
+    """
+    for state in _sessions.values():
+        _cancel_prepare(state)
+    _sessions.clear()
+    _schedule.clear()
+    _outbox.clear()
+
+
+def _spawn(coro) -> None:
+    """
+    백그라운드 작업을 실행하고 완료 전까지 참조를 유지합니다.
+    """
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _prepare(session_id: str, version: int) -> None:
+    """
+    선제 메시지를 미리 생성해 세션 상태에 저장합니다.
+    """
+    state = _current_state(session_id, version)
+    if state is None:
+        return
+    context = state["context"]
+    message = await generate_proactive_message(
+        session_id,
+        context.get("job_id"),
+        context.get("persona_report"),
+        context.get("speaker_name"),
+        context.get("style_examples"),
+        context.get("dialog_examples"),
+        context.get("style_signature"),
+        state["idle_seconds"],
+    )
+    state = _current_state(session_id, version)
+    if state is None:
+        # 생성 중 사용자가 다시 말을 걸었으면 폐기
+        AGENT_MESSAGES.inc(1, "discarded")
+        return
+    state["prepared"] = message
+
+
+def _publish(session_id: str, message: str) -> None:
+    """
+    SSE 구독자에게 푸시하고, 구독자가 없으면 폴링 보관함에 저장합니다.
+    """
+    queues = _subscribers.get(session_id)
+    if queues:
+        for queue in queues:
+            queue.put_nowait(message)
+        AGENT_MESSAGES.inc(1, "push")
+        return
+    _outbox[session_id] = message
+    AGENT_MESSAGES.inc(1, "outbox")
+
+
+async def _deliver(session_id: str, version: int) -> None:
+    """
+    예정 시각에 선제 메시지를 전달하고 다음 체크인을 예약합니다.
+    """
+    state = _current_state(session_id, version)
+    if state is None:
+        return
+    if state["prepare_task"] is None:
+        state["prepare_task"] = asyncio.create_task(_prepare(session_id, version))
+    await state["prepare_task"]
+
+    state = _current_state(session_id, version)
+    if state is None:
+        return
+    message = state["prepared"]
+    if message:
+        append_agent_message(state["context"].get("job_id"), session_id, message)
+        _publish(session_id, message)
+    else:
+        AGENT_MESSAGES.inc(1, "failed")
+
+    state["checkins"] += 1
+    if state["checkins"] >= AGENT_MAX_CHECKINS:
+        _sessions.pop(session_id, None)
+        return
+    state["last_activity"] = time.time()
+    _schedule_check_in(session_id, state, state["last_activity"])
+
+
+async def _run_action(session_id: str, version: int, action: str) -> None:
+    """
+    예약된 작업을 실행하고 오류를 기록합니다.
+    """
+    try:
+        if action == "prepare":
+            state = _current_state(session_id, version)
+            if state is not None and state["prepare_task"] is None:
+                state["prepare_task"] = asyncio.current_task()
+                await _prepare(session_id, version)
+        else:
+            await _deliver(session_id, version)
+    except Exception as e:
+        logger.error("에이전트 작업 오류: %s (%s) - %s", session_id, action, str(e))
+
+
+async def _engine_loop() -> None:
+    """
+    예약 힙에서 시각이 된 작업을 꺼내 실행합니다.
+    """
+    while True:
+        _wakeup.clear()
+        now = time.time()
+        while _schedule and _schedule[0][0] <= now:
+            _, _, session_id, version, action = heapq.heappop(_schedule)
+            if _current_state(session_id, version) is not None:
+                _spawn(_run_action(session_id, version, action))
+        timeout = _schedule[0][0] - now if _schedule else None
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_agent_engine() -> None:
+    """
+    에이전트 엔진 루프를 시작합니다(이벤트 루프 안에서 호출).
+    """
+    global _wakeup, _engine_task
+    if _engine_task is not None:
+        return
+    _wakeup = asyncio.Event()
+    _engine_task = asyncio.create_task(_engine_loop())
+
+
+async def stop_agent_engine() -> None:
+    """
+    에이전트 엔진 루프와 진행 중인 작업을 종료합니다.
+    """
+    global _engine_task
+    tasks = [task for task in (_engine_task, *_tasks) if task is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _engine_task = None
+
+
+def get_agent_poll(session_id: str, enabled: bool) -> Dict[str, Any]:
+    """
+    전달 대기 중인 선제 메시지를 O(1)로 꺼내 반환합니다.
+
+    Args:
+        session_id: 세션 ID
+        enabled: 에이전트 활성화 여부
+
+    Returns:
+        dict: 폴링 결과
+    """
+    if not enabled:
+        return {"should_send": False}
+    message = _outbox.pop(session_id, None)
+    if message is None:
+        return {"should_send": False}
+    return {"should_send": True, "message": message}
+
+
+async def agent_event_stream(session_id: str) -> AsyncIterator[str]:
+    """
+    세션의 선제 메시지를 SSE로 푸시합니다. 유휴 시 하트비트를 보냅니다.
+
+    Args:
+        session_id: 세션 ID
+
+    Yields:
+        str: SSE 프레임
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    _subscribers.setdefault(session_id, []).append(queue)
+    try:
+        pending = _outbox.pop(session_id, None)
+        if pending:
+            yield sse_event({"message": pending})
+        heartbeat = SSE_HEARTBEAT_S if SSE_HEARTBEAT_S > 0 else None
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield HEARTBEAT_FRAME
+                continue
+            yield sse_event({"message": message})
+    finally:
+        queues = _subscribers.get(session_id, [])
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            _subscribers.pop(session_id, None)
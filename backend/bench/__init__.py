@@ -0,0 +1,11 @@
+"""
+모듈명: backend.bench
+설명: 마이크로벤치마크 패키지
+
+주요 기능:
+- 합성 카카오톡 내보내기 파일 생성
+- 파싱/추출/프롬프트 구성 벤치마크 및 기준선 비교
+
+의존성:
+- 패키지 단위 정의 파일
+"""
@@ -0,0 +1,280 @@
+"""
+모듈명: backend.bench.health_latency
+설명: 대용량 파싱 중 헬스 체크(/health) 응답 지연 측정
+
+주요 기능:
+- 기본: 이벤트 루프에서 /health와 같은 동기 핸들러 호출(스레드 풀 경유)을 일정 간격으로 보내고
+  유휴/프로세스 풀 파싱(run_cpu_bound)/루프 안 직접 파싱 구간별 p50/p99/최대 지연 비교
+- --url: 실행 중인 서버에 합성 파일을 업로드하고, 처리되는 동안 실제 /health 응답 지연 측정
+
+의존성:
+- 표준 라이브러리만 사용(합성 파일은 backend.bench.synthetic, 파싱은 backend.workers)
+
+사용 예:
+    python -m backend.bench.health_latency --messages 200000
+    python -m backend.bench.health_latency --messages 200000 --skip-inline
+    python -m backend.bench.health_latency --url http://127.0.0.1:8000 --messages 200000 --duration 10
+"""
+
+# 1. 표준 라이브러리
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# 3. 로컬 애플리케이션
+from backend.bench.synthetic import write_export
+from backend.workers import get_process_pool, parse_upload, run_cpu_bound, shutdown_process_pool
+
+
+def _health() -> Dict[str, bool]:
+    """
+    backend.main.health_check와 같은 동기 핸들러(FastAPI는 스레드 풀에서 실행)입니다.
+    """
+    return {"ok": True}
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    지연 표본(ms)의 개수/p50/p99/최대를 계산합니다.
+
+    Args:
+        samples: 요청별 지연(ms)
+
+    Returns:
+        Dict[str, float]: count, p50_ms, p99_ms, max_ms
+    """
+    if not samples:
+        return {"count": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    p99_index = min(len(ordered) - 1, int(len(ordered) * 0.99))
+    return {
+        "count": len(ordered),
+        "p50_ms": statistics.median(ordered),
+        "p99_ms": ordered[p99_index],
+        "max_ms": ordered[-1],
+    }
+
+
+async def _probe(stop: asyncio.Event, interval: float, samples: List[float]) -> None:
+    """
+    interval마다 헬스 체크 요청이 도착했다고 보고, 도착 시각부터 응답까지 지연을 기록합니다.
+
+    이벤트 루프가 막힌 동안 도착한 요청은 루프가 풀린 뒤 응답한 시각까지 기다린 것으로 셉니다.
+    """
+    next_at = time.perf_counter() + interval
+    while not stop.is_set():
+        await asyncio.sleep(max(next_at - time.perf_counter(), 0))
+        await asyncio.to_thread(_health)
+        finished = time.perf_counter()
+        while next_at <= finished:
+            samples.append((finished - next_at) * 1000)
+            next_at += interval
+
+
+async def _measure_phase(
+    work: Optional[Callable[[], Any]],
+    interval: float,
+    idle_seconds: float,
+) -> Dict[str, float]:
+    """
+    작업이 끝날 때까지(작업이 없으면 idle_seconds 동안) 헬스 체크 지연을 측정합니다.
+    """
+    stop = asyncio.Event()
+    samples: List[float] = []
+    probe = asyncio.create_task(_probe(stop, interval, samples))
+    # 측정 작업이 루프를 막기 전에 첫 요청 대기를 시작
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    if work is None:
+        await asyncio.sleep(idle_seconds)
+    else:
+        await work()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return {**summarize(samples), "work_ms": elapsed * 1000}
+
+
+async def measure_in_process(
+    file_path: str,
+    interval: float,
+    idle_seconds: float,
+    include_inline: bool,
+) -> Dict[str, Dict[str, float]]:
+    """
+    유휴/프로세스 풀 파싱/루프 안 직접 파싱 구간의 헬스 체크 지연을 측정합니다.
+
+    Args:
+        file_path: 파싱할 내보내기 파일
+        interval: 헬스 체크 요청 간격(초)
+        idle_seconds: 유휴 구간 길이(초)
+        include_inline: 루프 안 직접 파싱(프로세스 풀 도입 전 동작) 구간 포함 여부
+
+    Returns:
+        Dict[str, Dict[str, float]]: 구간 이름 -> 지연 요약과 작업 시간(work_ms)
+    """
+    # 워커 프로세스 기동(spawn) 시간은 서버 시작 비용이므로 측정 전에 미리 띄움
+    if get_process_pool() is not None:
+        await run_cpu_bound(summarize, [0.0])
+
+    async def pooled() -> None:
+        await run_cpu_bound(parse_upload, file_path)
+
+    async def inline() -> None:
+        parse_upload(file_path)
+
+    results = {"idle": await _measure_phase(None, interval, idle_seconds)}
+    results["pool"] = await _measure_phase(pooled, interval, idle_seconds)
+    if include_inline:
+        results["inline"] = await _measure_phase(inline, interval, idle_seconds)
+    return results
+
+
+def _upload(base_url: str, file_path: str) -> str:
+    """
+    /upload에 파일을 multipart로 올리고 작업 ID를 반환합니다.
+    """
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{Path(file_path).name}"\r\n'
+        "Content-Type: text/plain\r\n\r\n"
+    ).encode("utf-8") + Path(file_path).read_bytes() + f"\r\n--{boundary}--\r\n".encode("utf-8")
+    request = urllib.request.Request(
+        f"{base_url}/upload",
+        data=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return json.loads(response.read())["job_id"]
+
+
+def _job_status(base_url: str, job_id: str) -> Dict[str, Any]:
+    """
+    작업 상태를 조회합니다.
+    """
+    with urllib.request.urlopen(f"{base_url}/jobs/{job_id}", timeout=30) as response:
+        return json.loads(response.read())
+
+
+def measure_http(
+    base_url: str,
+    file_path: str,
+    interval: float,
+    idle_seconds: float,
+    duration: float,
+) -> Dict[str, Dict[str, float]]:
+    """
+    실행 중인 서버에서 유휴 구간과 업로드 처리 구간의 /health 응답 지연을 측정합니다.
+
+    업로드 후 작업이 화자 선택 단계(전체 파싱 완료 또는 오류)에 이르고 duration초가 지날 때까지
+    처리 구간으로 봅니다.
+
+    Args:
+        base_url: 서버 주소(예: http://127.0.0.1:8000)
+        file_path: 업로드할 내보내기 파일
+        interval: /health 요청 간격(초)
+        idle_seconds: 유휴 구간 길이(초)
+        duration: 처리 구간 최소 길이(초)
+
+    Returns:
+        Dict[str, Dict[str, float]]: idle/upload -> 지연 요약(오류 수 errors 포함)
+    """
+    def poll(stop: threading.Event, samples: List[float], errors: List[str]) -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(f"{base_url}/health", timeout=10) as response:
+                    response.read()
+                samples.append((time.perf_counter() - started) * 1000)
+            except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+                errors.append(str(e))
+            stop.wait(max(interval - (time.perf_counter() - started), 0))
+
+    def phase(run: Callable[[], None]) -> Dict[str, float]:
+        stop = threading.Event()
+        samples: List[float] = []
+        errors: List[str] = []
+        poller = threading.Thread(target=poll, args=(stop, samples, errors), daemon=True)
+        poller.start()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        poller.join()
+        return {**summarize(samples), "errors": len(errors), "work_ms": elapsed * 1000}
+
+    def process_upload() -> None:
+        started = time.perf_counter()
+        job_id = _upload(base_url, file_path)
+        while True:
+            job = _job_status(base_url, job_id)
+            parsed = job.get("status") == "error" or (
+                job.get("status") != "running" and not job.get("speakers_partial")
+                and job.get("speakers")
+            )
+            if parsed and time.perf_counter() - started >= duration:
+                return
+            time.sleep(interval)
+
+    return {
+        "idle": phase(lambda: time.sleep(idle_seconds)),
+        "upload": phase(process_upload),
+    }
+
+
+def main() -> None:
+    """
+    CLI 인자로 합성 파일을 만들고 구간별 헬스 체크 지연을 출력합니다.
+    """
+    parser = argparse.ArgumentParser(description="대용량 파싱 중 헬스 체크 지연 벤치마크")
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--dialect", choices=["bracket", "comma"], default="bracket")
+    parser.add_argument("--interval-ms", type=float, default=10.0)
+    parser.add_argument("--idle-seconds", type=float, default=1.0)
+    parser.add_argument("--skip-inline", action="store_true", help="루프 안 직접 파싱 구간 생략")
+    parser.add_argument("--url", help="실행 중인 서버 주소(지정 시 실제 /health 측정)")
+    parser.add_argument("--duration", type=float, default=10.0, help="--url 처리 구간 최소 길이(초)")
+    args = parser.parse_args()
+
+    interval = args.interval_ms / 1000
+    with tempfile.TemporaryDirectory() as workdir:
+        path = write_export(
+            Path(workdir) / "talk.txt",
+            message_count=args.messages,
+            speakers=4,
+            dialect=args.dialect,
+        )
+        if args.url:
+            results = measure_http(
+                args.url.rstrip("/"), str(path), interval, args.idle_seconds, args.duration
+            )
+        else:
+            try:
+                results = asyncio.run(
+                    measure_in_process(str(path), interval, args.idle_seconds, not args.skip_inline)
+                )
+            finally:
+                shutdown_process_pool()
+
+    for name, result in results.items():
+        extra = f" errors={result['errors']}" if "errors" in result else ""
+        print(
+            f"{name:<8} n={result['count']:<5} p50={result['p50_ms']:8.2f}ms "
+            f"p99={result['p99_ms']:8.2f}ms max={result['max_ms']:8.2f}ms "
+            f"work={result['work_ms']:8.1f}ms{extra}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+모듈명: backend.bench.run
+설명: 파싱/추출/프롬프트 구성 마이크로벤치마크 실행기
+
+주요 기능:
+- parse_kakao_talk/scan_speakers(형식/인코딩별), backend.chat 추출기, build_persona_prompt, 청크 분할 측정
+- 기준선(JSON) 저장 및 회귀 임계값 비교(초과 시 종료 코드 1)
+- CI(환경 변수 CI 설정 시) 또는 --require-baseline이면 기준선이 없거나 크기가 다를 때 종료 코드 2
+
+의존성:
+- 표준 라이브러리만 사용(backend.chat 의존성은 requirements.txt 기준)
+
+사용 예:
+    python -m backend.bench.run --update-baseline
+    python -m backend.bench.run --threshold 0.2
+"""
+
+# 1. 표준 라이브러리
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+# 2. 로컬 애플리케이션
+from backend.bench.synthetic import write_export
+from backend.parser import parse_kakao_talk, scan_speakers
+
+DEFAULT_BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> List[float]:
+    """
+    함수를 반복 실행해 실행 시간 목록(초)을 반환합니다.
+    """
+    func()  # 워밍업
+    timings: List[float] = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return timings
+
+
+def build_cases(size: int, workdir: Path) -> List[Tuple[str, Callable[[], Any], int]]:
+    """
+    벤치마크 케이스 목록을 구성합니다.
+
+    Args:
+        size: 합성 메시지 수
+        workdir: 합성 파일 저장 디렉터리
+
+    Returns:
+        List[Tuple[str, Callable, int]]: (이름, 실행 함수, 처리 단위 수)
+    """
+    from backend.chat import (
+        build_memory_chunks,
+        build_style_signature,
+        count_keyword_stats,
+        extract_common_phrases,
+        extract_dialog_examples,
+        extract_local_keywords,
+        extract_style_examples,
+        select_representative_messages,
+    )
+    from backend.prompts import build_persona_prompt
+
+    cases: List[Tuple[str, Callable[[], Any], int]] = []
+    for dialect in ("bracket", "comma"):
+        for encoding in ("utf-8", "cp949"):
+            path = write_export(
+                workdir / f"{dialect}_{encoding}.txt",
+                encoding=encoding,
+                message_count=size,
+                speakers=4,
+                multiline_ratio=0.05,
+                dialect=dialect,
+            )
+            line_count = path.read_bytes().count(b"\n")
+            cases.append((
+                f"parse[{dialect},{encoding}]",
+                lambda p=str(path): parse_kakao_talk(p),
+                line_count,
+            ))
+            cases.append((
+                f"scan[{dialect},{encoding}]",
+                lambda p=str(path): scan_speakers(p),
+                line_count,
+            ))
+
+    messages = parse_kakao_talk(str(workdir / "bracket_utf-8.txt"))
+    speaker = messages[0]["speaker"]
+    target = [m for m in messages if m.get("speaker") == speaker]
+    stats = count_keyword_stats(target)
+    signature = build_style_signature(target)
+    style_examples = extract_style_examples(target, 5)
+    dialog_examples = extract_dialog_examples(messages, speaker, 3)
+    profile = {
+        "nickname_rules": ["이름 끝 글자"],
+        "speech_style": {
+            "endings": ["~ㅋㅋ", "~지"],
+            "honorific_level": "informal",
+            "emoji_usage": "low",
+            "punctuation": "short",
+        },
+        "favorite_topics": extract_local_keywords(target, 8, stats),
+        "taboo_topics": [],
+        "response_length": "short",
+        "typical_patterns": extract_common_phrases(target, 10),
+        "few_shot_examples": dialog_examples,
+    }
+
+    count = len(target)
+    cases.extend([
+        ("extract_style_examples", lambda: extract_style_examples(target, 5), count),
+        ("extract_dialog_examples", lambda: extract_dialog_examples(messages, speaker, 3), len(messages)),
+        ("build_style_signature", lambda: build_style_signature(target), count),
+        ("count_keyword_stats", lambda: count_keyword_stats(target), count),
+        ("extract_local_keywords", lambda: extract_local_keywords(target, 8), count),
+        ("extract_common_phrases", lambda: extract_common_phrases(target, 10), count),
+        (
+            "select_representative_messages",
+            lambda: select_representative_messages(messages, speaker, stats=stats),
+            len(messages),
+        ),
+        ("build_memory_chunks", lambda: build_memory_chunks(target), count),
+        (
+            "build_persona_prompt",
+            lambda: build_persona_prompt(
+                "요약", profile, speaker, style_examples, dialog_examples, signature
+            ),
+            1,
+        ),
+    ])
+    return cases
+
+
+def run_benchmarks(
+    size: int,
+    repeat: int,
+    only: str | None = None,
+) -> Dict[str, Dict[str, float]]:
+    """
+    벤치마크를 실행하고 케이스별 결과를 반환합니다.
+
+    Args:
+        size: 합성 메시지 수
+        repeat: 반복 횟수
+        only: 이름에 포함된 문자열로 케이스 필터링
+
+    Returns:
+        Dict[str, Dict[str, float]]: 케이스별 중앙값/최솟값(ms)과 초당 처리량
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory(prefix="lasttalk_bench_") as tmp:
+        for name, func, units in build_cases(size, Path(tmp)):
+            if only and only not in name:
+                continue
+            timings = _measure(func, repeat)
+            median = statistics.median(timings)
+            results[name] = {
+                "median_ms": round(median * 1000, 3),
+                "min_ms": round(min(timings) * 1000, 3),
+                "units_per_s": round(units / median, 1) if median else 0.0,
+            }
+    return results
+
+
+def compare_with_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Any],
+    threshold: float,
+) -> List[str]:
+    """
+    기준선 대비 회귀한 케이스 목록을 반환합니다.
+
+    Args:
+        results: 현재 측정 결과
+        baseline: 저장된 기준선
+        threshold: 허용 증가율(0.2 = 20%)
+
+    Returns:
+        List[str]: 회귀 메시지 목록
+    """
+    regressions: List[str] = []
+    cases = baseline.get("cases", {})
+    for name, result in results.items():
+        base = cases.get(name)
+        if not base or not base.get("median_ms"):
+            continue
+        ratio = result["median_ms"] / base["median_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {base['median_ms']}ms → {result['median_ms']}ms (x{ratio:.2f})"
+            )
+    return regressions
+
+
+def main() -> None:
+    """
+    CLI 인자로 벤치마크를 실행하고 기준선과 비교합니다.
+    """
+    parser = argparse.ArgumentParser(description="LastTalk 핫패스 마이크로벤치마크")
+    parser.add_argument("--size", type=int, default=20000, help="합성 메시지 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default=None, help="이름에 포함된 케이스만 실행")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE_PATH))
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용 증가율")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--require-baseline",
+        action="store_true",
+        default=os.getenv("CI", "").lower() not in {"", "0", "false"},
+        help="기준선이 없거나 크기가 다르면 실패(CI 환경 변수가 있으면 기본 적용)",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.size, args.repeat, args.only)
+    for name, result in results.items():
+        print(
+            f"{name:<34} median={result['median_ms']:>10.3f}ms "
+            f"min={result['min_ms']:>10.3f}ms {result['units_per_s']:>14.1f}/s"
+        )
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline = {"size": args.size, "cases": results}
+        if baseline_path.exists() and args.only:
+            # 일부 케이스만 실행한 경우 기존 기준선과 병합
+            stored = json.loads(baseline_path.read_text(encoding="utf-8"))
+            stored.get("cases", {}).update(results)
+            baseline = {"size": args.size, "cases": stored.get("cases", results)}
+        baseline_path.write_text(
+            json.dumps(baseline, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+        )
+        print(f"기준선 저장: {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"기준선이 없습니다. --update-baseline으로 먼저 생성하세요: {baseline_path}")
+        if args.require_baseline:
+            sys.exit(2)
+        return
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if baseline.get("size") != args.size:
+        print(f"기준선 크기({baseline.get('size')})와 현재 크기({args.size})가 달라 비교를 건너뜁니다.")
+        if args.require_baseline:
+            sys.exit(2)
+        return
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    if regressions:
+        print("성능 회귀 감지:")
+        for line in regressions:
+            print(f"- {line}")
+        sys.exit(1)
+    print(f"회귀 없음(임계값 {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+모듈명: backend.bench.sse_stream
+설명: SSE 델타 병합(coalescing) 전후 프레임 수/CPU 비교 벤치마크
+
+주요 기능:
+- 초당 토큰 수를 맞춘 가짜 업스트림 델타 스트림 생성
+- 병합 설정별 동시 스트림 실행 후 스트림당 프레임 수/전송 바이트/CPU 시간 측정
+- 프레임마다 실제 소켓 쓰기(drain)를 수행해 전송 비용 반영
+
+의존성:
+- 표준 라이브러리만 사용
+
+사용 예:
+    python -m backend.bench.sse_stream --streams 50 --tokens 300 --tokens-per-second 200
+    python -m backend.bench.sse_stream --window-ms 50 --max-bytes 1024
+"""
+
+# 1. 표준 라이브러리
+import argparse
+import asyncio
+import socket
+import time
+from typing import AsyncIterator, Dict, List, Tuple
+
+# 2. 로컬 애플리케이션
+from backend.sse import HEARTBEAT_FRAME, coalesce_deltas, sse_event
+
+DELTA_TEXT = "아 진짜? ㅋㅋ 나도 오늘 그거 생각하고 있었는데 이따 저녁에 얘기하자 "
+
+
+async def _fake_deltas(tokens: int, tokens_per_second: float) -> AsyncIterator[str]:
+    """
+    음절 단위 델타를 일정한 간격으로 내보냅니다.
+    """
+    interval = 1.0 / tokens_per_second if tokens_per_second > 0 else 0.0
+    for index in range(tokens):
+        if index:
+            await asyncio.sleep(interval)
+        yield DELTA_TEXT[index % len(DELTA_TEXT)]
+
+
+async def _drain_socket(reader: asyncio.StreamReader) -> None:
+    """
+    수신 측에서 EOF까지 데이터를 읽어 버립니다.
+    """
+    while await reader.read(65536):
+        pass
+
+
+async def _run_stream(
+    tokens: int,
+    tokens_per_second: float,
+    window_ms: float,
+    max_bytes: int,
+) -> Tuple[int, int]:
+    """
+    스트림 하나를 소켓으로 끝까지 전송하고 (프레임 수, 전송 바이트)를 반환합니다.
+    """
+    send_sock, recv_sock = socket.socketpair()
+    reader, recv_writer = await asyncio.open_connection(sock=recv_sock)
+    _, writer = await asyncio.open_connection(sock=send_sock)
+    drain_task = asyncio.create_task(_drain_socket(reader))
+    frames = 0
+    sent = 0
+    try:
+        async for text in coalesce_deltas(
+            _fake_deltas(tokens, tokens_per_second), window_ms, max_bytes, 0
+        ):
+            frame = HEARTBEAT_FRAME if text is None else sse_event({"text": text})
+            payload = frame.encode("utf-8")
+            writer.write(payload)
+            await writer.drain()
+            frames += 1
+            sent += len(payload)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+        await drain_task
+        recv_writer.close()
+    return frames, sent
+
+
+async def measure(
+    streams: int,
+    tokens: int,
+    tokens_per_second: float,
+    window_ms: float,
+    max_bytes: int,
+) -> Dict[str, float]:
+    """
+    동시 스트림을 실행하고 스트림당 평균 지표를 반환합니다.
+
+    Args:
+        streams: 동시 스트림 수
+        tokens: 스트림당 델타 수
+        tokens_per_second: 스트림당 초당 델타 수
+        window_ms: 병합 시간 창(ms, 0이면 델타마다 프레임)
+        max_bytes: 병합 최대 바이트
+
+    Returns:
+        Dict[str, float]: 스트림당 프레임 수/바이트/CPU 시간(ms)과 전체 소요 시간(s)
+    """
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    results = await asyncio.gather(*[
+        _run_stream(tokens, tokens_per_second, window_ms, max_bytes)
+        for _ in range(streams)
+    ])
+    cpu = time.process_time() - cpu_started
+    wall = time.perf_counter() - wall_started
+    return {
+        "frames_per_stream": sum(r[0] for r in results) / streams,
+        "bytes_per_stream": sum(r[1] for r in results) / streams,
+        "cpu_ms_per_stream": round(cpu * 1000 / streams, 3),
+        "wall_s": round(wall, 3),
+    }
+
+
+def main() -> None:
+    """
+    CLI 인자로 병합 비활성/활성 설정을 비교합니다.
+    """
+    parser = argparse.ArgumentParser(description="SSE 델타 병합 벤치마크")
+    parser.add_argument("--streams", type=int, default=50)
+    parser.add_argument("--tokens", type=int, default=300)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--window-ms", type=float, default=30.0)
+    parser.add_argument("--max-bytes", type=int, default=512)
+    args = parser.parse_args()
+
+    configs: List[Tuple[str, float, int]] = [
+        ("off(window=0)", 0.0, 0),
+        (f"window={args.window_ms:g}ms,bytes={args.max_bytes}", args.window_ms, args.max_bytes),
+    ]
+    for name, window_ms, max_bytes in configs:
+        result = asyncio.run(
+            measure(args.streams, args.tokens, args.tokens_per_second, window_ms, max_bytes)
+        )
+        print(
+            f"{name:<28} frames/stream={result['frames_per_stream']:>8.1f} "
+            f"bytes/stream={result['bytes_per_stream']:>9.1f} "
+            f"cpu/stream={result['cpu_ms_per_stream']:>8.3f}ms wall={result['wall_s']:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+모듈명: backend.bench.startup
+설명: 콜드 스타트(임포트 시간/헬스 체크 응답까지 시간) 벤치마크
+
+주요 기능:
+- 새 인터프리터에서 모듈 임포트 시간 측정(-X importtime 누적 시간, 반복 중앙값)
+- 누적 임포트 시간이 큰 상위 모듈 목록 출력
+- --serve: uvicorn 프로세스를 띄워 /health(liveness)와 /health/ready(readiness) 응답까지 시간 측정
+
+의존성:
+- 표준 라이브러리만 사용(--serve는 uvicorn 필요)
+
+사용 예:
+    python -m backend.bench.startup --repeat 5
+    python -m backend.bench.startup --module backend.chat --top 15
+    python -m backend.bench.startup --serve --port 8765
+"""
+
+# 1. 표준 라이브러리
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Tuple
+
+POLL_INTERVAL_S = 0.02
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[int, int, str]]:
+    """
+    -X importtime 출력에서 (중첩 깊이, 누적 시간(us), 모듈 이름) 목록을 추출합니다.
+    """
+    rows: List[Tuple[int, int, str]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, int(cumulative), name.strip()))
+    return rows
+
+
+def measure_import(module: str) -> Dict[str, object]:
+    """
+    새 인터프리터에서 모듈을 한 번 임포트하고 시간을 측정합니다.
+
+    Args:
+        module: 임포트할 모듈 이름
+
+    Returns:
+        Dict[str, object]: wall_ms(프로세스 전체), import_ms(대상 모듈 누적), rows(importtime 행)
+
+    Raises:
+        RuntimeError: 임포트가 실패했을 때
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    rows = _parse_importtime(result.stderr)
+    import_us = next((us for _, us, name in reversed(rows) if name == module), 0)
+    return {"wall_ms": wall_ms, "import_ms": import_us / 1000, "rows": rows}
+
+
+def _wait_for(url: str, deadline: float, process: subprocess.Popen) -> float | None:
+    """
+    URL이 200을 반환할 때까지 폴링하고 도달 시각을 반환합니다.
+    """
+    while time.perf_counter() < deadline and process.poll() is None:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(POLL_INTERVAL_S)
+    return None
+
+
+def measure_serve(port: int, timeout: float) -> Dict[str, float | None]:
+    """
+    uvicorn으로 앱을 띄우고 liveness/readiness 응답까지 시간을 측정합니다.
+
+    Args:
+        port: 서버 포트
+        timeout: 최대 대기 시간(초)
+
+    Returns:
+        Dict[str, float | None]: live_ms, ready_ms(시간 초과 시 None)
+    """
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "backend.main:app",
+            "--port", str(port), "--log-level", "warning",
+        ],
+    )
+    try:
+        deadline = started + timeout
+        live = _wait_for(f"{base}/health", deadline, process)
+        ready = _wait_for(f"{base}/health/ready", deadline, process)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return {
+        "live_ms": None if live is None else (live - started) * 1000,
+        "ready_ms": None if ready is None else (ready - started) * 1000,
+    }
+
+
+def main() -> None:
+    """
+    CLI 인자로 임포트 시간과(선택) 헬스 체크 응답 시간을 측정합니다.
+    """
+    parser = argparse.ArgumentParser(description="콜드 스타트 벤치마크")
+    parser.add_argument("--module", default="backend.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(args.repeat)]
+    wall = statistics.median(run["wall_ms"] for run in runs)
+    imported = statistics.median(run["import_ms"] for run in runs)
+    print(
+        f"{args.module}: import={imported:.1f}ms "
+        f"process(wall)={wall:.1f}ms (median of {args.repeat})"
+    )
+
+    # 마지막 실행 기준, 누적 시간이 큰 상위 두 단계 모듈(대상 모듈 제외)
+    top_level = sorted(
+        (
+            (us, name)
+            for depth, us, name in runs[-1]["rows"]
+            if depth <= 1 and name != args.module
+        ),
+        reverse=True,
+    )[:args.top]
+    for us, name in top_level:
+        print(f"  {us / 1000:>9.1f}ms  {name}")
+
+    if args.serve:
+        result = measure_serve(args.port, args.timeout)
+        live = "timeout" if result["live_ms"] is None else f"{result['live_ms']:.1f}ms"
+        ready = "timeout" if result["ready_ms"] is None else f"{result['ready_ms']:.1f}ms"
+        print(f"uvicorn: /health={live} /health/ready={ready}")
+
+
+if __name__ == "__main__":
+    main()
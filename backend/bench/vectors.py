@@ -0,0 +1,173 @@
+"""
+모듈명: backend.bench.vectors
+설명: 양자화 벡터 저장소(int8/float16)와 float32 정확 검색 비교 벤치마크
+
+주요 기능:
+- 군집 구조를 가진 합성 단위 벡터(대화 청크 임베딩 근사)와 잡음 섞인 질의 생성
+- float32 전수 검색을 정답으로 recall@k 비교(int8 재점수 없음/있음, float16)
+- 벡터당 메모리(검색 중 상주)/디스크 바이트(저장소가 실제로 쓰는 배열 기준)와 질의 지연 측정
+
+의존성:
+- numpy
+
+사용 예:
+    python -m backend.bench.vectors --vectors 50000 --dim 768 --queries 200
+    python -m backend.bench.vectors --k 3 --rescore 12 --rescore 48
+"""
+
+# 1. 표준 라이브러리
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+# 2. 서드파티 라이브러리
+import numpy as np
+
+# 3. 로컬 애플리케이션
+from backend.quantized_store import encode_vectors, search_codes
+
+
+def make_corpus(
+    vectors: int,
+    dim: int,
+    queries: int,
+    seed: int,
+) -> Tuple[Any, Any]:
+    """
+    군집 중심 주변에 흩어진 단위 벡터와, 무작위 벡터에 잡음을 섞은 질의를 만듭니다.
+
+    Args:
+        vectors: 저장할 벡터 수
+        dim: 차원
+        queries: 질의 수
+        seed: 난수 시드
+
+    Returns:
+        Tuple: (vectors, dim) 코퍼스, (queries, dim) 질의(float32)
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(vectors // 50, 1), dim)).astype(np.float32)
+    labels = rng.integers(0, len(centers), vectors)
+    corpus = centers[labels] + 0.6 * rng.standard_normal((vectors, dim)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    picked = corpus[rng.integers(0, vectors, queries)]
+    query = picked + 0.05 * rng.standard_normal((queries, dim)).astype(np.float32)
+    query /= np.linalg.norm(query, axis=1, keepdims=True)
+    return corpus, query
+
+
+def _exact_top(corpus: Any, norms: Any, query: Any, k: int) -> Set[int]:
+    """
+    float32 전수 검색으로 제곱 L2 거리 상위 k개 행 번호를 구합니다.
+    """
+    distances = norms - 2 * (corpus @ query)
+    return set(np.argpartition(distances, k - 1)[:k].tolist())
+
+
+def _disk_bytes(arrays: Dict[str, Any]) -> int:
+    """
+    배열을 .npy로 저장했을 때 크기 합계를 구합니다.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        total = 0
+        for name, array in arrays.items():
+            path = Path(directory) / f"{name}.npy"
+            np.save(path, array)
+            total += path.stat().st_size
+    return total
+
+
+def measure(
+    corpus: Any,
+    queries: Any,
+    k: int,
+    rescore_options: List[int],
+) -> List[Dict[str, Any]]:
+    """
+    저장 방식별 recall@k, 벡터당 바이트, 질의 지연을 측정합니다.
+
+    Args:
+        corpus: (n, dim) float32 코퍼스
+        queries: (q, dim) float32 질의
+        k: 상위 개수
+        rescore_options: int8 재점수 후보 수 목록(0이면 재점수 없음)
+
+    Returns:
+        List[Dict[str, Any]]: 방식별 결과(name, recall, ram_bytes, disk_bytes, query_ms)
+    """
+    count = len(corpus)
+    norms = np.einsum("ij,ij->i", corpus, corpus)
+    truth = [_exact_top(corpus, norms, query, k) for query in queries]
+
+    results: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    for query in queries:
+        _exact_top(corpus, norms, query, k)
+    results.append({
+        "name": "float32(exact)",
+        "recall": 1.0,
+        "ram_bytes": corpus.nbytes / count,
+        "disk_bytes": _disk_bytes({"vectors": corpus}) / count,
+        "query_ms": (time.perf_counter() - started) * 1000 / len(queries),
+    })
+
+    configs: List[Tuple[str, str, int]] = [("float16", "float16", 0)]
+    configs += [
+        (f"int8(rescore={option})" if option else "int8(no rescore)", "int8", option)
+        for option in rescore_options
+    ]
+    # 재점수 없는 int8은 MEMORY_VECTOR_RESCORE=0 저장소와 같이 float16 사본을 만들지 않음
+    encoded = {
+        "float16": encode_vectors(corpus, "float16"),
+        "int8": encode_vectors(corpus, "int8"),
+        "int8+rescore": encode_vectors(corpus, "int8", rescore=True),
+    }
+    for name, codec, option in configs:
+        arrays = encoded["int8+rescore" if codec == "int8" and option else codec]
+        hits = 0
+        latencies: List[float] = []
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            rows, _ = search_codes(arrays, codec, query, k, option)
+            latencies.append(time.perf_counter() - started)
+            hits += len(expected & set(rows))
+        # 재점수용 float16 사본은 mmap으로 후보 행만 읽으므로 상주 메모리에서 제외
+        resident = sum(array.nbytes for key, array in arrays.items() if key != "rescore")
+        results.append({
+            "name": name,
+            "recall": hits / (k * len(queries)),
+            "ram_bytes": resident / count,
+            "disk_bytes": _disk_bytes(arrays) / count,
+            "query_ms": statistics.mean(latencies) * 1000,
+        })
+    return results
+
+
+def main() -> None:
+    """
+    CLI 인자로 코퍼스를 만들고 저장 방식별 결과를 출력합니다.
+    """
+    parser = argparse.ArgumentParser(description="양자화 벡터 저장소 벤치마크")
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=12)
+    parser.add_argument("--rescore", type=int, action="append", help="int8 재점수 후보 수(반복 지정)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus, queries = make_corpus(args.vectors, args.dim, args.queries, args.seed)
+    rescore_options = args.rescore or [0, max(args.k * 4, 32)]
+    for result in measure(corpus, queries, args.k, rescore_options):
+        print(
+            f"{result['name']:<22} recall@{args.k}={result['recall']:.4f} "
+            f"ram/vec={result['ram_bytes']:>7.1f}B disk/vec={result['disk_bytes']:>7.1f}B "
+            f"query={result['query_ms']:.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
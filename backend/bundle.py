@@ -0,0 +1,156 @@
+"""
+모듈명: backend.bundle
+설명: 페르소나 번들(이식 가능한 단일 바이너리 파일) 직렬화
+
+주요 기능:
+- 채팅에 필요한 페르소나 상태(리포트, 예시, 컴파일된 프롬프트)와 메모리 청크/임베딩 행렬 인코딩
+- 매직 바이트/포맷 버전/헤더 구조 검증 후 디코딩(압축 해제 크기 상한으로 압축 폭탄 차단)
+- 임베딩 행렬은 float32 리틀 엔디언 연속 배열로 저장하고 전체를 zlib 압축
+
+의존성:
+- 표준 라이브러리만 사용
+
+파일 형식:
+    MAGIC(4바이트) + 버전(uint16) + zlib(헤더 길이(uint32) + 헤더 JSON + 임베딩 행렬)
+"""
+
+# 1. 표준 라이브러리
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+BUNDLE_MAGIC = b"LTPB"
+BUNDLE_VERSION = 1
+BUNDLE_MEDIA_TYPE = "application/x-lasttalk-bundle"
+# 임베딩 행렬은 거의 압축되지 않으므로 빠른 압축 수준 사용
+BUNDLE_COMPRESS_LEVEL = 1
+# 압축 해제한 번들 본문 최대 크기(작은 업로드가 수 GB로 풀리는 것 방지)
+BUNDLE_MAX_BYTES = int(os.getenv("BUNDLE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+_PREFIX = struct.Struct("<4sH")
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+def encode_bundle(
+    persona: Dict[str, Any],
+    documents: List[str],
+    embeddings: List[List[float]],
+) -> bytes:
+    """
+    페르소나 상태와 메모리 청크를 번들 바이너리로 인코딩합니다.
+
+    Args:
+        persona: 페르소나 상태(JSON 직렬화 가능한 값, Counter 포함 가능)
+        documents: 메모리 청크 텍스트 목록
+        embeddings: 청크 임베딩 목록(documents와 같은 순서, 없으면 빈 목록)
+
+    Returns:
+        bytes: 번들 바이너리
+
+    Raises:
+        ValueError: 청크와 임베딩 수가 다르거나 임베딩 차원이 일정하지 않을 때
+    """
+    if embeddings and len(embeddings) != len(documents):
+        raise ValueError("청크 수와 임베딩 수가 다릅니다")
+    dim = len(embeddings[0]) if embeddings else 0
+    matrix = array("f")
+    for vector in embeddings:
+        if len(vector) != dim:
+            raise ValueError("임베딩 차원이 일정하지 않습니다")
+        matrix.extend(vector)
+    if sys.byteorder != "little":
+        matrix.byteswap()
+
+    header = {
+        "persona": persona,
+        "documents": documents,
+        "embedding_count": len(embeddings),
+        "embedding_dim": dim,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    body = _HEADER_LENGTH.pack(len(header_bytes)) + header_bytes + matrix.tobytes()
+    return _PREFIX.pack(BUNDLE_MAGIC, BUNDLE_VERSION) + zlib.compress(body, BUNDLE_COMPRESS_LEVEL)
+
+
+def decode_bundle(data: bytes) -> Tuple[Dict[str, Any], List[str], List[List[float]]]:
+    """
+    번들 바이너리를 페르소나 상태와 메모리 청크로 디코딩합니다.
+
+    Args:
+        data: 번들 바이너리
+
+    Returns:
+        Tuple[Dict[str, Any], List[str], List[List[float]]]: 페르소나 상태, 청크 텍스트, 임베딩
+
+    Raises:
+        ValueError: 번들 형식이 아니거나 지원하지 않는 버전/손상된 파일이거나,
+            압축 해제 크기가 BUNDLE_MAX_BYTES를 넘을 때
+    """
+    if len(data) < _PREFIX.size:
+        raise ValueError("번들 파일이 아닙니다")
+    magic, version = _PREFIX.unpack_from(data)
+    if magic != BUNDLE_MAGIC:
+        raise ValueError("번들 파일이 아닙니다")
+    if version != BUNDLE_VERSION:
+        raise ValueError(f"지원하지 않는 번들 버전입니다: {version}")
+    try:
+        decompressor = zlib.decompressobj()
+        body = decompressor.decompress(data[_PREFIX.size:], BUNDLE_MAX_BYTES)
+        if decompressor.unconsumed_tail:
+            raise ValueError(f"번들 파일이 너무 큽니다(최대 {BUNDLE_MAX_BYTES}바이트)")
+        if not decompressor.eof:
+            raise ValueError("손상된 번들 파일입니다: 압축 데이터가 잘렸습니다")
+        (header_length,) = _HEADER_LENGTH.unpack_from(body)
+        header_end = _HEADER_LENGTH.size + header_length
+        header = json.loads(body[_HEADER_LENGTH.size:header_end].decode("utf-8"))
+    except (zlib.error, struct.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"손상된 번들 파일입니다: {e}") from e
+
+    try:
+        persona = header["persona"]
+        documents = header["documents"]
+        count = header["embedding_count"]
+        dim = header["embedding_dim"]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"손상된 번들 파일입니다: 헤더 항목 누락 {e}") from e
+    if (
+        not isinstance(persona, dict)
+        or not isinstance(documents, list)
+        or not all(isinstance(document, str) for document in documents)
+        or not isinstance(count, int)
+        or not isinstance(dim, int)
+        or count < 0
+        or dim < 0
+    ):
+        raise ValueError("손상된 번들 파일입니다: 헤더 형식이 잘못됐습니다")
+    matrix = array("f")
+    matrix.frombytes(body[header_end:])
+    if len(matrix) != count * dim or (count and count != len(documents)):
+        raise ValueError("번들의 임베딩 행렬 크기가 맞지 않습니다")
+    if sys.byteorder != "little":
+        matrix.byteswap()
+    embeddings = [matrix[row * dim:(row + 1) * dim].tolist() for row in range(count)]
+    return persona, documents, embeddings
+
+
+def restore_style_state(state: Dict[str, Any] | None) -> Dict[str, Any] | None:
+    """
+    JSON으로 직렬화된 말투 집계 상태의 빈도 항목을 Counter로 되돌립니다.
+
+    Args:
+        state: 번들에서 읽은 집계 상태
+
+    Returns:
+        Dict[str, Any] | None: merge_style_state에 쓸 수 있는 집계 상태
+    """
+    if not state:
+        return state
+    return {
+        key: Counter(value) if isinstance(value, dict) else value
+        for key, value in state.items()
+    }
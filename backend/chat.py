@@ -12,27 +12,73 @@
 - chromadb: 벡터 DB
 - openai: LLM 호출
 - requests: 외부 API 호출
+(시작 시간을 줄이기 위해 서드파티 라이브러리는 처음 사용할 때 임포트)
 """
 
 # 1. 표준 라이브러리
+import asyncio
+import hashlib
+import heapq
 import json
 import logging
+import math
 import os
+import random
 import re
+import threading
 import time
 from collections import Counter
+from datetime import date
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, AsyncIterator, Callable, Iterable, Tuple
 
-# 2. 서드파티 라이브러리
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-import openai
-from openai import OpenAI
-import requests
+# 2. 서드파티 라이브러리(타입 검사 전용, 실제 임포트는 사용 시점)
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 # 3. 로컬 애플리케이션
-from backend.prompts import build_persona_prompt, build_base_system_prompt
+from backend.llm_cache import get_cached_response, make_cache_key, set_cached_response
+from backend.metrics import (
+    CHAT_ACTIVE_STREAMS,
+    CHAT_HEDGES,
+    CHAT_MEMORY_SIZE,
+    CHAT_SSE_FRAMES,
+    CHAT_STREAM_DURATION,
+    CHAT_TOKENS_STREAMED,
+    CHAT_TTFT,
+    CHROMA_LATENCY,
+    EMBEDDING_LATENCY,
+    MEMORY_CHUNKS,
+    MEMORY_VECTOR_LATENCY,
+    PERSONA_LLM_LATENCY,
+    PERSONA_LLM_RETRIES,
+    RAG_DEADLINE_MISSED,
+)
+from backend.prompts import (
+    build_base_system_prompt,
+    build_persona_prompt,
+    build_proactive_instruction,
+)
+from backend.quantized_store import (
+    add_vectors,
+    delete_vectors,
+    existing_ids,
+    export_vectors,
+    has_vectors,
+    quantization_enabled,
+    query_vectors,
+)
+from backend.reply_index import ReplyIndex, get_reply_index
+from backend.rerank import rerank_chunks
+from backend.response_cache import (
+    cache_scope,
+    is_cacheable,
+    lookup_cached_reply,
+    needs_embedding,
+    record_cache_saving,
+    store_cached_reply,
+)
+from backend.sse import HEARTBEAT_FRAME, coalesce_deltas, sse_event
 from backend.parser import parse_kakao_talk
 
 # 로깅 설정
@@ -43,6 +89,18 @@ logger = logging.getLogger(__name__)
 chroma_client = None
 collection = None
 openai_client = None
+async_openai_client = None
+# 헤지 요청용(SDK 재시도 끔) 클라이언트와 그 원본
+_hedge_client = None
+_hedge_client_source = None
+# 벡터 저장소 초기화 완료(실패 포함) 신호와 실패 사유
+_chroma_ready = threading.Event()
+_chroma_error: str | None = None
+# 이 프로세스가 청크를 저장한 작업 ID(만료 정리의 고아 판별용)
+_memory_jobs: set = set()
+
+# 저장 작업이 벡터 저장소 초기화를 기다리는 최대 시간(초)
+CHROMA_READY_TIMEOUT_S = float(os.getenv("CHROMA_READY_TIMEOUT_S", "30"))
 
 EMOJI_PATTERN = re.compile(
     "["
@@ -53,29 +111,115 @@ EMOJI_PATTERN = re.compile(
     flags=re.UNICODE,
 )
 TOKEN_PATTERN = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣA-Za-z0-9]+")
+TS_DATE_PATTERN = re.compile(
+    r"(?P<year>\d{4})[./년 ]\s?(?P<month>\d{1,2})[./월 ]\s?(?P<day>\d{1,2})"
+)
+TS_TIME_PATTERN = re.compile(r"(?P<ampm>오전|오후)\s*(?P<hour>\d{1,2}):(?P<minute>\d{2})")
+DEDUP_STRIP_PATTERN = re.compile(r"[^가-힣ㄱ-ㅎㅏ-ㅣa-z0-9]+")
+DEDUP_DIGIT_PATTERN = re.compile(r"[0-9]+")
+DEDUP_REPEAT_PATTERN = re.compile(r"(.)\1{2,}")
 PROFANITY_PATTERN = re.compile(
     r"(씨발|시발|ㅅㅂ|병신|ㅂㅅ|존나|존내|좆|좆같|개새|개놈|미친|미쳤|꺼져|닥쳐)",
     flags=re.IGNORECASE,
 )
 
 MEMORY_TURNS = int(os.getenv("MEMORY_TURNS", "8"))
+# RAG 조회 대기 기한(요청 시작 기준, 0 이하면 무제한)
+RAG_DEADLINE_MS = float(os.getenv("RAG_DEADLINE_MS", "150"))
+# 채팅 첫 토큰 기한(초, 0 이하면 무제한)과 헤지 요청 지연(초, 0 이하면 헤지 안 함)
+CHAT_TTFT_DEADLINE_S = float(os.getenv("CHAT_TTFT_DEADLINE_S", "20"))
+CHAT_HEDGE_DELAY_S = float(os.getenv("CHAT_HEDGE_DELAY_S", "3"))
+# 헤지 요청에 쓸 모델(비우면 OPENAI_MODEL과 같은 모델)
+OPENAI_FALLBACK_MODEL = os.getenv("OPENAI_FALLBACK_MODEL", "")
+# LLM 응답 실패 시 실제 대화 쌍 검색 답장으로 대체할지 여부
+CHAT_RETRIEVE_FALLBACK = os.getenv("CHAT_RETRIEVE_FALLBACK", "0") == "1"
+# RAG 후보 수(벡터 검색), 재정렬 후 사용할 최대 청크 수와 추정 토큰 상한,
+# 최근성 반감기(일), 거의 같은 청크로 볼 2-gram Jaccard 임계값
+RAG_CANDIDATES = int(os.getenv("RAG_CANDIDATES", "12"))
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "3"))
+RAG_CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", "400"))
+RAG_RECENCY_HALF_LIFE_DAYS = float(os.getenv("RAG_RECENCY_HALF_LIFE_DAYS", "180"))
+RAG_DEDUP_JACCARD = float(os.getenv("RAG_DEDUP_JACCARD", "0.6"))
+# 채팅 턴마다 메시지와 비슷한 실제 대화 쌍을 few-shot으로 고를지 여부, 개수, 추정 토큰 상한
+FEW_SHOT_DYNAMIC = os.getenv("FEW_SHOT_DYNAMIC", "1") == "1"
+FEW_SHOT_K = int(os.getenv("FEW_SHOT_K", "3"))
+FEW_SHOT_TOKEN_BUDGET = int(os.getenv("FEW_SHOT_TOKEN_BUDGET", "300"))
 MEMORY_MAX_MESSAGES = max(MEMORY_TURNS * 2, 2)
 CHAT_MEMORY: Dict[str, List[Dict[str, str]]] = {}
+CHAT_MEMORY_SIZE.set_function(lambda: len(CHAT_MEMORY))
+
+# 키워드 통계(토큰 빈도, 문서 빈도, 문서 수)
+KeywordStats = Tuple[Counter, Counter, int]
+
+# 페르소나 분석 모드(sampled: 대표 메시지 선택, recent: 최근 200건, map_reduce: 전체 기록 구간 분석)
+PERSONA_ANALYSIS_MODE = os.getenv("PERSONA_ANALYSIS_MODE", "sampled")
+PERSONA_RECENT_MESSAGES = 200
+PERSONA_SAMPLE_TOKENS = int(os.getenv("PERSONA_SAMPLE_TOKENS", "6000"))
+PERSONA_SAMPLE_STRATA = int(os.getenv("PERSONA_SAMPLE_STRATA", "12"))
+PERSONA_WINDOW_TOKENS = int(os.getenv("PERSONA_WINDOW_TOKENS", "6000"))
+# map 호출 수 상한(0이면 무제한), 상한 32와 동시 8이면 map은 4라운드로 끝남
+PERSONA_MAP_CONCURRENCY = int(os.getenv("PERSONA_MAP_CONCURRENCY", "8"))
+PERSONA_MAX_WINDOWS = int(os.getenv("PERSONA_MAX_WINDOWS", "32"))
+PERSONA_REDUCE_FAN_IN = int(os.getenv("PERSONA_REDUCE_FAN_IN", "8"))
+PERSONA_BATCH_CONCURRENCY = int(os.getenv("PERSONA_BATCH_CONCURRENCY", "4"))
+# 페르소나 리포트 LLM 호출 재시도(총 시도 횟수, 지수 백오프 + 지터)와 호출당 제한 시간(초)
+PERSONA_RETRY_ATTEMPTS = int(os.getenv("PERSONA_RETRY_ATTEMPTS", "3"))
+PERSONA_RETRY_BASE_S = float(os.getenv("PERSONA_RETRY_BASE_S", "1"))
+PERSONA_RETRY_MAX_S = float(os.getenv("PERSONA_RETRY_MAX_S", "20"))
+PERSONA_LLM_TIMEOUT_S = float(os.getenv("PERSONA_LLM_TIMEOUT_S", "120"))
 
 
 def setup_chroma():
     """
     ChromaDB 클라이언트를 초기화합니다.
+
+    시작을 막지 않도록 백그라운드 스레드에서 호출하며, 완료(실패 포함) 시 준비 신호를 보냅니다.
     """
-    global chroma_client, collection
-    chroma_path = os.getenv("CHROMA_PATH")
-    if not chroma_path:
-        chroma_path = str(Path(__file__).resolve().parent / "data" / "chroma")
-    if not os.path.exists(chroma_path):
-        os.makedirs(chroma_path)
-    
-    chroma_client = chromadb.PersistentClient(path=chroma_path)
-    collection = chroma_client.get_or_create_collection(name="lasttalk_memories")
+    global chroma_client, collection, _chroma_error
+    try:
+        import chromadb
+
+        chroma_path = os.getenv("CHROMA_PATH")
+        if not chroma_path:
+            chroma_path = str(Path(__file__).resolve().parent / "data" / "chroma")
+        if not os.path.exists(chroma_path):
+            os.makedirs(chroma_path)
+
+        with CHROMA_LATENCY.time("open"):
+            chroma_client = chromadb.PersistentClient(path=chroma_path)
+            collection = chroma_client.get_or_create_collection(name="lasttalk_memories")
+        logger.info("ChromaDB 준비 완료: %s", chroma_path)
+    except Exception as e:
+        _chroma_error = str(e)
+        logger.error("ChromaDB 초기화 오류: %s", e)
+    finally:
+        _chroma_ready.set()
+
+def chroma_status() -> Dict[str, Any]:
+    """
+    벡터 저장소 준비 상태를 반환합니다(readiness 확인용).
+
+    Returns:
+        Dict[str, Any]: ready(사용 가능 여부), initializing(초기화 중 여부), error(실패 사유)
+    """
+    return {
+        "ready": collection is not None,
+        "initializing": not _chroma_ready.is_set(),
+        "error": _chroma_error,
+    }
+
+def _wait_for_collection(timeout: float | None = None):
+    """
+    벡터 저장소 초기화가 끝날 때까지 기다린 뒤 컬렉션을 반환합니다.
+
+    Args:
+        timeout: 최대 대기 시간(초, 기본 CHROMA_READY_TIMEOUT_S)
+
+    Returns:
+        Collection | None: 컬렉션(초기화 실패/시간 초과 시 None)
+    """
+    _chroma_ready.wait(CHROMA_READY_TIMEOUT_S if timeout is None else timeout)
+    return collection
 
 def get_openai_client():
     """
@@ -89,13 +233,36 @@ def get_openai_client():
         # OPENAI_API_KEY를 우선 사용하고, ANTHROPIC_API_KEY는 호환용으로 지원
         api_key = os.getenv("OPENAI_API_KEY") or os.getenv("ANTHROPIC_API_KEY")
         if api_key:
-            openai_client = OpenAI(api_key=api_key)
+            from openai import OpenAI
+
+            # 재시도는 _request_persona_json에서 지터 백오프로 처리
+            openai_client = OpenAI(api_key=api_key, max_retries=0)
         else:
             logger.warning(
                 "OpenAI API 키가 없습니다. OPENAI_API_KEY 또는 ANTHROPIC_API_KEY를 설정하세요."
             )
     return openai_client
 
+def get_async_openai_client():
+    """
+    채팅 스트리밍용 비동기 OpenAI 클라이언트를 생성하거나 반환합니다.
+
+    Returns:
+        AsyncOpenAI | None: 비동기 OpenAI 클라이언트
+    """
+    global async_openai_client
+    if not async_openai_client:
+        api_key = os.getenv("OPENAI_API_KEY") or os.getenv("ANTHROPIC_API_KEY")
+        if api_key:
+            from openai import AsyncOpenAI
+
+            async_openai_client = AsyncOpenAI(api_key=api_key)
+        else:
+            logger.warning(
+                "OpenAI API 키가 없습니다. OPENAI_API_KEY 또는 ANTHROPIC_API_KEY를 설정하세요."
+            )
+    return async_openai_client
+
 def get_jina_embedding(text_chunks: List[str]):
     """
     Jina Embeddings API로 임베딩을 생성합니다.
@@ -110,7 +277,7 @@ def get_jina_embedding(text_chunks: List[str]):
     if not api_key:
         return [[0.0]*768 for _ in text_chunks] # 모의 값
         
-    url = "https://api.jina.ai/v1/embeddings"
+    url = os.getenv("JINA_API_URL", "https://api.jina.ai/v1/embeddings")
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {api_key}"
@@ -119,7 +286,10 @@ def get_jina_embedding(text_chunks: List[str]):
         "input": text_chunks,
         "model": os.getenv("JINA_EMBEDDINGS_MODEL", "jina-embeddings-v2-base-en")
     }
-    resp = requests.post(url, headers=headers, json=data)
+    import requests
+
+    with EMBEDDING_LATENCY.time():
+        resp = requests.post(url, headers=headers, json=data)
     if resp.status_code == 200:
         return [item["embedding"] for item in resp.json()["data"]]
     return [[0.0]*768 for _ in text_chunks] # 기본값
@@ -207,6 +377,12 @@ def _normalize_persona_report(data: Dict[str, Any]) -> Dict[str, Any]:
     data["profile"] = profile
     return data
 
+def _elapsed_ms(started: float) -> float:
+    """
+    perf_counter 기준 시작 시각부터 경과 시간(ms)을 반환합니다.
+    """
+    return round((time.perf_counter() - started) * 1000, 2)
+
 def _get_memory_key(job_id: str | None, session_id: str) -> str:
     """
     작업과 세션을 기준으로 메모리 키를 생성합니다.
@@ -248,19 +424,57 @@ def _append_history(
     )
     CHAT_MEMORY[key] = history[-MEMORY_MAX_MESSAGES:]
 
+def append_agent_message(job_id: str | None, session_id: str, message: str) -> None:
+    """
+    에이전트가 먼저 보낸 메시지를 대화 히스토리에 추가합니다.
+
+    Args:
+        job_id: 작업 ID
+        session_id: 세션 ID
+        message: 선제 메시지 본문
+    """
+    if not session_id or not message:
+        return
+    key = _get_memory_key(job_id, session_id)
+    history = CHAT_MEMORY.get(key, [])
+    history.append({"role": "assistant", "content": message})
+    CHAT_MEMORY[key] = history[-MEMORY_MAX_MESSAGES:]
+
+def clear_chat_memory(job_id: str) -> int:
+    """
+    작업의 모든 세션 대화 히스토리를 삭제합니다.
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        int: 삭제한 세션 수
+    """
+    prefix = f"{job_id}:"
+    keys = [key for key in CHAT_MEMORY if key.startswith(prefix)]
+    for key in keys:
+        CHAT_MEMORY.pop(key, None)
+    return len(keys)
+
 def _build_few_shot_messages(
     dialog_examples: List[Dict[str, str]],
     limit: int = 3,
+    token_budget: int = 0,
 ) -> List[Dict[str, str]]:
     """
-    대화 예시를 few-shot 메시지로 변환합니다.
+    대화 예시를 few-shot 메시지로 변환합니다(token_budget > 0이면 추정 토큰 수 상한 적용).
     """
     messages: List[Dict[str, str]] = []
+    used_tokens = 0
     for example in dialog_examples[:limit]:
         user_text = sanitize_no_emoji((example.get("user") or "").strip())
         persona_text = sanitize_no_emoji((example.get("persona") or "").strip())
         if not user_text or not persona_text:
             continue
+        tokens = _estimate_tokens(user_text) + _estimate_tokens(persona_text)
+        if token_budget > 0 and used_tokens + tokens > token_budget:
+            continue
+        used_tokens += tokens
         messages.append({"role": "user", "content": user_text})
         messages.append({"role": "assistant", "content": persona_text})
     return messages
@@ -286,33 +500,54 @@ def extract_style_examples(messages: List[Dict], count: int = 5) -> List[str]:
 def extract_dialog_examples(
     messages: List[Dict],
     target_speaker: str,
-    count: int = 3,
+    count: int | None = 3,
 ) -> List[Dict[str, str]]:
     """
     선택된 화자의 실제 대화 쌍(사용자→페르소나)을 추출합니다.
     """
-    examples: List[Dict[str, str]] = []
+    return extract_dialog_examples_by_speaker(
+        messages, count, {target_speaker}
+    ).get(target_speaker, [])
+
+def extract_dialog_examples_by_speaker(
+    messages: List[Dict],
+    count: int | None = 3,
+    speakers: Iterable[str] | None = None,
+) -> Dict[str, List[Dict[str, str]]]:
+    """
+    한 번의 순회로 화자별 실제 대화 쌍(상대 발화→화자 발화)을 추출합니다.
+
+    Args:
+        messages: 시간순 메시지 목록
+        count: 화자별 최대 예시 수(None이면 전체)
+        speakers: 대상 화자 목록(없으면 모든 화자)
+
+    Returns:
+        Dict[str, List[Dict[str, str]]]: 화자별 중복 없는 대화 예시
+    """
+    targets = set(speakers) if speakers is not None else None
+    examples: Dict[str, List[Dict[str, str]]] = {}
+    seen: Dict[str, set] = {}
     prev = None
     for msg in messages:
-        if msg.get("speaker") == target_speaker and prev:
-            if prev.get("speaker") != target_speaker:
-                user_text = sanitize_no_emoji((prev.get("text") or "").strip())
-                persona_text = sanitize_no_emoji((msg.get("text") or "").strip())
-                if user_text and persona_text:
-                    examples.append({"user": user_text, "persona": persona_text})
+        speaker = msg.get("speaker")
+        if (
+            prev
+            and prev.get("speaker") != speaker
+            and (targets is None or speaker in targets)
+            and (count is None or len(examples.get(speaker, ())) < count)
+        ):
+            user_text = sanitize_no_emoji((prev.get("text") or "").strip())
+            persona_text = sanitize_no_emoji((msg.get("text") or "").strip())
+            if user_text and persona_text:
+                speaker_seen = seen.setdefault(speaker, set())
+                if (user_text, persona_text) not in speaker_seen:
+                    speaker_seen.add((user_text, persona_text))
+                    examples.setdefault(speaker, []).append(
+                        {"user": user_text, "persona": persona_text}
+                    )
         prev = msg
-
-    unique_examples = []
-    seen = set()
-    for ex in examples:
-        key = (ex["user"], ex["persona"])
-        if key in seen:
-            continue
-        seen.add(key)
-        unique_examples.append(ex)
-        if len(unique_examples) >= count:
-            break
-    return unique_examples
+    return examples
 
 def sanitize_no_emoji(text: str) -> str:
     """
@@ -324,7 +559,14 @@ def build_style_signature(messages: List[Dict]) -> Dict[str, Any]:
     """
     말투 시그니처(문장 길이, 어미, 자주 쓰는 단어)를 생성합니다.
     """
-    lengths: List[int] = []
+    return _signature_from_counts(*_count_signature(messages))
+
+def _count_signature(messages: Iterable[Dict]) -> Tuple[int, int, Counter, Counter]:
+    """
+    말투 시그니처 집계값(길이 합, 메시지 수, 어미 빈도, 단어 빈도)을 계산합니다.
+    """
+    length_sum = 0
+    length_count = 0
     ending_counter: Counter = Counter()
     token_counter: Counter = Counter()
 
@@ -332,7 +574,8 @@ def build_style_signature(messages: List[Dict]) -> Dict[str, Any]:
         text = sanitize_no_emoji((msg.get("text") or "").strip())
         if not text:
             continue
-        lengths.append(len(text))
+        length_sum += len(text)
+        length_count += 1
 
         trimmed = re.sub(r"[\\s\"'“”‘’]+$", "", text)
         trimmed = re.sub(r"[\\.!?…]+$", "", trimmed)
@@ -344,7 +587,18 @@ def build_style_signature(messages: List[Dict]) -> Dict[str, Any]:
             if len(token) >= 2:
                 token_counter[token] += 1
 
-    avg_len = int(sum(lengths) / len(lengths)) if lengths else 0
+    return length_sum, length_count, ending_counter, token_counter
+
+def _signature_from_counts(
+    length_sum: int,
+    length_count: int,
+    ending_counter: Counter,
+    token_counter: Counter,
+) -> Dict[str, Any]:
+    """
+    집계값으로 말투 시그니처를 구성합니다.
+    """
+    avg_len = int(length_sum / length_count) if length_count else 0
     top_endings = [item[0] for item in ending_counter.most_common(5)]
     top_tokens = [item[0] for item in token_counter.most_common(6)]
 
@@ -385,9 +639,9 @@ def _merge_keywords(primary: List[str], fallback: List[str], limit: int) -> List
             break
     return merged
 
-def extract_local_keywords(messages: List[Dict], max_terms: int = 8) -> List[str]:
+def count_keyword_stats(messages: Iterable[Dict]) -> KeywordStats:
     """
-    대화 로그에서 자동으로 키워드를 추출합니다.
+    키워드 토큰의 전체 빈도, 문서 빈도, 문서 수를 집계합니다.
     """
     token_counter: Counter = Counter()
     doc_counter: Counter = Counter()
@@ -406,6 +660,17 @@ def extract_local_keywords(messages: List[Dict], max_terms: int = 8) -> List[str
             tokens.append(token)
         for token in set(tokens):
             doc_counter[token] += 1
+    return token_counter, doc_counter, total_docs
+
+def extract_local_keywords(
+    messages: List[Dict],
+    max_terms: int = 8,
+    stats: KeywordStats | None = None,
+) -> List[str]:
+    """
+    대화 로그에서 자동으로 키워드를 추출합니다.
+    """
+    token_counter, doc_counter, total_docs = stats or count_keyword_stats(messages)
     if total_docs == 0:
         return []
     keywords: List[str] = []
@@ -420,10 +685,233 @@ def extract_local_keywords(messages: List[Dict], max_terms: int = 8) -> List[str
             break
     return keywords
 
+def _near_duplicate_key(text: str) -> str:
+    """
+    거의 같은 발화를 묶기 위한 정규화 키를 생성합니다(ㅋㅋㅋㅋ → ㅋㅋ 등).
+    """
+    key = text.lower()
+    key = DEDUP_STRIP_PATTERN.sub("", key)
+    key = DEDUP_DIGIT_PATTERN.sub("0", key)
+    return DEDUP_REPEAT_PATTERN.sub(r"\1\1", key)
+
+def _ts_ordinal(ts: str | None) -> int | None:
+    """
+    타임스탬프 문자열에서 날짜를 추출해 서수(ordinal)로 변환합니다.
+    """
+    if not ts:
+        return None
+    match = TS_DATE_PATTERN.search(ts)
+    if not match:
+        return None
+    try:
+        return date(
+            int(match.group("year")),
+            int(match.group("month")),
+            int(match.group("day")),
+        ).toordinal()
+    except ValueError:
+        return None
+
+def _ts_minutes(ts: str | None) -> int | None:
+    """
+    날짜와 시각이 모두 있는 타임스탬프를 절대 분(날짜 서수 * 1440 + 분)으로 변환합니다.
+    """
+    ordinal = _ts_ordinal(ts)
+    if ordinal is None:
+        return None
+    match = TS_TIME_PATTERN.search(ts)
+    if not match:
+        return None
+    hour = int(match.group("hour")) % 12
+    if match.group("ampm") == "오후":
+        hour += 12
+    return ordinal * 1440 + hour * 60 + int(match.group("minute"))
+
+def build_timing_profile(
+    messages: List[Dict],
+    target_speaker: str,
+    min_gap_minutes: int = 30,
+    max_gap_minutes: int = 24 * 60,
+) -> Dict[str, Any]:
+    """
+    화자의 메시지 시각 패턴(활동 시간대, 침묵 후 먼저 말을 거는 간격)을 계산합니다.
+
+    Args:
+        messages: 전체 메시지 목록
+        target_speaker: 분석 대상 화자 이름
+        min_gap_minutes: 대화가 끊긴 것으로 보는 최소 간격(분)
+        max_gap_minutes: 집계에 포함할 최대 간격(분)
+
+    Returns:
+        Dict[str, Any]: active_hours(시간대별 메시지 수 24개), reinitiate_gap_seconds(중앙값, 없으면 None)
+    """
+    profiles = build_timing_profiles(messages, min_gap_minutes, max_gap_minutes)
+    return profiles.get(target_speaker) or {
+        "active_hours": [0] * 24,
+        "reinitiate_gap_seconds": None,
+    }
+
+def build_timing_profiles(
+    messages: List[Dict],
+    min_gap_minutes: int = 30,
+    max_gap_minutes: int = 24 * 60,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    한 번의 순회로 모든 화자의 메시지 시각 패턴을 계산합니다.
+
+    Args:
+        messages: 전체 메시지 목록
+        min_gap_minutes: 대화가 끊긴 것으로 보는 최소 간격(분)
+        max_gap_minutes: 집계에 포함할 최대 간격(분)
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 화자별 build_timing_profile 결과
+    """
+    active_hours: Dict[str, List[int]] = {}
+    gaps: Dict[str, List[int]] = {}
+    previous_minutes: int | None = None
+    for message in messages:
+        minutes = _ts_minutes(message.get("ts"))
+        if minutes is None:
+            continue
+        speaker = message.get("speaker")
+        hours = active_hours.get(speaker)
+        if hours is None:
+            hours = active_hours[speaker] = [0] * 24
+            gaps[speaker] = []
+        hours[(minutes % 1440) // 60] += 1
+        if previous_minutes is not None:
+            gap = minutes - previous_minutes
+            if min_gap_minutes <= gap <= max_gap_minutes:
+                gaps[speaker].append(gap)
+        previous_minutes = minutes
+
+    profiles: Dict[str, Dict[str, Any]] = {}
+    for speaker, hours in active_hours.items():
+        speaker_gaps = sorted(gaps[speaker])
+        profiles[speaker] = {
+            "active_hours": hours,
+            "reinitiate_gap_seconds": (
+                speaker_gaps[len(speaker_gaps) // 2] * 60 if speaker_gaps else None
+            ),
+        }
+    return profiles
+
+def select_representative_messages(
+    messages: List[Dict],
+    target_speaker: str | None = None,
+    token_budget: int | None = None,
+    strata: int | None = None,
+    stats: KeywordStats | None = None,
+    target_indices: List[int] | None = None,
+) -> List[Dict]:
+    """
+    토큰 예산 안에서 페르소나 분석용 대표 메시지를 선택합니다.
+
+    전체 기간을 구간으로 나눠 고르게 선택하고, 거의 같은 발화는 한 번만 포함하며,
+    특징적인 단어가 많은 발화를 우선합니다. 선택된 발화가 상대 발화에 대한 응답이면
+    상대 발화도 함께 포함합니다. 메시지 수에 대해 선형 시간으로 동작합니다.
+
+    Args:
+        messages: 시간순 메시지 목록(상대 화자 포함 가능)
+        target_speaker: 분석 대상 화자(없으면 모든 메시지가 대상)
+        token_budget: 선택 결과의 토큰 예산(없으면 PERSONA_SAMPLE_TOKENS)
+        strata: 기간 구간 수(없으면 PERSONA_SAMPLE_STRATA)
+        stats: 대상 화자 메시지의 키워드 통계(없으면 직접 계산)
+        target_indices: 대상 화자 메시지의 인덱스(없으면 전체 목록에서 계산)
+
+    Returns:
+        List[Dict]: 시간순으로 정렬된 선택 메시지 목록
+    """
+    budget = token_budget if token_budget is not None else PERSONA_SAMPLE_TOKENS
+    strata = max(strata if strata is not None else PERSONA_SAMPLE_STRATA, 1)
+    if target_indices is None:
+        target_indices = [
+            idx for idx, msg in enumerate(messages)
+            if target_speaker is None or msg.get("speaker") == target_speaker
+        ]
+    if not target_indices or budget <= 0:
+        return []
+    if stats is None:
+        stats = count_keyword_stats(messages[idx] for idx in target_indices)
+    _, doc_counter, total_docs = stats
+
+    # 날짜를 알 수 있으면 기간 기준, 아니면 순서 기준으로 구간 배정
+    ordinals = [_ts_ordinal(messages[idx].get("ts")) for idx in target_indices]
+    known = [o for o in ordinals if o is not None]
+    use_dates = bool(known) and len(known) == len(ordinals)
+    if use_dates:
+        first_day = min(known)
+        span = max(known) - first_day + 1
+
+    buckets: List[List[tuple]] = [[] for _ in range(strata)]
+    seen_keys: set = set()
+    for pos, idx in enumerate(target_indices):
+        msg = messages[idx]
+        text = sanitize_no_emoji((msg.get("text") or "").strip())
+        if not text:
+            continue
+        dedup_key = _near_duplicate_key(text)
+        if not dedup_key or dedup_key in seen_keys:
+            continue
+        seen_keys.add(dedup_key)
+
+        tokens = {
+            token
+            for token in (_normalize_keyword_token(raw) for raw in TOKEN_PATTERN.findall(text))
+            if _is_valid_keyword(token)
+        }
+        score = sum(
+            math.log((1 + total_docs) / (1 + doc_counter.get(token, 0)))
+            for token in tokens
+        ) / math.sqrt(1 + len(tokens))
+        cost = _estimate_tokens(_format_conversation([msg])) + 1
+
+        pair_idx = -1
+        prev = messages[idx - 1] if idx > 0 else None
+        if (
+            prev is not None
+            and prev.get("speaker") != msg.get("speaker")
+            and (prev.get("text") or "").strip()
+        ):
+            pair_idx = idx - 1
+            cost += _estimate_tokens(_format_conversation([prev])) + 1
+
+        if use_dates:
+            bucket = (ordinals[pos] - first_day) * strata // span
+        else:
+            bucket = pos * strata // len(target_indices)
+        buckets[bucket].append((score, -pos, idx, pair_idx, cost))
+
+    # 구간별 예산을 배분하고 남은 예산은 다음 구간으로 이월
+    selected: set = set()
+    per_bucket = budget / strata
+    carry = 0.0
+    for bucket in buckets:
+        allowance = per_bucket + carry
+        if bucket:
+            avg_cost = sum(item[4] for item in bucket) / len(bucket)
+            limit = min(len(bucket), int(allowance / avg_cost) * 2 + 1)
+            for _, _, idx, pair_idx, cost in heapq.nlargest(limit, bucket):
+                if cost > allowance:
+                    continue
+                selected.add(idx)
+                if pair_idx >= 0:
+                    selected.add(pair_idx)
+                allowance -= cost
+        carry = allowance
+    return [messages[idx] for idx in sorted(selected)]
+
 def extract_common_phrases(messages: List[Dict], max_items: int = 10) -> List[str]:
     """
     대화 로그에서 자주 등장하는 짧은 구절을 추출합니다.
     """
+    return [item[0] for item in _count_phrases(messages).most_common(max_items)]
+
+def _count_phrases(messages: Iterable[Dict]) -> Counter:
+    """
+    2~3단어 구절과 짧은 발화 전체의 빈도를 집계합니다.
+    """
     counter: Counter = Counter()
     for msg in messages:
         text = sanitize_no_emoji((msg.get("text") or "").strip())
@@ -441,10 +929,76 @@ def extract_common_phrases(messages: List[Dict], max_items: int = 10) -> List[st
                     counter[phrase] += 1
         if 2 <= len(text) <= 40:
             counter[text] += 1
-    return [item[0] for item in counter.most_common(max_items)]
+    return counter
+
+def build_style_state(messages: List[Dict]) -> Dict[str, Any]:
+    """
+    말투 시그니처/키워드/자주 쓰는 구절의 합산 가능한 집계 상태를 계산합니다.
+
+    새 메시지의 상태를 merge_style_state로 더하면 전체를 다시 계산한 것과 같은 결과를 얻습니다.
+
+    Args:
+        messages: 대상 화자 메시지 목록
+
+    Returns:
+        Dict[str, Any]: 집계 상태
+    """
+    length_sum, length_count, endings, signature_tokens = _count_signature(messages)
+    keyword_tokens, keyword_docs, keyword_total = count_keyword_stats(messages)
+    return {
+        "length_sum": length_sum,
+        "length_count": length_count,
+        "endings": endings,
+        "signature_tokens": signature_tokens,
+        "keyword_tokens": keyword_tokens,
+        "keyword_docs": keyword_docs,
+        "keyword_total": keyword_total,
+        "phrases": _count_phrases(messages),
+    }
+
+def merge_style_state(state: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    집계 상태에 새 메시지의 집계 상태를 더합니다(state를 직접 갱신).
+
+    Args:
+        state: 기존 집계 상태
+        delta: 새 메시지의 집계 상태
+
+    Returns:
+        Dict[str, Any]: 갱신된 집계 상태
+    """
+    for key, value in delta.items():
+        if isinstance(value, Counter):
+            state[key].update(value)
+        else:
+            state[key] += value
+    return state
+
+def style_artifacts_from_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    집계 상태에서 말투 시그니처, 키워드, 자주 쓰는 구절을 계산합니다.
+
+    Args:
+        state: build_style_state 결과
+
+    Returns:
+        Dict[str, Any]: style_signature, local_keywords, common_phrases, keyword_stats
+    """
+    stats = (state["keyword_tokens"], state["keyword_docs"], state["keyword_total"])
+    return {
+        "style_signature": _signature_from_counts(
+            state["length_sum"],
+            state["length_count"],
+            state["endings"],
+            state["signature_tokens"],
+        ),
+        "local_keywords": extract_local_keywords([], 8, stats),
+        "common_phrases": [item[0] for item in state["phrases"].most_common(10)],
+        "keyword_stats": stats,
+    }
 
 
-def _build_fallback_summary(messages: List[Dict]) -> str:
+def build_fallback_summary(messages: List[Dict]) -> str:
     """
     OpenAI 미사용 시 사용할 로컬 요약을 생성합니다.
     """
@@ -469,13 +1023,259 @@ def _build_fallback_summary(messages: List[Dict]) -> str:
         f"마지막 메시지는 \"{last_preview}\" 입니다."
     )
 
-async def generate_persona_report(messages: List[Dict], require_openai: bool = True):
+PERSONA_REPORT_SYSTEM_PROMPT = """채팅 로그를 분석해 페르소나 리포트를 생성하세요.
+반드시 JSON 객체만 반환해야 하며, 다음 두 필드를 포함해야 합니다.
+1. "summary": 성격과 관계를 요약한 텍스트
+2. "profile": PersonaProfile 스키마와 동일한 JSON 객체
+요약과 텍스트 항목은 한국어로 작성하세요.
+관심 주제/자주 쓰는 표현은 대화 로그에서 실제로 등장한 단어/구절을 우선 사용하세요.
+신조어/은어는 원문 그대로 유지하고, 임의로 표준어로 바꾸지 마세요.
+관심 주제는 3~8개, 자주 쓰는 표현은 5~10개로 정리하세요.
+단, honorific_level/emoji_usage/punctuation/response_length는 스키마 값 그대로 사용하세요.
+{
+  "nickname_rules": string[],
+  "speech_style": {
+    "endings": string[],
+    "honorific_level": "informal" | "polite" | "mixed",
+    "emoji_usage": "low" | "medium" | "high",
+    "punctuation": "short" | "normal" | "many"
+  },
+  "favorite_topics": string[],
+  "taboo_topics": string[],
+  "response_length": "short" | "medium" | "long",
+  "typical_patterns": string[],
+  "few_shot_examples": [{"user": string, "persona": string}]
+}"""
+
+PERSONA_REDUCE_SYSTEM_PROMPT = """같은 화자의 채팅 로그를 여러 구간으로 나눠 각각 분석한 부분 페르소나 리포트 목록이 주어집니다.
+이를 하나의 페르소나 리포트로 병합하세요.
+반드시 JSON 객체만 반환해야 하며, "summary"와 "profile" 두 필드를 포함해야 합니다.
+여러 구간에 반복해서 나타나는 특징을 우선하고, 시기에 따라 달라진 점은 요약에 함께 적으세요.
+profile은 부분 리포트와 동일한 스키마를 따르며, 목록 항목은 중복 없이 정리하세요.
+단, honorific_level/emoji_usage/punctuation/response_length는 스키마 값 그대로 사용하세요."""
+
+
+def _format_conversation(messages: List[Dict]) -> str:
+    """
+    메시지 목록을 LLM 입력용 대화 로그 텍스트로 변환합니다.
+    """
+    return "\n".join([f"{m['ts']} {m['speaker']}: {m['text']}" for m in messages])
+
+def _estimate_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수를 보수적으로 추정합니다(UTF-8 3바이트당 1토큰).
+    """
+    return (len(text.encode("utf-8")) + 2) // 3
+
+def _shard_messages(messages: List[Dict], max_tokens: int) -> List[List[Dict]]:
+    """
+    메시지 목록을 토큰 상한을 넘지 않는 연속 구간으로 나눕니다.
+    """
+    windows: List[List[Dict]] = []
+    current: List[Dict] = []
+    current_tokens = 0
+    for msg in messages:
+        line_tokens = _estimate_tokens(f"{msg['ts']} {msg['speaker']}: {msg['text']}") + 1
+        if current and current_tokens + line_tokens > max_tokens:
+            windows.append(current)
+            current = []
+            current_tokens = 0
+        current.append(msg)
+        current_tokens += line_tokens
+    if current:
+        windows.append(current)
+    return windows
+
+def _ensure_report_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    LLM 응답에서 summary/profile 필드를 찾아 보정합니다.
+    """
+    # 응답 래핑 키가 있는 경우 보정
+    if "PersonaReport" in data:
+        data = data["PersonaReport"]
+
+    # 필수 필드 보장
+    if "summary" not in data:
+        data["summary"] = "페르소나 분석 결과"
+    if "profile" not in data:
+        # 요약이 다른 키에 있을 수 있어 프로필 후보 키를 탐색
+        for key in ["profile", "PersonaProfile", "persona_profile"]:
+            if key in data:
+                data["profile"] = data.pop(key)
+                break
+        else:
+            # 기본 빈 프로필
+            data["profile"] = {
+                "nickname_rules": [],
+                "speech_style": {"endings": [], "honorific_level": "mixed", "emoji_usage": "medium", "punctuation": "normal"},
+                "favorite_topics": [],
+                "taboo_topics": [],
+                "response_length": "medium",
+                "typical_patterns": [],
+                "few_shot_examples": []
+            }
+    return data
+
+def _is_retryable_llm_error(error: Exception) -> bool:
+    """
+    일시적인 LLM 오류(연결/시간 초과/속도 제한/5xx/잘린 JSON)인지 확인합니다.
+    """
+    import openai
+
+    return isinstance(error, (
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+        json.JSONDecodeError,
+    ))
+
+async def _request_persona_json(
+    client: "OpenAI",
+    model: str,
+    system_prompt: str,
+    user_content: str,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    JSON 응답 형식으로 LLM을 호출하고 리포트 필드를 보정해 반환합니다.
+
+    일시적인 오류는 PERSONA_RETRY_ATTEMPTS번까지 지터를 준 지수 백오프로 재시도합니다.
+    """
+    response_format = {"type": "json_object"}
+    cache_key = make_cache_key(model, system_prompt, user_content, response_format)
+    if use_cache:
+        cached = await asyncio.to_thread(get_cached_response, cache_key)
+        if cached is not None:
+            logger.info("LLM 캐시 적중: %s", cache_key[:12])
+            return _ensure_report_fields(json.loads(cached))
+
+    attempts = max(PERSONA_RETRY_ATTEMPTS, 1)
+    for attempt in range(attempts):
+        try:
+            # 동기 클라이언트 호출이 이벤트 루프를 막지 않도록 스레드에서 실행
+            with PERSONA_LLM_LATENCY.time():
+                response = await asyncio.to_thread(
+                    client.chat.completions.create,
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_content}
+                    ],
+                    response_format=response_format,
+                    timeout=PERSONA_LLM_TIMEOUT_S,
+                )
+            raw_content = response.choices[0].message.content
+            data = json.loads(raw_content)
+            break
+        except Exception as e:
+            if attempt + 1 >= attempts or not _is_retryable_llm_error(e):
+                raise
+            # 동시에 실패한 요청들이 한꺼번에 재시도하지 않도록 전체 지터 적용
+            delay = random.uniform(0, min(PERSONA_RETRY_MAX_S, PERSONA_RETRY_BASE_S * 2 ** attempt))
+            logger.warning(
+                "페르소나 LLM 재시도 %s/%s (%.1fs 후): %s", attempt + 1, attempts - 1, delay, e
+            )
+            PERSONA_LLM_RETRIES.inc()
+            await asyncio.sleep(delay)
+    if use_cache:
+        await asyncio.to_thread(set_cached_response, cache_key, raw_content)
+    return _ensure_report_fields(data)
+
+async def _map_reduce_persona_report(
+    client: "OpenAI",
+    model: str,
+    messages: List[Dict],
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    전체 대화를 구간별로 분석(map)한 뒤 부분 리포트를 병합(reduce)합니다.
+    """
+    windows = _shard_messages(messages, PERSONA_WINDOW_TOKENS)
+    if PERSONA_MAX_WINDOWS > 0 and len(windows) > PERSONA_MAX_WINDOWS:
+        # 상한을 넘으면 전체 기간에 고르게 분포하도록 구간을 선택
+        logger.info(
+            "페르소나 map-reduce 구간 축소: %s개 중 %s개 선택", len(windows), PERSONA_MAX_WINDOWS
+        )
+        step = len(windows) / PERSONA_MAX_WINDOWS
+        windows = [windows[int(i * step)] for i in range(PERSONA_MAX_WINDOWS)]
+    logger.info("페르소나 map-reduce 분석: 구간 %s개", len(windows))
+
+    semaphore = asyncio.Semaphore(max(PERSONA_MAP_CONCURRENCY, 1))
+
+    async def _run(system_prompt: str, user_content: str) -> Dict[str, Any]:
+        async with semaphore:
+            data = await _request_persona_json(
+                client, model, system_prompt, user_content, use_cache
+            )
+        return _normalize_persona_report(data)
+
+    partials = await asyncio.gather(*[
+        _run(
+            PERSONA_REPORT_SYSTEM_PROMPT,
+            f"대화 로그:\n{_format_conversation(window)}",
+        )
+        for window in windows
+    ])
+
+    async def _reduce(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(group) == 1:
+            return group[0]
+        return await _run(
+            PERSONA_REDUCE_SYSTEM_PROMPT,
+            "부분 리포트 목록:\n" + json.dumps(group, ensure_ascii=False),
+        )
+
+    # 병합 입력이 과도하게 커지지 않도록 계층적으로 reduce
+    fan_in = max(PERSONA_REDUCE_FAN_IN, 2)
+    while len(partials) > 1:
+        groups = [partials[i:i + fan_in] for i in range(0, len(partials), fan_in)]
+        partials = await asyncio.gather(*[_reduce(group) for group in groups])
+    return partials[0]
+
+def select_report_messages(messages: List[Dict], mode: str | None = None) -> List[Dict] | None:
+    """
+    리포트 생성에 필요한 메시지만 추립니다(워커 결과 전송량 축소용).
+
+    sampled 모드는 미리 고른 표본을 쓰므로 대상 화자를 알 수 있는 첫 메시지만, recent 모드는
+    최근 메시지만 남깁니다. map_reduce 모드는 전체 메시지가 필요하므로 None을 반환하며,
+    호출 측에서 파일을 다시 읽어야 합니다.
+
+    Args:
+        messages: 대상 화자의 메시지 목록
+        mode: 분석 모드(없으면 PERSONA_ANALYSIS_MODE)
+
+    Returns:
+        List[Dict] | None: 리포트 생성용 메시지(전체가 필요하면 None)
+    """
+    analysis_mode = (mode or PERSONA_ANALYSIS_MODE).lower()
+    if analysis_mode == "map_reduce":
+        return None
+    if analysis_mode == "recent":
+        return messages[-PERSONA_RECENT_MESSAGES:]
+    return messages[:1]
+
+async def generate_persona_report(
+    messages: List[Dict],
+    require_openai: bool = True,
+    local_keywords: List[str] | None = None,
+    common_phrases: List[str] | None = None,
+    mode: str | None = None,
+    sample_messages: List[Dict] | None = None,
+    use_cache: bool = True,
+    fallback_summary: str | None = None,
+):
     """
     대화 로그를 기반으로 페르소나 리포트를 생성합니다.
 
     Args:
         messages: 파싱된 메시지 목록
         require_openai: OpenAI 키 필수 여부
+        local_keywords: 미리 계산한 키워드(없으면 직접 계산)
+        common_phrases: 미리 계산한 자주 쓰는 구절(없으면 직접 계산)
+        mode: 분석 모드(sampled/recent/map_reduce, 없으면 PERSONA_ANALYSIS_MODE)
+        sample_messages: 미리 선택한 대표 메시지(sampled 모드, 없으면 직접 선택)
+        use_cache: LLM 응답 캐시 사용 여부(LLM_CACHE_ENABLED가 꺼져 있으면 무시)
+        fallback_summary: 미리 계산한 로컬 요약(없으면 messages로 직접 계산)
 
     Returns:
         Dict[str, Any]: 페르소나 리포트
@@ -484,7 +1284,8 @@ async def generate_persona_report(messages: List[Dict], require_openai: bool = T
         RuntimeError: OpenAI 키가 없고 require_openai가 True일 때
     """
     client = get_openai_client()
-    fallback_summary = _build_fallback_summary(messages)
+    if fallback_summary is None:
+        fallback_summary = build_fallback_summary(messages)
     if not client:
         if require_openai:
             raise RuntimeError("OpenAI API 키가 필요합니다.")
@@ -506,74 +1307,47 @@ async def generate_persona_report(messages: List[Dict], require_openai: bool = T
             },
         }
     
-    sample_msgs = messages[-200:]
-    conversation_text = "\n".join([f"{m['ts']} {m['speaker']}: {m['text']}" for m in sample_msgs])
-    
-    system_prompt = """채팅 로그를 분석해 페르소나 리포트를 생성하세요.
-반드시 JSON 객체만 반환해야 하며, 다음 두 필드를 포함해야 합니다.
-1. "summary": 성격과 관계를 요약한 텍스트
-2. "profile": PersonaProfile 스키마와 동일한 JSON 객체
-요약과 텍스트 항목은 한국어로 작성하세요.
-관심 주제/자주 쓰는 표현은 대화 로그에서 실제로 등장한 단어/구절을 우선 사용하세요.
-신조어/은어는 원문 그대로 유지하고, 임의로 표준어로 바꾸지 마세요.
-관심 주제는 3~8개, 자주 쓰는 표현은 5~10개로 정리하세요.
-단, honorific_level/emoji_usage/punctuation/response_length는 스키마 값 그대로 사용하세요.
-{
-  "nickname_rules": string[],
-  "speech_style": {
-    "endings": string[],
-    "honorific_level": "informal" | "polite" | "mixed",
-    "emoji_usage": "low" | "medium" | "high",
-    "punctuation": "short" | "normal" | "many"
-  },
-  "favorite_topics": string[],
-  "taboo_topics": string[],
-  "response_length": "short" | "medium" | "long",
-  "typical_patterns": string[],
-  "few_shot_examples": [{"user": string, "persona": string}]
-}"""
-    
     try:
         model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"대화 로그:\n{conversation_text}"}
-            ],
-            response_format={ "type": "json_object" }
-        )
-        raw_content = response.choices[0].message.content
-        data = json.loads(raw_content)
-        
-        # 응답 래핑 키가 있는 경우 보정
-        if "PersonaReport" in data:
-            data = data["PersonaReport"]
-
-        # 필수 필드 보장
-        if "summary" not in data:
-            data["summary"] = "페르소나 분석 결과"
-        if "profile" not in data:
-            # 요약이 다른 키에 있을 수 있어 프로필 후보 키를 탐색
-            for key in ["profile", "PersonaProfile", "persona_profile"]:
-                if key in data:
-                    data["profile"] = data.pop(key)
-                    break
-            else:
-                # 기본 빈 프로필
-                data["profile"] = {
-                    "nickname_rules": [],
-                    "speech_style": {"endings": [], "honorific_level": "mixed", "emoji_usage": "medium", "punctuation": "normal"},
-                    "favorite_topics": [],
-                    "taboo_topics": [],
-                    "response_length": "medium",
-                    "typical_patterns": [],
-                    "few_shot_examples": []
-                }
+        analysis_mode = (mode or PERSONA_ANALYSIS_MODE).lower()
+        if analysis_mode == "map_reduce":
+            data = await _map_reduce_persona_report(
+                client, model, messages, use_cache
+            )
+        elif analysis_mode == "recent":
+            conversation_text = _format_conversation(messages[-PERSONA_RECENT_MESSAGES:])
+            data = await _request_persona_json(
+                client,
+                model,
+                PERSONA_REPORT_SYSTEM_PROMPT,
+                f"대화 로그:\n{conversation_text}",
+                use_cache,
+            )
+        else:
+            if sample_messages is None:
+                sample_messages = select_representative_messages(messages)
+            conversation_text = _format_conversation(sample_messages)
+            # 대화 쌍으로 상대 발화가 섞이므로 분석 대상 화자를 명시
+            target_name = messages[0].get("speaker") if messages else ""
+            data = await _request_persona_json(
+                client,
+                model,
+                PERSONA_REPORT_SYSTEM_PROMPT,
+                f"분석 대상 화자: {target_name}\n대화 로그:\n{conversation_text}",
+                use_cache,
+            )
 
         normalized = _normalize_persona_report(data)
-        auto_topics = extract_local_keywords(messages, 8)
-        auto_patterns = extract_common_phrases(messages, 10)
+        auto_topics = (
+            local_keywords
+            if local_keywords is not None
+            else extract_local_keywords(messages, 8)
+        )
+        auto_patterns = (
+            common_phrases
+            if common_phrases is not None
+            else extract_common_phrases(messages, 10)
+        )
         profile = normalized.get("profile", {})
         if auto_topics:
             profile["favorite_topics"] = auto_topics
@@ -613,6 +1387,346 @@ async def generate_persona_report(messages: List[Dict], require_openai: bool = T
             },
         }
 
+async def generate_persona_reports(
+    analyses: Dict[str, Dict[str, Any]],
+    require_openai: bool = True,
+    concurrency: int | None = None,
+    on_complete: Callable[[str, Dict[str, Any] | None, Exception | None], None] | None = None,
+) -> Dict[str, Dict[str, Any] | Exception]:
+    """
+    여러 화자의 페르소나 리포트를 동시 호출 수를 제한해 병렬로 생성합니다.
+
+    Args:
+        analyses: 화자별 분석 결과(report_messages, fallback_summary, local_keywords,
+            common_phrases, persona_sample)
+        require_openai: OpenAI 키 필수 여부
+        concurrency: 동시 LLM 호출 수(없으면 PERSONA_BATCH_CONCURRENCY)
+        on_complete: 화자별 완료 시 (화자, 리포트, 오류)로 호출되는 콜백
+
+    Returns:
+        Dict[str, Dict[str, Any] | Exception]: 화자별 리포트 또는 실패 시 예외
+    """
+    semaphore = asyncio.Semaphore(max(concurrency or PERSONA_BATCH_CONCURRENCY, 1))
+
+    async def _generate(speaker: str, analysis: Dict[str, Any]):
+        async with semaphore:
+            try:
+                report = await generate_persona_report(
+                    analysis["report_messages"],
+                    require_openai=require_openai,
+                    local_keywords=analysis.get("local_keywords"),
+                    common_phrases=analysis.get("common_phrases"),
+                    sample_messages=analysis.get("persona_sample"),
+                    fallback_summary=analysis.get("fallback_summary"),
+                )
+            except Exception as e:
+                logger.error("화자 리포트 생성 실패: %s - %s", speaker, str(e))
+                if on_complete:
+                    on_complete(speaker, None, e)
+                return speaker, e
+        if on_complete:
+            on_complete(speaker, report, None)
+        return speaker, report
+
+    results = await asyncio.gather(
+        *[_generate(speaker, analysis) for speaker, analysis in analyses.items()]
+    )
+    return dict(results)
+
+def build_memory_chunks(messages: List[Dict], chunk_size: int = 5) -> List[str]:
+    """
+    메시지를 벡터 저장용 청크 텍스트로 묶습니다.
+
+    Args:
+        messages: 파싱된 메시지 목록
+        chunk_size: 청크당 메시지 수
+
+    Returns:
+        List[str]: 청크 텍스트 목록
+    """
+    return build_dated_memory_chunks(messages, chunk_size)[0]
+
+def build_dated_memory_chunks(
+    messages: List[Dict],
+    chunk_size: int = 5,
+) -> Tuple[List[str], List[int | None]]:
+    """
+    메시지를 청크로 묶고 청크별 마지막 메시지 날짜(서수)를 함께 반환합니다(RAG 최근성용).
+
+    Args:
+        messages: 파싱된 메시지 목록
+        chunk_size: 청크당 메시지 수
+
+    Returns:
+        Tuple[List[str], List[int | None]]: 청크 텍스트 목록과 날짜 서수 목록(없으면 None)
+    """
+    chunks: List[str] = []
+    days: List[int | None] = []
+    current_chunk: List[str] = []
+    current_day = None
+    for msg in messages:
+        current_chunk.append(f"[{msg['speaker']}] {msg['text']}")
+        current_day = _ts_ordinal(msg.get("ts")) or current_day
+        if len(current_chunk) >= chunk_size:
+            chunks.append("\n".join(current_chunk))
+            days.append(current_day)
+            current_chunk = []
+    if current_chunk:
+        chunks.append("\n".join(current_chunk))
+        days.append(current_day)
+    return chunks, days
+
+def memory_chunk_id(job_id: str, chunk: str) -> str:
+    """
+    청크 내용 해시로 작업 내에서 고유한 청크 ID를 만듭니다.
+
+    Args:
+        job_id: 작업 ID
+        chunk: 청크 텍스트
+
+    Returns:
+        str: 청크 ID
+    """
+    digest = hashlib.sha1(chunk.encode("utf-8")).hexdigest()[:20]
+    return f"{job_id}_{digest}"
+
+def _uses_quantized_store(job_id: str) -> bool:
+    """
+    작업 청크를 양자화 저장소에 둘지 결정합니다.
+
+    이미 양자화 저장소가 있으면 계속 쓰고, 새 작업은 코덱이 켜져 있고 Jina가 설정돼 있으며
+    ChromaDB에 기존 청크가 없을 때만 씁니다. 양자화 저장소는 질의 임베딩이 있어야 조회할 수 있으므로
+    번들에 임베딩이 있어도 Jina가 없으면 ChromaDB에 둡니다. 한 작업의 청크가 두 저장소로 나뉘지 않도록
+    기존 저장소를 따릅니다.
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        bool: 양자화 저장소 사용 여부
+    """
+    if has_vectors(job_id):
+        return True
+    if not quantization_enabled() or not os.getenv("JINA_API_KEY"):
+        return False
+    store = _wait_for_collection()
+    if store is None:
+        return True
+    with CHROMA_LATENCY.time("get"):
+        stored = store.get(where={"job_id": job_id}, limit=1, include=[])
+    return not stored.get("ids")
+
+def _store_memory_chunks(
+    job_id: str,
+    chunks: List[str],
+    embeddings: List[List[float]] | None = None,
+    days: List[int | None] | None = None,
+) -> int:
+    """
+    청크를 내용 해시 ID로 ChromaDB(또는 양자화 저장소)에 저장합니다. 이미 저장된 청크는 임베딩하지 않습니다.
+
+    Args:
+        job_id: 작업 ID
+        chunks: 청크 텍스트 목록
+        embeddings: 미리 계산된 청크 임베딩(있으면 임베딩 요청 생략)
+        days: 청크별 날짜 서수(메타데이터 day로 저장, RAG 최근성용)
+
+    Returns:
+        int: 새로 저장한 청크 수(실패 시 0)
+    """
+    if not chunks:
+        return 0
+    has_embeddings = embeddings is not None or bool(os.getenv("JINA_API_KEY"))
+    try:
+        quantized = _uses_quantized_store(job_id)
+    except Exception as e:
+        logger.error(f"Chroma 조회 오류: {e}")
+        return 0
+    if quantized and not has_embeddings:
+        logger.error("임베딩이 없어 양자화 저장소에 청크를 저장하지 못했습니다: %s", job_id)
+        return 0
+    store = None if quantized else _wait_for_collection()
+    if not quantized and store is None:
+        logger.error("벡터 저장소가 준비되지 않아 청크를 저장하지 못했습니다: %s", job_id)
+        return 0
+    # 같은 내용의 청크는 한 번만 저장
+    pending: Dict[str, str] = {}
+    vectors: Dict[str, List[float]] = {}
+    metadatas: Dict[str, Dict[str, Any]] = {}
+    for index, chunk in enumerate(chunks):
+        chunk_id = memory_chunk_id(job_id, chunk)
+        if chunk_id not in pending:
+            pending[chunk_id] = chunk
+            if embeddings is not None:
+                vectors[chunk_id] = embeddings[index]
+            metadatas[chunk_id] = {"job_id": job_id}
+            if days and days[index] is not None:
+                metadatas[chunk_id]["day"] = days[index]
+    try:
+        if quantized:
+            existing = existing_ids(job_id, list(pending))
+        else:
+            with CHROMA_LATENCY.time("get"):
+                existing = store.get(ids=list(pending), include=[]).get("ids") or []
+        for chunk_id in existing:
+            pending.pop(chunk_id, None)
+        skipped = len(chunks) - len(pending)
+        if skipped:
+            MEMORY_CHUNKS.inc(skipped, "skipped")
+        if not pending:
+            logger.info("새로 저장할 청크가 없습니다: %s", job_id)
+            return 0
+
+        ids = list(pending)
+        documents = list(pending.values())
+        if embeddings is not None:
+            document_embeddings = [vectors[chunk_id] for chunk_id in ids]
+        else:
+            logger.info(f"{len(documents)}개 청크 임베딩 중...")
+            document_embeddings = None
+            if os.getenv("JINA_API_KEY"):
+                document_embeddings = get_jina_embedding(documents)
+        if quantized:
+            with MEMORY_VECTOR_LATENCY.time("add"):
+                add_vectors(
+                    job_id,
+                    ids,
+                    documents,
+                    document_embeddings,
+                    [metadatas[chunk_id].get("day") for chunk_id in ids],
+                )
+            MEMORY_CHUNKS.inc(len(documents), "stored")
+            _memory_jobs.add(job_id)
+            logger.info("양자화 벡터 저장 완료")
+            return len(documents)
+        with CHROMA_LATENCY.time("upsert"):
+            store.upsert(
+                documents=documents,
+                embeddings=document_embeddings,
+                ids=ids,
+                metadatas=[metadatas[chunk_id] for chunk_id in ids]
+            )
+        MEMORY_CHUNKS.inc(len(documents), "stored")
+        _memory_jobs.add(job_id)
+        logger.info("ChromaDB 저장 완료")
+        return len(documents)
+    except Exception as e:
+        logger.error(f"Chroma 저장 오류: {e}")
+        return 0
+
+def append_memory_chunks(job_id: str, messages: List[Dict]) -> int:
+    """
+    증분 가져오기로 추가된 메시지만 청크로 묶어 기존 벡터 메모리에 추가합니다.
+
+    Args:
+        job_id: 작업 ID
+        messages: 새로 추가된 대상 화자 메시지 목록
+
+    Returns:
+        int: 새로 저장한 청크 수
+    """
+    chunks, days = build_dated_memory_chunks(messages)
+    return _store_memory_chunks(job_id, chunks, days=days)
+
+def embedding_model_name() -> str:
+    """
+    현재 벡터 메모리에 쓰는 임베딩 모델 이름을 반환합니다.
+
+    Returns:
+        str: Jina 모델 이름 또는 ChromaDB 기본 임베딩("chroma-default")
+    """
+    if os.getenv("JINA_API_KEY"):
+        return os.getenv("JINA_EMBEDDINGS_MODEL", "jina-embeddings-v2-base-en")
+    return "chroma-default"
+
+def export_memory_chunks(
+    job_id: str,
+) -> Tuple[List[str], List[List[float]], List[int | None]]:
+    """
+    작업의 벡터 메모리 청크와 임베딩, 청크 날짜를 꺼냅니다.
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        Tuple: 청크 텍스트 목록, 임베딩 목록, 청크별 날짜 서수 목록
+    """
+    if has_vectors(job_id):
+        # 양자화 저장소는 float16 사본(float16 코덱은 코드)을 복원해 내보냄
+        return export_vectors(job_id)
+    store = _wait_for_collection()
+    if store is None:
+        return [], [], []
+    with CHROMA_LATENCY.time("get"):
+        stored = store.get(
+            where={"job_id": job_id}, include=["documents", "embeddings", "metadatas"]
+        )
+    documents = list(stored.get("documents") or [])
+    embeddings = stored.get("embeddings")
+    if embeddings is None:
+        embeddings = []
+    days = [(metadata or {}).get("day") for metadata in stored.get("metadatas") or []]
+    return documents, [list(vector) for vector in embeddings], days
+
+def import_memory_chunks(
+    job_id: str,
+    documents: List[str],
+    embeddings: List[List[float]],
+    days: List[int | None] | None = None,
+) -> int:
+    """
+    번들에서 읽은 청크를 다시 임베딩하지 않고 벡터 메모리에 저장합니다.
+
+    Args:
+        job_id: 작업 ID
+        documents: 청크 텍스트 목록
+        embeddings: 청크 임베딩 목록(documents와 같은 순서)
+        days: 청크별 날짜 서수(documents와 같은 순서, 선택)
+
+    Returns:
+        int: 새로 저장한 청크 수
+    """
+    if days is not None and len(days) != len(documents):
+        days = None
+    return _store_memory_chunks(job_id, documents, embeddings or None, days)
+
+def delete_memory_chunks(job_ids: List[str]) -> int:
+    """
+    작업들의 벡터 메모리 청크를 ChromaDB와 양자화 저장소에서 삭제합니다.
+
+    Args:
+        job_ids: 작업 ID 목록
+
+    Returns:
+        int: 삭제한 청크 수
+    """
+    if not job_ids:
+        return 0
+    _memory_jobs.difference_update(job_ids)
+    deleted = sum(delete_vectors(job_id) for job_id in job_ids if has_vectors(job_id))
+    store = _wait_for_collection()
+    if store is None:
+        return deleted
+    where = {"job_id": job_ids[0]} if len(job_ids) == 1 else {"job_id": {"$in": list(job_ids)}}
+    with CHROMA_LATENCY.time("get"):
+        ids = store.get(where=where, include=[]).get("ids") or []
+    if ids:
+        with CHROMA_LATENCY.time("delete"):
+            store.delete(ids=ids)
+    return deleted + len(ids)
+
+def memory_job_ids() -> set:
+    """
+    이 프로세스가 벡터 메모리에 청크를 저장한 뒤 아직 삭제하지 않은 작업 ID를 반환합니다.
+
+    저장/삭제 때 갱신하는 집합이라 저장소 전체를 조회하지 않습니다. 재시작 전에 저장된 청크나
+    같은 저장소를 쓰는 다른 프로세스의 청크는 포함하지 않습니다(고아로 오인해 지우지 않도록).
+
+    Returns:
+        set: 작업 ID 집합
+    """
+    return set(_memory_jobs)
+
 def confirm_persona_processing(
     job_id: str,
     file_path: str,
@@ -622,12 +1736,18 @@ def confirm_persona_processing(
     """
     확정된 페르소나를 기반으로 메시지 청크를 임베딩 저장합니다.
 
+    청크 ID가 내용 해시이므로 다시 확정해도 이미 저장된 청크는 임베딩하지 않습니다.
+
     Args:
         job_id: 작업 ID
         file_path: 원본 파일 경로
         profile: 페르소나 프로필
         target_speaker: 대상 화자(선택)
     """
+    if not os.path.exists(file_path):
+        # 이미 메모리 구축 후 원본이 삭제된 경우(프로필만 수정한 재확정)
+        logger.info("메모리 구축 생략(이미 저장됨): %s", job_id)
+        return
     logger.info(f"작업 메모리 구축 시작: {job_id}")
     
     # 1. 전체 파일 파싱
@@ -641,39 +1761,429 @@ def confirm_persona_processing(
             logger.error("선택된 화자의 메시지가 없습니다: %s", target_speaker)
             return
 
-    # 2. 청크 분할(맥락 유지를 위해 약 5개 메시지 묶음)
-    chunks = []
-    current_chunk = []
-    for msg in messages:
-        current_chunk.append(f"[{msg['speaker']}] {msg['text']}")
-        if len(current_chunk) >= 5:
-            chunks.append("\n".join(current_chunk))
-            current_chunk = []
-    if current_chunk:
-        chunks.append("\n".join(current_chunk))
+    # 2. 청크 분할(맥락 유지를 위해 약 5개 메시지 묶음, 최근성 재정렬용 날짜 포함)
+    chunks, days = build_dated_memory_chunks(messages)
 
     # 3. 임베딩 및 저장
-    if chunks and collection:
-        logger.info(f"{len(chunks)}개 청크 임베딩 중...")
-        try:
-            embeddings = None
-            if os.getenv("JINA_API_KEY"):
-                embeddings = get_jina_embedding(chunks)
-            collection.add(
-                documents=chunks,
-                embeddings=embeddings,
-                ids=[f"{job_id}_{i}" for i in range(len(chunks))],
-                metadatas=[{"job_id": job_id} for _ in chunks]
-            )
-            logger.info("ChromaDB 저장 완료")
-        except Exception as e:
-            logger.error(f"Chroma 저장 오류: {e}")
+    _store_memory_chunks(job_id, chunks, days=days)
 
     # 4. 원본 파일 삭제
     if os.path.exists(file_path):
         os.remove(file_path)
         logger.info(f"원본 파일 삭제: {file_path}")
 
+def _retrieve_context(
+    message: str,
+    job_id: str | None,
+    query_embedding: List[float] | None = None,
+) -> tuple[str, Dict[str, float]]:
+    """
+    임베딩 생성과 ChromaDB(또는 양자화 저장소) 조회로 RAG 컨텍스트를 가져옵니다(스레드 실행용).
+
+    Args:
+        message: 사용자 메시지
+        job_id: 작업 ID
+        query_embedding: 이미 계산한 메시지 임베딩(있으면 재사용)
+
+    Returns:
+        tuple[str, Dict[str, float]]: 컨텍스트 텍스트와 단계별 소요 시간(ms)
+    """
+    timings: Dict[str, float] = {}
+    context = ""
+    try:
+        where_clause = {"job_id": job_id} if job_id else None
+        documents: List[str] = []
+        distances: List[float | None] = []
+        days: List[int | None] = []
+        if os.getenv("JINA_API_KEY") and query_embedding is None:
+            stage_started = time.perf_counter()
+            query_embedding = get_jina_embedding([message])[0]
+            timings["embedding_ms"] = _elapsed_ms(stage_started)
+        if has_vectors(job_id):
+            if query_embedding is None:
+                logger.warning("질의 임베딩이 없어 양자화 저장소를 조회하지 못했습니다: %s", job_id)
+                return context, timings
+            with MEMORY_VECTOR_LATENCY.time("query") as timer:
+                documents, distances, days = query_vectors(job_id, query_embedding, RAG_CANDIDATES)
+            timings["vector_query_ms"] = round(timer.elapsed * 1000, 2)
+        else:
+            if query_embedding is not None:
+                with CHROMA_LATENCY.time("query") as timer:
+                    results = collection.query(
+                        query_embeddings=[query_embedding],
+                        n_results=RAG_CANDIDATES,
+                        where=where_clause,
+                        include=["documents", "distances", "metadatas"],
+                    )
+            else:
+                with CHROMA_LATENCY.time("query") as timer:
+                    results = collection.query(
+                        query_texts=[message],
+                        n_results=RAG_CANDIDATES,
+                        where=where_clause,
+                        include=["documents", "distances", "metadatas"],
+                    )
+            timings["chroma_query_ms"] = round(timer.elapsed * 1000, 2)
+            if results and results["documents"]:
+                documents = results["documents"][0]
+                distances = (results.get("distances") or [[]])[0] or [None] * len(documents)
+                metadatas = (results.get("metadatas") or [[]])[0] or [None] * len(documents)
+                days = [(metadata or {}).get("day") for metadata in metadatas]
+        if documents:
+            # 후보를 넉넉히 가져와 거리/어휘 겹침/최근성으로 재정렬하고 중복 제거 후 예산만큼 사용
+            stage_started = time.perf_counter()
+            ranked = rerank_chunks(
+                message,
+                documents,
+                distances,
+                days,
+                float(os.getenv("RAG_MAX_DISTANCE", "0.85")),
+                RAG_RECENCY_HALF_LIFE_DAYS,
+                RAG_DEDUP_JACCARD,
+            )
+            selected: List[str] = []
+            used_tokens = 0
+            for candidate in ranked[:RAG_TOP_K]:
+                tokens = _estimate_tokens(candidate["document"])
+                if selected and used_tokens + tokens > RAG_CONTEXT_TOKENS:
+                    break
+                used_tokens += tokens
+                selected.append(candidate["document"])
+            context = sanitize_no_emoji("\n".join(selected))
+            timings["rerank_ms"] = _elapsed_ms(stage_started)
+            timings["rag_candidates"] = len(documents)
+            timings["rag_chunks"] = len(selected)
+            logger.info(f"RAG 컨텍스트 길이: {len(context)}자")
+    except Exception as e:
+        logger.error(f"RAG 조회 오류: {e}")
+    return context, timings
+
+async def _embed_query(message: str, timings: Dict[str, float]) -> List[float] | None:
+    """
+    메시지 임베딩을 스레드에서 계산합니다(응답 캐시와 RAG가 함께 사용, 실패 시 None).
+    """
+    stage_started = time.perf_counter()
+    try:
+        embedding = (await asyncio.to_thread(get_jina_embedding, [message]))[0]
+    except Exception as e:
+        logger.warning("질의 임베딩 실패: %s", str(e))
+        return None
+    timings["embedding_ms"] = _elapsed_ms(stage_started)
+    return embedding
+
+async def _retrieve_context_after(
+    message: str,
+    job_id: str | None,
+    embedding_task: asyncio.Future | None,
+) -> tuple[str, Dict[str, float]]:
+    """
+    공유 질의 임베딩이 준비되면 스레드에서 RAG 컨텍스트를 조회합니다.
+    """
+    query_embedding = await embedding_task if embedding_task is not None else None
+    return await asyncio.to_thread(_retrieve_context, message, job_id, query_embedding)
+
+async def _await_rag_context(
+    rag_task: asyncio.Future,
+    rag_started: float,
+    timings: Dict[str, float],
+) -> str:
+    """
+    RAG 조회 시작 기준 RAG_DEADLINE_MS 안에 결과를 기다리고, 초과 시 빈 컨텍스트를 반환합니다.
+    """
+    wait_started = time.perf_counter()
+    try:
+        if RAG_DEADLINE_MS > 0:
+            remaining = RAG_DEADLINE_MS / 1000 - (wait_started - rag_started)
+            context, rag_timings = await asyncio.wait_for(
+                asyncio.shield(rag_task), timeout=max(remaining, 0)
+            )
+        else:
+            context, rag_timings = await rag_task
+    except asyncio.TimeoutError:
+        RAG_DEADLINE_MISSED.inc()
+        timings["rag_deadline_missed"] = 1
+        logger.warning("RAG 조회 기한(%sms) 초과: 컨텍스트 없이 진행", RAG_DEADLINE_MS)
+        return ""
+    finally:
+        timings["rag_wait_ms"] = _elapsed_ms(wait_started)
+    timings.update(rag_timings)
+    return context
+
+def _cancel_speculative_tasks(*tasks: asyncio.Future | None) -> None:
+    """
+    응답 캐시 적중으로 필요 없어진 선행 작업(임베딩/RAG/인덱스)을 취소합니다.
+
+    이미 끝난 작업의 예외는 회수해 "never retrieved" 경고가 남지 않게 합니다.
+    """
+    for task in tasks:
+        if task is None:
+            continue
+        task.cancel()
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+def build_system_content(
+    persona_report: Dict[str, Any] | None,
+    speaker_name: str | None,
+    style_examples: List[str] | None,
+    dialog_examples: List[Dict[str, str]] | None,
+    style_signature: Dict[str, Any] | None,
+) -> str:
+    """
+    페르소나 리포트 유무에 따라 채팅 시스템 프롬프트를 구성합니다.
+    """
+    if persona_report and speaker_name:
+        normalized = _normalize_persona_report(persona_report)
+        return build_persona_prompt(
+            normalized.get("summary", ""),
+            normalized.get("profile", {}),
+            speaker_name,
+            style_examples or [],
+            dialog_examples or [],
+            style_signature or {},
+        )
+    if speaker_name:
+        return (
+            f"{build_base_system_prompt()}"
+            f"이름은 '{speaker_name}'이다.\n"
+        )
+    return build_base_system_prompt()
+
+async def generate_proactive_message(
+    session_id: str,
+    job_id: str | None,
+    persona_report: Dict[str, Any] | None,
+    speaker_name: str | None,
+    style_examples: List[str] | None = None,
+    dialog_examples: List[Dict[str, str]] | None = None,
+    style_signature: Dict[str, Any] | None = None,
+    idle_seconds: float = 0.0,
+) -> str | None:
+    """
+    대화가 멈춘 세션에 페르소나가 먼저 보낼 메시지를 생성합니다.
+
+    Args:
+        session_id: 세션 ID
+        job_id: 작업 ID
+        persona_report: 페르소나 리포트
+        speaker_name: 화자 이름
+        style_examples: 말투 예시 목록
+        dialog_examples: 대화 예시 목록
+        style_signature: 말투 시그니처 정보
+        idle_seconds: 마지막 대화 이후 경과 예정 시간(초)
+
+    Returns:
+        str | None: 선제 메시지(생성 실패 시 None)
+    """
+    client = get_async_openai_client()
+    if not client:
+        return None
+    messages_payload = [{
+        "role": "system",
+        "content": build_system_content(
+            persona_report, speaker_name, style_examples, dialog_examples, style_signature
+        ),
+    }]
+    messages_payload.extend(_build_few_shot_messages(dialog_examples or []))
+    messages_payload.extend(_get_recent_history(job_id, session_id))
+    messages_payload.append({
+        "role": "user",
+        "content": build_proactive_instruction(int(idle_seconds // 60)),
+    })
+    try:
+        temperature = float(os.getenv("OPENAI_TEMPERATURE", "0.3"))
+    except ValueError:
+        temperature = 0.3
+    try:
+        response = await client.chat.completions.create(
+            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+            messages=messages_payload,
+            temperature=temperature,
+        )
+    except Exception as e:
+        logger.warning("선제 메시지 생성 실패: %s - %s", session_id, str(e))
+        return None
+    content = sanitize_no_emoji(response.choices[0].message.content or "").strip()
+    return content or None
+
+async def _open_until_first_token(
+    client: Any,
+    request: Dict[str, Any],
+) -> Tuple[Any, AsyncIterator[Any], List[Any]]:
+    """
+    스트리밍 요청을 보내고 첫 텍스트 델타(또는 스트림 끝)까지 읽습니다.
+
+    Returns:
+        Tuple: (스트림, 이어서 읽을 청크 이터레이터, 이미 읽은 청크 목록)
+    """
+    stream = await client.chat.completions.create(**request)
+    chunks = stream.__aiter__()
+    buffered: List[Any] = []
+    try:
+        async for chunk in chunks:
+            buffered.append(chunk)
+            if chunk.choices and chunk.choices[0].delta.content:
+                break
+    except BaseException:
+        await _close_stream(stream)
+        raise
+    return stream, chunks, buffered
+
+async def _close_stream(stream: Any) -> None:
+    """
+    업스트림 스트림 연결을 닫습니다(오류는 무시).
+    """
+    try:
+        await stream.close()
+    except Exception as e:
+        logger.debug("스트림 종료 오류: %s", e)
+
+def _without_retries(client: Any) -> Any:
+    """
+    SDK 내부 재시도를 끈 클라이언트를 반환합니다(원본별로 한 번만 만들어 연결 풀 공유).
+
+    헤지 요청이 이미 중복 요청 역할을 하므로, 느린 첫 요청이 내부에서 재시도까지 하면
+    한 턴에 업스트림 요청이 최대 3배가 됩니다.
+    """
+    global _hedge_client, _hedge_client_source
+    if _hedge_client_source is not client:
+        _hedge_client = client.with_options(max_retries=0)
+        _hedge_client_source = client
+    return _hedge_client
+
+async def _open_hedged_stream(
+    client: Any,
+    request: Dict[str, Any],
+    timings: Dict[str, Any],
+) -> Tuple[Any, AsyncIterator[Any], List[Any]]:
+    """
+    첫 토큰 기한 안에서 헤지 요청으로 채팅 스트림을 엽니다.
+
+    CHAT_HEDGE_DELAY_S 안에 첫 토큰이 오지 않거나 첫 요청이 실패하면 두 번째 요청을
+    (OPENAI_FALLBACK_MODEL이 있으면 그 모델로) 보내고, 먼저 첫 토큰을 받은 스트림을 사용합니다.
+    진 스트림은 취소하고 연결을 닫습니다. 헤지를 쓰면 두 요청 모두 SDK 재시도 없이 보냅니다.
+
+    Args:
+        client: 비동기 OpenAI 클라이언트
+        request: chat.completions.create 인자(stream=True)
+        timings: 단계별 지연 기록(hedged, upstream_model 추가)
+
+    Returns:
+        Tuple: (스트림, 이어서 읽을 청크 이터레이터, 이미 읽은 청크 목록)
+
+    Raises:
+        TimeoutError: CHAT_TTFT_DEADLINE_S 안에 첫 토큰을 받지 못했을 때
+        Exception: 모든 요청이 실패했을 때 마지막 오류
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + CHAT_TTFT_DEADLINE_S if CHAT_TTFT_DEADLINE_S > 0 else None
+    hedge_at = started + CHAT_HEDGE_DELAY_S if CHAT_HEDGE_DELAY_S > 0 else None
+    if hedge_at is not None:
+        client = _without_retries(client)
+    primary = asyncio.create_task(_open_until_first_token(client, request))
+    models = {primary: request["model"]}
+    pending = {primary}
+    winner: asyncio.Task | None = None
+    error: BaseException | None = None
+    try:
+        while pending:
+            wake_times = [t for t in (deadline, hedge_at) if t is not None]
+            timeout = max(min(wake_times) - loop.time(), 0) if wake_times else None
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            # 동시에 끝났으면 첫 요청을 우선
+            for task in sorted(done, key=lambda t: t is not primary):
+                if task.exception() is None:
+                    winner = task
+                    break
+                error = task.exception()
+            if winner is not None:
+                break
+            now = loop.time()
+            if deadline is not None and now >= deadline:
+                CHAT_HEDGES.inc(1, "deadline")
+                raise TimeoutError(f"첫 토큰 기한({CHAT_TTFT_DEADLINE_S:g}s)을 넘었습니다")
+            if hedge_at is not None and (now >= hedge_at or not pending):
+                hedge_at = None
+                hedge_request = {**request, "model": OPENAI_FALLBACK_MODEL or request["model"]}
+                hedge = asyncio.create_task(_open_until_first_token(client, hedge_request))
+                models[hedge] = hedge_request["model"]
+                pending.add(hedge)
+                timings["hedged"] = True
+                CHAT_HEDGES.inc(1, "sent")
+        if winner is None:
+            raise error or RuntimeError("업스트림 스트림을 열지 못했습니다")
+        if len(models) > 1:
+            CHAT_HEDGES.inc(1, "primary_won" if winner is primary else "hedge_won")
+        timings["upstream_model"] = models[winner]
+        return winner.result()
+    finally:
+        for task in models:
+            if task is winner:
+                continue
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            elif not task.cancelled() and task.exception() is None:
+                await _close_stream(task.result()[0])
+
+async def _load_reply_index(
+    job_id: str | None,
+    speaker_name: str | None,
+    reply_pairs: List[Dict[str, str]] | None,
+) -> ReplyIndex | None:
+    """
+    실제 대화 쌍 인덱스를 가져오고, 처음이면 스레드에서 구축합니다.
+    """
+    if not reply_pairs:
+        return None
+    index = get_reply_index(job_id, speaker_name, reply_pairs, build=False)
+    if index is None:
+        index = await asyncio.to_thread(get_reply_index, job_id, speaker_name, reply_pairs)
+    return index
+
+def _retrieved_reply_frame(
+    job_id: str | None,
+    session_id: str,
+    reply_index: ReplyIndex,
+    message: str,
+    timings: Dict[str, float],
+) -> str:
+    """
+    실제 대화 쌍에서 답장을 찾아 히스토리에 추가하고 SSE 텍스트 프레임을 만듭니다.
+    """
+    stage_started = time.perf_counter()
+    reply, score = reply_index.reply_for(message)
+    timings["retrieve_ms"] = _elapsed_ms(stage_started)
+    timings["retrieve_score"] = round(score, 3)
+    _append_history(job_id, session_id, message, reply)
+    return sse_event({"text": reply})
+
+def _finish_chat_stream(
+    job_id: str | None,
+    session_id: str,
+    mode: str,
+    timings: Dict[str, float],
+    usage: Dict[str, Any],
+    include_timings: bool,
+) -> str:
+    """
+    채팅 지연 분석 로그를 남기고 마지막 done 이벤트 프레임을 만듭니다.
+    """
+    logger.info(
+        "채팅 지연 분석: %s",
+        json.dumps(
+            {"job_id": job_id, "session_id": session_id, "mode": mode, **timings, **usage},
+            ensure_ascii=False,
+        ),
+    )
+    done_event: Dict[str, Any] = {"done": True}
+    if include_timings:
+        done_event["timings"] = timings
+        done_event["usage"] = usage
+    return f"data: {json.dumps(done_event)}\n\n"
+
 async def stream_chat_response(
     session_id: str,
     message: str,
@@ -685,10 +2195,15 @@ async def stream_chat_response(
     dialog_examples: List[Dict[str, str]] | None = None,
     style_signature: Dict[str, Any] | None = None,
     style_mode: str | None = None,
+    include_timings: bool = False,
+    reply_pairs: List[Dict[str, str]] | None = None,
 ):
     """
     채팅 응답을 스트리밍으로 생성합니다.
 
+    retrieve 모드는 LLM을 호출하지 않고 실제 대화 쌍에서 가장 가까운 상대 발화를 찾아
+    페르소나의 실제 답장을 그대로 보냅니다.
+
     Args:
         session_id: 세션 ID
         message: 사용자 메시지
@@ -699,118 +2214,219 @@ async def stream_chat_response(
         style_examples: 말투 예시 목록
         dialog_examples: 대화 예시 목록
         style_signature: 말투 시그니처 정보
-        style_mode: 스타일 모드(prompt/rag/hybrid)
+        style_mode: 스타일 모드(prompt/rag/hybrid/retrieve)
+        include_timings: 마지막 done 이벤트에 단계별 지연/토큰 수 포함 여부
+        reply_pairs: 실제 대화 쌍 목록(retrieve 모드와 LLM 실패 시 대체 응답용)
     """
-    client = get_openai_client()
+    stream_started = time.perf_counter()
+    timings: Dict[str, float] = {}
+    mode = (style_mode or "hybrid").lower()
+    if mode not in {"prompt", "rag", "hybrid", "retrieve"}:
+        mode = "hybrid"
+
+    if mode == "retrieve":
+        reply_index = await _load_reply_index(job_id, speaker_name, reply_pairs)
+        if reply_index is None:
+            yield f"data: {json.dumps({'error': '검색할 실제 대화가 없습니다.'})}\n\n"
+            return
+        yield _retrieved_reply_frame(job_id, session_id, reply_index, message, timings)
+        timings["completion_ms"] = _elapsed_ms(stream_started)
+        yield _finish_chat_stream(
+            job_id, session_id, mode, timings,
+            {"input_tokens": 0, "output_tokens": 0}, include_timings,
+        )
+        return
+
+    client = get_async_openai_client()
     if not client:
         yield f"data: {json.dumps({'error': 'OpenAI API 키가 필요합니다.'})}\n\n"
         return
-
-    mode = (style_mode or "hybrid").lower()
-    if mode not in {"prompt", "rag", "hybrid"}:
-        mode = "hybrid"
     use_rag = mode in {"rag", "hybrid"}
     use_prompt = mode in {"prompt", "hybrid"}
 
-    # RAG 조회
-    context = ""
-    if use_rag and collection:
-        try:
-            where_clause = {"job_id": job_id} if job_id else None
-            results = None
-            if os.getenv("JINA_API_KEY"):
-                query_embedding = get_jina_embedding([message])[0]
-                results = collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=5,
-                    where=where_clause,
-                )
-            else:
-                results = collection.query(
-                    query_texts=[message],
-                    n_results=5,
-                    where=where_clause,
-                )
-            if results and results["documents"]:
-                distances = results.get("distances") or [[]]
-                min_distance = min(distances[0]) if distances[0] else None
-                max_distance = float(os.getenv("RAG_MAX_DISTANCE", "0.85"))
-                if min_distance is None or min_distance <= max_distance:
-                    context = "\n".join(results["documents"][0])
-                    context = sanitize_no_emoji(context)
-                logger.info(f"RAG 컨텍스트 길이: {len(context)}자")
-        except Exception as e:
-            logger.error(f"RAG 조회 오류: {e}")
-
-    if use_prompt and persona_report and speaker_name:
-        normalized = _normalize_persona_report(persona_report)
-        system_content = build_persona_prompt(
-            normalized.get("summary", ""),
-            normalized.get("profile", {}),
-            speaker_name,
-            style_examples or [],
-            dialog_examples or [],
-            style_signature or {},
-        )
-    elif speaker_name:
-        system_content = (
-            f"{build_base_system_prompt()}"
-            f"이름은 '{speaker_name}'이다.\n"
-        )
-    else:
-        system_content = build_base_system_prompt()
-
-    if context:
-        system_content += (
-            "\n\n과거 대화에서 추출한 관련 컨텍스트:\n"
-            f"{context}\n"
-            "컨텍스트의 말투와 표현을 우선적으로 반영하세요."
+    history_started = time.perf_counter()
+    history_messages = _get_recent_history(job_id, session_id)
+    timings["history_ms"] = _elapsed_ms(history_started)
+
+    # 대화 초반의 짧은 메시지는 페르소나별 응답 캐시에서 바로 반환(후보가 다 모인 경우)
+    # 정규화 키 조회는 즉시 끝나므로 유료 임베딩 등 선행 작업을 시작하기 전에 확인
+    response_scope = None
+    cached = None
+    embed_for_cache = False
+    if is_cacheable(message, len(history_messages)):
+        response_scope = cache_scope(job_id, speaker_name, mode)
+        embed_for_cache = needs_embedding(response_scope, message)
+        if not embed_for_cache:
+            cached = lookup_cached_reply(response_scope, message)
+
+    reply_index = None
+    index_task = None
+    embedding_task = None
+    rag_task = None
+    rag_started = time.perf_counter()
+    query_embedding = None
+    if cached is None:
+        # 대화 쌍 인덱스가 없으면 스레드에서 구축하므로 임베딩/RAG 조회와 동시에 진행
+        if FEW_SHOT_DYNAMIC or CHAT_RETRIEVE_FALLBACK:
+            index_task = asyncio.ensure_future(
+                _load_reply_index(job_id, speaker_name, reply_pairs)
+            )
+        # 질의 임베딩은 응답 캐시와 RAG가 함께 쓰므로 한 번만 계산하고, RAG 조회는 캐시 확인 전에 시작
+        use_memory = use_rag and bool(collection or has_vectors(job_id))
+        if os.getenv("JINA_API_KEY") and (use_memory or embed_for_cache):
+            embedding_task = asyncio.ensure_future(_embed_query(message, timings))
+        if use_memory:
+            rag_task = asyncio.ensure_future(
+                _retrieve_context_after(message, job_id, embedding_task)
+            )
+        if embed_for_cache:
+            if embedding_task is not None:
+                query_embedding = await embedding_task
+            cached = lookup_cached_reply(response_scope, message, query_embedding)
+
+    if cached is not None:
+        _cancel_speculative_tasks(index_task, embedding_task, rag_task)
+        reply, model_ms = cached
+        yield sse_event({"text": reply})
+        _append_history(job_id, session_id, message, reply)
+        timings["response_cache_hit"] = 1
+        timings["first_token_ms"] = timings["completion_ms"] = _elapsed_ms(stream_started)
+        record_cache_saving(model_ms - timings["completion_ms"])
+        yield _finish_chat_stream(
+            job_id, session_id, mode, timings,
+            {"input_tokens": 0, "output_tokens": 0}, include_timings,
         )
+        return
 
-    history_messages = _get_recent_history(job_id, session_id)
-    few_shot_messages = _build_few_shot_messages(dialog_examples or [])
+    stage_started = time.perf_counter()
+    system_content = build_system_content(
+        persona_report if use_prompt else None,
+        speaker_name,
+        style_examples,
+        dialog_examples,
+        style_signature,
+    )
+
+    # 실제 대화 쌍 중 이번 메시지와 비슷한 쌍을 few-shot으로 선택(없으면 고정 예시)
+    few_shot_examples = dialog_examples or []
+    if FEW_SHOT_DYNAMIC and index_task is not None:
+        few_shot_started = time.perf_counter()
+        reply_index = await index_task
+        if reply_index is not None:
+            similar = reply_index.top_pairs(message, FEW_SHOT_K)
+            if similar:
+                few_shot_examples = similar
+        timings["few_shot_ms"] = _elapsed_ms(few_shot_started)
+    few_shot_messages = _build_few_shot_messages(
+        few_shot_examples, FEW_SHOT_K, FEW_SHOT_TOKEN_BUDGET
+    )
     messages_payload = [{"role": "system", "content": system_content}]
     if few_shot_messages:
         messages_payload.extend(few_shot_messages)
     if history_messages:
         messages_payload.extend(history_messages)
     messages_payload.append({"role": "user", "content": message})
+    timings["prompt_ms"] = _elapsed_ms(stage_started)
+
+    if rag_task is not None:
+        context = await _await_rag_context(rag_task, rag_started, timings)
+        if context:
+            messages_payload[0]["content"] += (
+                "\n\n과거 대화에서 추출한 관련 컨텍스트:\n"
+                f"{context}\n"
+                "컨텍스트의 말투와 표현을 우선적으로 반영하세요."
+            )
+    if embedding_task is not None and embedding_task.done():
+        query_embedding = embedding_task.result()
 
+    usage: Dict[str, Any] = {}
+    assistant_text = ""
+    completed = False
+    CHAT_ACTIVE_STREAMS.inc()
     try:
         try:
             temperature = float(os.getenv("OPENAI_TEMPERATURE", "0.3"))
         except ValueError:
             temperature = 0.3
         model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        assistant_text = ""
-        stream = client.chat.completions.create(
-            model=model,
-            messages=messages_payload,
-            temperature=temperature,
-            stream=True
-        )
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                cleaned = sanitize_no_emoji(chunk.choices[0].delta.content)
-                if cleaned:
-                    assistant_text += cleaned
-                    yield f"data: {json.dumps({'text': cleaned})}\n\n"
+        request = {
+            "model": model,
+            "messages": messages_payload,
+            "temperature": temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+
+        def _chunk_text(chunk: Any) -> str:
+            if getattr(chunk, "usage", None):
+                usage.update(
+                    input_tokens=chunk.usage.prompt_tokens,
+                    output_tokens=chunk.usage.completion_tokens,
+                )
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                return ""
+            CHAT_TOKENS_STREAMED.inc()
+            return sanitize_no_emoji(chunk.choices[0].delta.content)
+
+        async def _upstream_deltas():
+            # 첫 토큰을 기다리는 동안에도 하트비트가 나가도록 업스트림 열기도 병합기 안에서 수행
+            stage_started = time.perf_counter()
+            # 첫 토큰까지 기한/헤지 요청을 적용해 가장 먼저 응답한 스트림 사용
+            stream, chunks, buffered = await _open_hedged_stream(client, request, timings)
+            timings["upstream_connect_ms"] = _elapsed_ms(stage_started)
+            try:
+                for chunk in buffered:
+                    cleaned = _chunk_text(chunk)
+                    if cleaned:
+                        yield cleaned
+                async for chunk in chunks:
+                    cleaned = _chunk_text(chunk)
+                    if cleaned:
+                        yield cleaned
+            finally:
+                await _close_stream(stream)
+
+        # 델타를 짧은 시간 창 단위로 묶어 프레임 수를 줄이고, 유휴 시 하트비트 전송
+        frames = 0
+        async for text in coalesce_deltas(_upstream_deltas()):
+            if text is None:
+                yield HEARTBEAT_FRAME
+                continue
+            if not assistant_text:
+                timings["first_token_ms"] = _elapsed_ms(stream_started)
+                CHAT_TTFT.observe(timings["first_token_ms"] / 1000)
+            assistant_text += text
+            frames += 1
+            CHAT_SSE_FRAMES.inc()
+            yield sse_event({"text": text})
+        timings["sse_frames"] = frames
         if assistant_text:
             _append_history(job_id, session_id, message, assistant_text)
+            completed = True
     except Exception as e:
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
-    
-    yield f"data: {json.dumps({'done': True})}\n\n"
-
-def get_agent_poll(session_id: str, enabled: bool):
-    """
-    에이전트 선제 메시지 여부를 반환합니다.
-
-    Args:
-        session_id: 세션 ID
-        enabled: 에이전트 활성화 여부
-
-    Returns:
-        dict: 폴링 결과
-    """
-    return {"should_send": False}
+        # 아무것도 보내지 못했으면 실제 대화 쌍 검색 답장으로 대체(설정 시)
+        if CHAT_RETRIEVE_FALLBACK and not assistant_text and reply_index is None and index_task:
+            reply_index = await index_task
+        if CHAT_RETRIEVE_FALLBACK and not assistant_text and reply_index is not None:
+            logger.warning("LLM 응답 실패로 실제 대화 답장 사용: %s", str(e))
+            timings["retrieve_fallback"] = 1
+            yield _retrieved_reply_frame(job_id, session_id, reply_index, message, timings)
+        else:
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+    finally:
+        CHAT_ACTIVE_STREAMS.dec()
+        CHAT_STREAM_DURATION.observe(time.perf_counter() - stream_started)
+
+    timings["completion_ms"] = _elapsed_ms(stream_started)
+    if completed and response_scope is not None:
+        store_cached_reply(
+            response_scope, message, assistant_text, timings["completion_ms"], query_embedding
+        )
+    if not usage:
+        # 업스트림이 사용량을 주지 않으면 추정값 사용
+        usage = {
+            "input_tokens": sum(_estimate_tokens(m["content"]) for m in messages_payload),
+            "output_tokens": _estimate_tokens(assistant_text),
+            "estimated": True,
+        }
+    yield _finish_chat_stream(job_id, session_id, mode, timings, usage, include_timings)
@@ -0,0 +1,166 @@
+"""
+모듈명: backend.llm_cache
+설명: LLM 응답 영구 캐시(SQLite)
+
+주요 기능:
+- 모델/시스템 프롬프트/입력/응답 형식 해시 기반 캐시 키 생성
+- TTL 만료 및 용량 기반(LRU) 정리
+- LLM_CACHE_ENABLED로 비활성화 가능
+
+의존성:
+- 표준 라이브러리만 사용
+"""
+
+# 1. 표준 라이브러리
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1").lower() not in {"0", "false", "no"}
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+_connection: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+
+def _get_connection() -> sqlite3.Connection:
+    """
+    캐시 DB 연결을 생성하거나 반환합니다.
+    """
+    global _connection
+    if _connection is None:
+        cache_path = os.getenv("LLM_CACHE_PATH")
+        if not cache_path:
+            cache_path = str(Path(__file__).resolve().parent / "data" / "llm_cache.sqlite3")
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        _connection = sqlite3.connect(cache_path, check_same_thread=False)
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        _connection.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed_at)"
+        )
+        _connection.commit()
+    return _connection
+
+
+def make_cache_key(
+    model: str,
+    system_prompt: str,
+    user_content: str,
+    response_format: Dict[str, Any] | None = None,
+) -> str:
+    """
+    LLM 요청 구성 요소로 캐시 키를 생성합니다.
+
+    Args:
+        model: 모델 이름
+        system_prompt: 시스템 프롬프트
+        user_content: 사용자 입력(대화 로그)
+        response_format: 응답 형식 옵션
+
+    Returns:
+        str: SHA-256 해시 문자열
+    """
+    payload = json.dumps(
+        [model, system_prompt, user_content, response_format],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_response(key: str) -> str | None:
+    """
+    캐시된 응답을 조회합니다. 만료된 항목은 삭제합니다.
+
+    Args:
+        key: 캐시 키
+
+    Returns:
+        str | None: 캐시된 응답 본문
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+    now = time.time()
+    try:
+        with _lock:
+            conn = _get_connection()
+            row = conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > LLM_CACHE_TTL_SECONDS:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            conn.commit()
+            return value
+    except sqlite3.Error as e:
+        logger.error("LLM 캐시 조회 오류: %s", e)
+        return None
+
+
+def set_cached_response(key: str, value: str) -> None:
+    """
+    응답을 캐시에 저장하고 TTL/용량 기준으로 정리합니다.
+
+    Args:
+        key: 캐시 키
+        value: 응답 본문
+    """
+    if not LLM_CACHE_ENABLED or not value:
+        return
+    now = time.time()
+    size = len(value.encode("utf-8"))
+    try:
+        with _lock:
+            conn = _get_connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            _evict(conn, now)
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.error("LLM 캐시 저장 오류: %s", e)
+
+
+def _evict(conn: sqlite3.Connection, now: float) -> None:
+    """
+    만료 항목을 삭제하고, 용량 초과 시 오래 사용되지 않은 항목부터 삭제합니다.
+    """
+    conn.execute(
+        "DELETE FROM llm_cache WHERE created_at < ?", (now - LLM_CACHE_TTL_SECONDS,)
+    )
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+    if total <= LLM_CACHE_MAX_BYTES:
+        return
+    evicted = 0
+    for key, size in conn.execute(
+        "SELECT key, size FROM llm_cache ORDER BY accessed_at ASC"
+    ).fetchall():
+        if total <= LLM_CACHE_MAX_BYTES:
+            break
+        conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        total -= size
+        evicted += 1
+    logger.info("LLM 캐시 정리: %s건 삭제", evicted)
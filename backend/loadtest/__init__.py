@@ -0,0 +1,11 @@
+"""
+모듈명: backend.loadtest
+설명: 로컬 부하 테스트 도구 패키지
+
+주요 기능:
+- OpenAI/Jina 호환 가짜 업스트림 서버
+- 업로드→분석→확정→채팅 부하 생성기
+
+의존성:
+- 패키지 단위 정의 파일
+"""
@@ -0,0 +1,256 @@
+"""
+모듈명: backend.loadtest.fake_upstream
+설명: 부하 테스트용 OpenAI/Jina 호환 가짜 업스트림 서버
+
+주요 기능:
+- /v1/chat/completions: 스트리밍/JSON(페르소나 리포트) 응답 모사
+- /v1/embeddings: 결정적 해시 임베딩 반환(OpenAI/Jina 공통 형식)
+- 첫 토큰 지연/초당 토큰 수/오류율/임베딩 지연 설정
+- 일부 요청에만 긴 첫 토큰 지연 주입(꼬리 지연/헤지 요청 검증)
+
+의존성:
+- fastapi: API 프레임워크
+- uvicorn: ASGI 서버
+
+사용 예:
+    python -m backend.loadtest.fake_upstream --port 9100 --ttft-ms 300 --tokens-per-second 40
+    python -m backend.loadtest.fake_upstream --slow-rate 0.05 --slow-ttft-ms 12000
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 JINA_API_URL=http://127.0.0.1:9100/v1/embeddings
+"""
+
+# 1. 표준 라이브러리
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+import uuid
+from typing import Any, Dict, List
+
+# 2. 서드파티 라이브러리
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+EMBEDDING_DIM = 768
+
+DEFAULT_REPLY = "아 진짜? ㅋㅋ 나도 오늘 그거 생각하고 있었는데 이따 저녁에 얘기하자"
+
+FAKE_PERSONA_REPORT: Dict[str, Any] = {
+    "summary": "친구들과 가볍게 농담을 주고받는 편이며 답장이 빠르고 짧다.",
+    "profile": {
+        "nickname_rules": ["이름 끝 글자만 부름"],
+        "speech_style": {
+            "endings": ["~ㅋㅋ", "~지", "~함"],
+            "honorific_level": "informal",
+            "emoji_usage": "low",
+            "punctuation": "short",
+        },
+        "favorite_topics": ["게임", "야식", "주말"],
+        "taboo_topics": ["회사 얘기"],
+        "response_length": "short",
+        "typical_patterns": ["아 진짜", "ㅋㅋㅋ", "그니까"],
+        "few_shot_examples": [{"user": "뭐해", "persona": "그냥 누워있음 ㅋㅋ"}],
+    },
+}
+
+
+def _split_tokens(text: str) -> List[str]:
+    """
+    응답 텍스트를 스트리밍 단위(음절)로 나눕니다.
+    """
+    return list(text)
+
+
+def fake_embedding(text: str, dim: int = EMBEDDING_DIM) -> List[float]:
+    """
+    토큰 해시 기반의 결정적 임베딩을 생성합니다(같은 단어가 많을수록 가까움).
+
+    Args:
+        text: 입력 텍스트
+        dim: 벡터 차원
+
+    Returns:
+        List[float]: 정규화된 임베딩
+    """
+    vector = [0.0] * dim
+    for token in text.split() or [text]:
+        digest = hashlib.md5(token.encode("utf-8")).digest()
+        index = int.from_bytes(digest[:4], "little") % dim
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def create_app(
+    ttft_ms: float = 300.0,
+    tokens_per_second: float = 40.0,
+    error_rate: float = 0.0,
+    embedding_latency_ms: float = 50.0,
+    reply_text: str = DEFAULT_REPLY,
+    slow_rate: float = 0.0,
+    slow_ttft_ms: float = 10000.0,
+) -> FastAPI:
+    """
+    설정값을 반영한 가짜 업스트림 앱을 생성합니다.
+
+    Args:
+        ttft_ms: 첫 토큰까지 지연(ms)
+        tokens_per_second: 초당 스트리밍 토큰 수
+        error_rate: 요청 실패 비율(0~1)
+        embedding_latency_ms: 임베딩 응답 지연(ms)
+        reply_text: 채팅 응답 본문
+        slow_rate: 첫 토큰 지연을 slow_ttft_ms로 늘릴 요청 비율(0~1)
+        slow_ttft_ms: 느린 요청의 첫 토큰까지 지연(ms)
+
+    Returns:
+        FastAPI: 가짜 업스트림 앱
+    """
+    app = FastAPI()
+    token_interval = 1.0 / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    def _error_response() -> JSONResponse:
+        return JSONResponse(
+            status_code=500,
+            content={
+                "error": {
+                    "message": "fake upstream injected error",
+                    "type": "server_error",
+                    "code": None,
+                }
+            },
+        )
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if random.random() < error_rate:
+            return _error_response()
+        model = body.get("model", "fake-model")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        response_format = body.get("response_format") or {}
+        content = (
+            json.dumps(FAKE_PERSONA_REPORT, ensure_ascii=False)
+            if response_format.get("type") == "json_object"
+            else reply_text
+        )
+        tokens = _split_tokens(content)
+        ttft_s = (slow_ttft_ms if random.random() < slow_rate else ttft_ms) / 1000
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", []))
+
+        if not body.get("stream"):
+            await asyncio.sleep(ttft_s + token_interval * len(tokens))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens),
+                },
+            }
+
+        def _chunk(delta: Dict[str, Any], finish_reason: str | None = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        async def _stream():
+            yield _chunk({"role": "assistant", "content": ""})
+            await asyncio.sleep(ttft_s)
+            for index, token in enumerate(tokens):
+                if index:
+                    await asyncio.sleep(token_interval)
+                yield _chunk({"content": token})
+            yield _chunk({}, "stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                usage_payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": len(tokens),
+                        "total_tokens": prompt_tokens + len(tokens),
+                    },
+                }
+                yield f"data: {json.dumps(usage_payload, ensure_ascii=False)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(_stream(), media_type="text/event-stream")
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        if random.random() < error_rate:
+            return _error_response()
+        inputs = body.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        await asyncio.sleep(embedding_latency_ms / 1000)
+        return {
+            "object": "list",
+            "model": body.get("model", "fake-embeddings"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(str(text))}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        }
+
+    @app.get("/health")
+    def health_check():
+        return {"ok": True}
+
+    return app
+
+
+def main() -> None:
+    """
+    CLI 인자로 가짜 업스트림 서버를 실행합니다.
+    """
+    parser = argparse.ArgumentParser(description="OpenAI/Jina 호환 가짜 업스트림 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--ttft-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=50.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ttft-ms", type=float, default=10000.0)
+    args = parser.parse_args()
+
+    app = create_app(
+        ttft_ms=args.ttft_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        embedding_latency_ms=args.embedding_latency_ms,
+        slow_rate=args.slow_rate,
+        slow_ttft_ms=args.slow_ttft_ms,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+모듈명: backend.loadtest.loadgen
+설명: 동시 세션 부하 생성기(업로드→분석→확정→채팅)
+
+주요 기능:
+- N개 세션을 동시에 실행해 전체 API 흐름 재현
+- 채팅 첫 토큰 지연(TTFT), 토큰 간 지연, 처리량, 오류 집계
+- 가짜 업스트림과 backend.main:app을 하위 프로세스로 함께 실행(--spawn)
+
+의존성:
+- httpx: 비동기 HTTP 클라이언트
+
+사용 예:
+    python -m backend.loadtest.loadgen --spawn --sessions 20 --messages 5
+    python -m backend.loadtest.loadgen --base-url http://127.0.0.1:8000 --sessions 50
+"""
+
+# 1. 표준 라이브러리
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+# 2. 서드파티 라이브러리
+import httpx
+
+# 3. 로컬 애플리케이션
+from backend.bench.synthetic import generate_export
+
+CHAT_MESSAGES = ["안녕", "뭐해", "밥 먹었어?", "오늘 뭐 했어", "주말에 뭐함", "잘자"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    최근접 순위 방식으로 백분위수를 계산합니다.
+
+    Args:
+        values: 측정값 목록
+        pct: 백분위(0~100)
+
+    Returns:
+        float: 백분위수(값이 없으면 0)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+async def _wait_for_status(
+    client: httpx.AsyncClient,
+    job_id: str,
+    targets: set,
+    timeout: float,
+) -> Dict[str, Any]:
+    """
+    작업 상태가 목표 상태가 될 때까지 폴링합니다.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        resp = await client.get(f"/jobs/{job_id}")
+        resp.raise_for_status()
+        job = resp.json()
+        if job.get("status") == "error":
+            raise RuntimeError(job.get("error") or "작업 오류")
+        if job.get("status") in targets:
+            return job
+        await asyncio.sleep(0.2)
+    raise TimeoutError(f"작업 대기 시간 초과: {job_id}")
+
+
+async def _stream_chat(
+    client: httpx.AsyncClient,
+    payload: Dict[str, Any],
+    stats: Dict[str, List[float]],
+) -> None:
+    """
+    채팅 스트림 1회를 실행하고 지연 지표를 기록합니다.
+    """
+    started = time.monotonic()
+    first_token_at = None
+    last_token_at = None
+    tokens = 0
+    async with client.stream("POST", "/chat/stream", json=payload) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            data = json.loads(line[6:])
+            if data.get("error"):
+                raise RuntimeError(data["error"])
+            text = data.get("text")
+            if not text:
+                continue
+            now = time.monotonic()
+            if first_token_at is None:
+                first_token_at = now
+                stats["ttft"].append(now - started)
+            else:
+                stats["itl"].append(now - last_token_at)
+            last_token_at = now
+            tokens += len(text)
+    stats["stream_total"].append(time.monotonic() - started)
+    stats["tokens"].append(tokens)
+
+
+async def run_session(
+    client: httpx.AsyncClient,
+    export: bytes,
+    messages: int,
+    stats: Dict[str, List[float]],
+    errors: Dict[str, int],
+    timeout: float,
+) -> None:
+    """
+    세션 1개의 전체 흐름(업로드→분석→확정→채팅)을 실행합니다.
+    """
+    stage = "upload"
+    try:
+        started = time.monotonic()
+        resp = await client.post(
+            "/upload", files={"file": ("KakaoTalk_loadtest.txt", export, "text/plain")}
+        )
+        resp.raise_for_status()
+        job_id = resp.json()["job_id"]
+        job = await _wait_for_status(client, job_id, {"awaiting_selection"}, timeout)
+        stats["upload"].append(time.monotonic() - started)
+
+        stage = "analyze"
+        started = time.monotonic()
+        resp = await client.post(
+            f"/jobs/{job_id}/analyze", json={"target_speaker": job["speakers"][0]}
+        )
+        resp.raise_for_status()
+        job = await _wait_for_status(client, job_id, {"done"}, timeout)
+        stats["analyze"].append(time.monotonic() - started)
+
+        stage = "confirm"
+        resp = await client.post(
+            "/persona/confirm",
+            json={"job_id": job_id, "persona_profile": job["report"]["profile"]},
+        )
+        resp.raise_for_status()
+
+        stage = "chat"
+        session_id = str(uuid.uuid4())
+        for index in range(messages):
+            payload = {
+                "session_id": session_id,
+                "job_id": job_id,
+                "message": CHAT_MESSAGES[index % len(CHAT_MESSAGES)],
+                "agent_enabled": False,
+                "style_mode": "hybrid",
+            }
+            try:
+                await _stream_chat(client, payload, stats)
+            except Exception:
+                errors["chat"] = errors.get("chat", 0) + 1
+    except Exception:
+        errors[stage] = errors.get(stage, 0) + 1
+
+
+def format_report(
+    stats: Dict[str, List[float]],
+    errors: Dict[str, int],
+    elapsed: float,
+) -> Dict[str, Any]:
+    """
+    측정값을 백분위수 요약으로 변환합니다.
+
+    Args:
+        stats: 지표별 측정값
+        errors: 단계별 오류 수
+        elapsed: 전체 소요 시간(초)
+
+    Returns:
+        Dict[str, Any]: 요약 리포트
+    """
+    report: Dict[str, Any] = {"elapsed_s": round(elapsed, 3), "errors": errors}
+    for name in ("upload", "analyze", "ttft", "itl", "stream_total"):
+        values = stats.get(name, [])
+        report[name] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p90_ms": round(percentile(values, 90) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round(max(values) * 1000, 1) if values else 0.0,
+        }
+    total_tokens = sum(stats.get("tokens", []))
+    report["streams"] = len(stats.get("stream_total", []))
+    report["tokens_streamed"] = int(total_tokens)
+    report["tokens_per_s"] = round(total_tokens / elapsed, 1) if elapsed else 0.0
+    return report
+
+
+async def run_load(
+    base_url: str,
+    sessions: int,
+    messages: int,
+    export: bytes,
+    timeout: float = 120.0,
+) -> Dict[str, Any]:
+    """
+    N개 세션을 동시에 실행하고 요약 리포트를 반환합니다.
+
+    Args:
+        base_url: FastAPI 서버 주소
+        sessions: 동시 세션 수
+        messages: 세션당 채팅 메시지 수
+        export: 업로드할 내보내기 파일 내용
+        timeout: 작업 대기 시간 상한(초)
+
+    Returns:
+        Dict[str, Any]: 요약 리포트
+    """
+    stats: Dict[str, List[float]] = {
+        "upload": [], "analyze": [], "ttft": [], "itl": [], "stream_total": [], "tokens": [],
+    }
+    errors: Dict[str, int] = {}
+    limits = httpx.Limits(max_connections=sessions * 2, max_keepalive_connections=sessions)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout, limits=limits
+    ) as client:
+        started = time.monotonic()
+        await asyncio.gather(*[
+            run_session(client, export, messages, stats, errors, timeout)
+            for _ in range(sessions)
+        ])
+        elapsed = time.monotonic() - started
+    return format_report(stats, errors, elapsed)
+
+
+def _wait_until_healthy(url: str, timeout: float = 60.0) -> None:
+    """
+    서버 헬스 체크가 성공할 때까지 대기합니다.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    raise TimeoutError(f"서버 응답 없음: {url}")
+
+
+def spawn_stack(args: argparse.Namespace) -> List[subprocess.Popen]:
+    """
+    가짜 업스트림과 backend.main:app을 하위 프로세스로 실행합니다.
+    """
+    upstream_url = f"http://127.0.0.1:{args.upstream_port}"
+    upstream = subprocess.Popen([
+        sys.executable, "-m", "backend.loadtest.fake_upstream",
+        "--port", str(args.upstream_port),
+        "--ttft-ms", str(args.ttft_ms),
+        "--tokens-per-second", str(args.tokens_per_second),
+        "--error-rate", str(args.error_rate),
+        "--embedding-latency-ms", str(args.embedding_latency_ms),
+        "--slow-rate", str(args.slow_rate),
+        "--slow-ttft-ms", str(args.slow_ttft_ms),
+    ])
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "fake-key",
+        "OPENAI_BASE_URL": f"{upstream_url}/v1",
+        "JINA_API_KEY": "fake-key",
+        "JINA_API_URL": f"{upstream_url}/v1/embeddings",
+        "CHROMA_PATH": tempfile.mkdtemp(prefix="lasttalk_loadtest_chroma_"),
+        "LLM_CACHE_ENABLED": "0",
+    }
+    app = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "backend.main:app",
+            "--port", str(args.app_port), "--log-level", "warning",
+        ],
+        env=env,
+        cwd=str(Path(__file__).resolve().parents[2]),
+    )
+    processes = [upstream, app]
+    try:
+        _wait_until_healthy(f"{upstream_url}/health")
+        _wait_until_healthy(f"http://127.0.0.1:{args.app_port}/health")
+    except Exception:
+        for proc in processes:
+            proc.terminate()
+        raise
+    return processes
+
+
+def main() -> None:
+    """
+    CLI 인자로 부하 테스트를 실행하고 결과를 출력합니다.
+    """
+    parser = argparse.ArgumentParser(description="LastTalk 동시 세션 부하 생성기")
+    parser.add_argument("--base-url", default=None, help="대상 서버 주소(미지정 시 --spawn 필요)")
+    parser.add_argument("--spawn", action="store_true", help="가짜 업스트림과 앱을 함께 실행")
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--upstream-port", type=int, default=9100)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=3)
+    parser.add_argument("--export", default=None, help="업로드할 내보내기 파일(미지정 시 샘플 생성)")
+    parser.add_argument("--export-messages", type=int, default=300)
+    parser.add_argument("--ttft-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=50.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="긴 첫 토큰 지연을 주입할 요청 비율")
+    parser.add_argument("--slow-ttft-ms", type=float, default=10000.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args()
+
+    if not args.base_url and not args.spawn:
+        parser.error("--base-url 또는 --spawn 중 하나가 필요합니다")
+
+    export = (
+        Path(args.export).read_bytes()
+        if args.export
+        else generate_export(args.export_messages).encode("utf-8")
+    )
+    processes: List[subprocess.Popen] = []
+    base_url = args.base_url
+    if args.spawn:
+        processes = spawn_stack(args)
+        base_url = f"http://127.0.0.1:{args.app_port}"
+    try:
+        report = asyncio.run(
+            run_load(base_url, args.sessions, args.messages, export, args.timeout)
+        )
+    finally:
+        for proc in processes:
+            proc.terminate()
+            proc.wait()
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+    print(f"세션 {args.sessions}개, 세션당 메시지 {args.messages}개, 소요 {report['elapsed_s']}s")
+    print(f"스트림 {report['streams']}개, 토큰 {report['tokens_streamed']}개, {report['tokens_per_s']} tok/s")
+    for name in ("upload", "analyze", "ttft", "itl", "stream_total"):
+        row = report[name]
+        print(
+            f"{name:>12}  n={row['count']:<5} p50={row['p50_ms']}ms "
+            f"p90={row['p90_ms']}ms p99={row['p99_ms']}ms max={row['max_ms']}ms"
+        )
+    print(f"오류: {report['errors'] or '없음'}")
+
+
+if __name__ == "__main__":
+    main()
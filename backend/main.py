@@ -4,17 +4,21 @@
 
 주요 기능:
 - 파일 업로드 및 작업 생성
+- 같은 대화방 새 내보내기의 증분 가져오기
+- 페르소나 번들 내보내기/가져오기
 - 페르소나 분석/확정 처리
 - 채팅 스트리밍 API 제공
 - 설정/폴링 API 제공
+- 보존 기한 만료 작업 정리(백그라운드) 및 정리 현황 API
 
 의존성:
 - fastapi: API 프레임워크
-- uvicorn: ASGI 서버
+- uvicorn: ASGI 서버(직접 실행 시에만 임포트)
 - python-dotenv: 환경 변수 로드
 """
 
 # 1. 표준 라이브러리
+import asyncio
 import json
 import logging
 import os
@@ -26,9 +30,8 @@ from pathlib import Path
 # 2. 서드파티 라이브러리
 from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from dotenv import load_dotenv
-import uvicorn
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -40,24 +43,73 @@ load_dotenv(Path(__file__).resolve().parents[1] / ".env", encoding="utf-8-sig")
 from backend.models import (
     JobResponse, PersonaProfile, ChatRequest, Settings, AgentPollResponse
 )
-from backend.parser import parse_kakao_talk
+from backend.agent import (
+    agent_event_stream,
+    cancel_all_sessions,
+    cancel_session,
+    get_agent_poll,
+    start_agent_engine,
+    stop_agent_engine,
+    touch_session,
+)
+from backend.admission import AdmissionRejected, admit, guarded_stream, release_ticket
+from backend.bundle import BUNDLE_MEDIA_TYPE, decode_bundle, encode_bundle, restore_style_state
 from backend.chat import (
+    append_memory_chunks,
+    build_system_content,
+    chroma_status,
+    embedding_model_name,
+    export_memory_chunks,
+    import_memory_chunks,
     generate_persona_report, 
+    generate_persona_reports,
+    merge_style_state,
+    style_artifacts_from_state,
     confirm_persona_processing, 
     stream_chat_response, 
-    get_agent_poll,
-    extract_style_examples,
-    extract_dialog_examples,
-    build_style_signature,
     setup_chroma
 )
+from backend.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    JOB_QUEUE_DEPTH,
+    JOBS_SIZE,
+    PARSE_DURATION,
+    PARSE_LINES_PER_SECOND,
+    render_metrics,
+)
+from backend.reply_index import get_reply_index
+from backend.response_cache import clear_response_cache
+from backend.retention import (
+    retention_status,
+    start_retention_sweeper,
+    stop_retention_sweeper,
+    touch_job,
+)
+from backend.workers import (
+    REPLY_PAIRS_MAX,
+    analyze_all_speakers,
+    analyze_speaker,
+    parse_incremental,
+    parse_upload,
+    read_messages_by_speaker,
+    read_room_fingerprint,
+    run_cpu_bound,
+    scan_upload,
+    shutdown_process_pool,
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # 시작 처리
-    setup_chroma()
+    # 시작 처리(벡터 저장소는 시작을 막지 않도록 백그라운드에서 열기)
+    chroma_task = asyncio.create_task(asyncio.to_thread(setup_chroma))
+    start_agent_engine()
+    start_retention_sweeper(jobs, rooms)
     yield
     # 종료 처리
+    await stop_retention_sweeper()
+    await stop_agent_engine()
+    await chroma_task
+    shutdown_process_pool()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -72,30 +124,56 @@ app.add_middleware(
 
 # 메모리 작업 저장소(MVP)
 jobs = {}
-settings = Settings(agent_enabled=False)
+# 대화방 식별자 -> 최근 작업 ID(증분 가져오기용)
+rooms = {}
+settings = Settings(agent_enabled=os.getenv("AGENT_ENABLED", "0") == "1")
+JOBS_SIZE.set_function(lambda: len(jobs))
+JOB_QUEUE_DEPTH.set_function(
+    lambda: sum(1 for job in list(jobs.values()) if job.get("status") in {"queued", "running"})
+)
 
-def _extract_speakers(messages: list[dict]) -> list[str]:
+@app.get("/health")
+def health_check():
     """
-    메시지 목록에서 화자 목록을 추출합니다.
+    프로세스 생존 여부(liveness)를 확인합니다. 외부 의존성은 확인하지 않습니다.
 
-    Args:
-        messages: 파싱된 메시지 목록
+    Returns:
+        dict: 정상 여부
+    """
+    return {"ok": True}
+
+@app.get("/health/ready")
+def readiness_check():
+    """
+    요청을 처리할 준비(readiness)가 되었는지 확인합니다.
 
     Returns:
-        list[str]: 정렬된 화자 목록
+        dict | JSONResponse: 벡터 저장소 준비 상태(준비 전이면 503)
     """
-    speakers = {m.get("speaker") for m in messages if m.get("speaker")}
-    return sorted(speakers)
+    status = chroma_status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content={"ok": False, **status})
+    return {"ok": True, **status}
 
-@app.get("/health")
-def health_check():
+@app.get("/metrics")
+def metrics():
     """
-    헬스 체크용 엔드포인트입니다.
+    Prometheus 텍스트 형식 지표를 반환합니다.
 
     Returns:
-        dict: 정상 여부
+        PlainTextResponse: 지표 텍스트
     """
-    return {"ok": True}
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/retention")
+def retention():
+    """
+    보존 기한 설정과 만료 데이터 정리 결과(삭제 수, 회수 용량)를 반환합니다.
+
+    Returns:
+        dict: settings, last_sweep, totals
+    """
+    return retention_status()
 
 @app.post("/upload")
 async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
@@ -125,9 +203,24 @@ async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File
         "selected_speaker": None,
         "style_examples": [],
         "dialog_examples": [],
+        "reply_pairs": [],
         "style_signature": {},
     }
+    touch_job(jobs[job_id])
     
+    await _save_upload(file, temp_path)
+    logger.info("업로드 저장: 경로=%s 크기=%s", temp_path, temp_path.stat().st_size)
+        
+    background_tasks.add_task(process_upload, job_id)
+    return {"job_id": job_id}
+
+async def _save_upload(file: UploadFile, temp_path: Path):
+    """
+    업로드 파일 내용을 임시 경로에 저장합니다.
+
+    Raises:
+        HTTPException: 파일이 비어 있을 때
+    """
     try:
         contents = await file.read()
         if not contents:
@@ -135,43 +228,250 @@ async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File
         temp_path.write_bytes(contents)
     finally:
         await file.close()
-    logger.info("업로드 저장: 경로=%s 크기=%s", temp_path, temp_path.stat().st_size)
-        
-    background_tasks.add_task(process_upload, job_id)
+
+@app.post("/import")
+async def import_file(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    """
+    같은 대화방의 새 내보내기 파일을 기존 작업에 증분으로 가져옵니다.
+
+    파일 앞부분으로 대화방을 식별하고, 이전 내보내기 이후의 메시지만 파싱/임베딩합니다.
+
+    Args:
+        background_tasks: FastAPI 백그라운드 작업 관리자
+        file: 새 내보내기 텍스트 파일
+
+    Returns:
+        dict: 기존 작업 ID
+
+    Raises:
+        HTTPException: 같은 대화방의 분석 완료된 작업이 없거나 가져오기가 진행 중일 때
+    """
+    safe_name = Path(file.filename).name
+    temp_path = Path(tempfile.gettempdir()) / f"import_{uuid.uuid4()}_{safe_name}"
+    await _save_upload(file, temp_path)
+    fingerprint = await run_cpu_bound(read_room_fingerprint, str(temp_path))
+    job_id = rooms.get(fingerprint)
+    job = jobs.get(job_id) if job_id else None
+    if not job or job.get("status") != "done" or not job.get("import_state"):
+        temp_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=404,
+            detail="같은 대화방의 분석 완료된 작업이 없습니다. 새로 업로드하세요",
+        )
+    if (job.get("last_import") or {}).get("status") == "running":
+        temp_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=409, detail="이미 가져오기가 진행 중입니다")
+    job["last_import"] = {"status": "running"}
+    touch_job(job)
+    background_tasks.add_task(process_incremental_import, job_id, str(temp_path))
     return {"job_id": job_id}
 
+async def process_incremental_import(job_id: str, file_path: str):
+    """
+    새 내보내기에서 추가된 메시지만 반영합니다.
+
+    말투 시그니처/키워드/자주 쓰는 구절은 집계 상태에 새 메시지만 더해 갱신하고,
+    이미 확정된 작업이면 새 메시지만 청크로 묶어 벡터 메모리에 추가합니다.
+
+    Args:
+        job_id: 작업 ID
+        file_path: 새 내보내기 파일 경로
+    """
+    job = jobs[job_id]
+    keep_file = False
+    try:
+        logger.info("증분 가져오기 시작: %s", job_id)
+        with PARSE_DURATION.time("incremental"):
+            result = await run_cpu_bound(parse_incremental, file_path, job["import_state"])
+        new_messages = result["new_messages"]
+
+        personas = job.get("personas") or {}
+        for speaker, delta in result["style_states"].items():
+            persona = personas.get(speaker)
+            if not persona or not persona.get("style_state"):
+                continue
+            previous = style_artifacts_from_state(persona["style_state"])
+            current = style_artifacts_from_state(merge_style_state(persona["style_state"], delta))
+            persona["style_signature"] = current["style_signature"]
+            # 사용자가 직접 편집하지 않은 자동 추출 항목만 갱신
+            profile = persona["report"].setdefault("profile", {})
+            if profile.get("favorite_topics") == previous["local_keywords"]:
+                profile["favorite_topics"] = current["local_keywords"]
+            if profile.get("typical_patterns") == previous["common_phrases"]:
+                profile["typical_patterns"] = current["common_phrases"]
+        for speaker, pairs in result["reply_pairs"].items():
+            persona = personas.get(speaker)
+            if persona is None:
+                continue
+            known = {(pair["user"], pair["persona"]) for pair in persona.get("reply_pairs") or []}
+            merged = (persona.get("reply_pairs") or []) + [
+                pair for pair in pairs if (pair["user"], pair["persona"]) not in known
+            ]
+            persona["reply_pairs"] = merged[-REPLY_PAIRS_MAX:] if REPLY_PAIRS_MAX > 0 else []
+        selected = job.get("selected_speaker")
+        if selected in personas:
+            job["style_signature"] = personas[selected]["style_signature"]
+            job["reply_pairs"] = personas[selected].get("reply_pairs") or []
+        job["speakers"] = sorted(set(job.get("speakers") or []) | set(result["speakers"]))
+
+        embedded = 0
+        if os.path.exists(job["file_path"]):
+            # 아직 확정 전이면 새 파일로 교체해 확정 시 전체를 저장
+            os.remove(job["file_path"])
+            job["file_path"] = file_path
+            keep_file = True
+        elif selected:
+            target_messages = [m for m in new_messages if m.get("speaker") == selected]
+            embedded = await asyncio.to_thread(append_memory_chunks, job_id, target_messages)
+
+        job["import_state"] = result["import_state"]
+        clear_response_cache(job_id)
+        await asyncio.to_thread(_warm_reply_index, job_id)
+        job["last_import"] = {
+            "status": "done",
+            "new_messages": len(new_messages),
+            "embedded_chunks": embedded,
+            "full_scan": result["full_scan"],
+        }
+        logger.info("증분 가져오기 완료: %s (새 메시지 %s건)", job_id, len(new_messages))
+    except Exception as e:
+        logger.error("증분 가져오기 오류: %s - %s", job_id, str(e))
+        job["last_import"] = {"status": "error", "error": str(e)}
+    finally:
+        if not keep_file and os.path.exists(file_path):
+            os.remove(file_path)
+
 async def process_upload(job_id: str):
     """
-    업로드 파일을 파싱하고 화자 목록을 추출합니다.
+    업로드 파일에서 화자 목록을 먼저 빠르게 추출해 선택 화면을 열고, 전체 파싱은 이어서 진행합니다.
+
+    사전 스캔은 메시지 본문을 만들지 않고 화자/메시지 수/첫·마지막 시각만 계산합니다.
+    전체 파싱은 증분 가져오기 상태를 만들고, 표본 스캔이었다면 화자 목록을 보정합니다.
 
     Args:
         job_id: 작업 ID
     """
+    job = jobs[job_id]
+    shown = False
     try:
         logger.info("작업 백그라운드 시작: %s", job_id)
-        jobs[job_id]["status"] = "running"
-        jobs[job_id]["progress"] = 10
-        
-        file_path = jobs[job_id]["file_path"]
-        logger.info("파일 파싱: %s", file_path)
-        messages = parse_kakao_talk(file_path)
-        logger.info("메시지 %s건 파싱", len(messages))
-        speakers = _extract_speakers(messages)
+        job["status"] = "running"
+        job["progress"] = 10
+
+        file_path = job["file_path"]
+        logger.info("화자 사전 스캔: %s", file_path)
+        with PARSE_DURATION.time("speaker_scan"):
+            scanned = await run_cpu_bound(scan_upload, file_path)
+        if scanned["speakers"]:
+            job["speakers"] = scanned["speakers"]
+            job["speaker_stats"] = scanned["speaker_stats"]
+            job["speakers_partial"] = scanned["sampled"]
+            job["progress"] = 30
+            job["status"] = "awaiting_selection"
+            shown = True
+            logger.info("참여자 %s명 추출(사전 스캔): %s", len(scanned["speakers"]), scanned["speakers"])
+        elif not scanned["sampled"]:
+            raise ValueError("참여자 목록을 추출할 수 없습니다")
+
+        with PARSE_DURATION.time("upload") as timer:
+            parsed = await run_cpu_bound(parse_upload, file_path)
+        if timer.elapsed > 0:
+            PARSE_LINES_PER_SECOND.observe(parsed["line_count"] / timer.elapsed)
+        logger.info("메시지 %s건 파싱", parsed["message_count"])
+        speakers = parsed["speakers"]
         if not speakers:
             raise ValueError("참여자 목록을 추출할 수 없습니다")
 
-        jobs[job_id]["speakers"] = speakers
-        jobs[job_id]["progress"] = 30
-        jobs[job_id]["status"] = "awaiting_selection"
-        logger.info("참여자 %s명 추출: %s", len(speakers), speakers)
-        
+        job["import_state"] = parsed["import_state"]
+        rooms[parsed["import_state"]["fingerprint"]] = job_id
+        if not shown or job.get("speakers_partial"):
+            job["speakers"] = speakers
+            job["speaker_stats"] = parsed["speaker_stats"]
+            job["speakers_partial"] = False
+        if not shown:
+            job["progress"] = 30
+            job["status"] = "awaiting_selection"
+            logger.info("참여자 %s명 추출: %s", len(speakers), speakers)
+
     except Exception as e:
+        if shown:
+            # 화자 선택은 이미 가능하므로 작업은 유지(증분 가져오기만 사용할 수 없음)
+            logger.warning("전체 파싱 실패(화자 목록 유지): %s - %s", job_id, str(e))
+            job["speakers_partial"] = False
+            return
         logger.error("작업 처리 오류: %s - %s", job_id, str(e))
-        jobs[job_id]["status"] = "error"
-        jobs[job_id]["error"] = str(e)
+        job["status"] = "error"
+        job["error"] = str(e)
         # 오류 발생 시 정리
-        if os.path.exists(jobs[job_id]["file_path"]):
-            os.remove(jobs[job_id]["file_path"])
+        if os.path.exists(job["file_path"]):
+            os.remove(job["file_path"])
+
+def _persona_from_analysis(analysis: dict, report: dict) -> dict:
+    """
+    분석 결과에서 채팅에 필요한 화자별 페르소나 데이터만 추립니다.
+    """
+    return {
+        "report": report,
+        "style_examples": analysis["style_examples"],
+        "dialog_examples": analysis["dialog_examples"],
+        "reply_pairs": analysis["reply_pairs"],
+        "style_signature": analysis["style_signature"],
+        "timing_profile": analysis["timing_profile"],
+        "style_state": analysis["style_state"],
+    }
+
+def _warm_reply_index(job_id: str) -> None:
+    """
+    첫 채팅이 구축을 기다리지 않도록 현재 페르소나의 대화 쌍 인덱스를 미리 만듭니다(스레드 실행용).
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return
+    get_reply_index(
+        job_id, job.get("selected_speaker") or "페르소나", job.get("reply_pairs") or []
+    )
+
+def _apply_persona(job_id: str, speaker: str):
+    """
+    저장된 화자별 페르소나를 작업의 현재 페르소나로 지정합니다.
+    """
+    job = jobs[job_id]
+    persona = job["personas"][speaker]
+    job.update(persona)
+    job["selected_speaker"] = speaker
+    job["analyzed_speakers"] = list(job["personas"])
+    job["progress"] = 100
+    job["status"] = "done"
+
+def _build_bundle(job: dict) -> bytes:
+    """
+    현재 페르소나와 벡터 메모리를 번들 바이너리로 만듭니다(스레드 실행용).
+    """
+    speaker = job.get("selected_speaker")
+    documents, embeddings, days = export_memory_chunks(job["job_id"])
+    persona = {
+        "job_id": job["job_id"],
+        "speaker": speaker,
+        "speakers": job.get("speakers") or [],
+        "report": job.get("report"),
+        "style_examples": job.get("style_examples") or [],
+        "dialog_examples": job.get("dialog_examples") or [],
+        "reply_pairs": job.get("reply_pairs") or [],
+        "style_signature": job.get("style_signature") or {},
+        "timing_profile": job.get("timing_profile"),
+        "style_state": job.get("style_state"),
+        "import_state": job.get("import_state"),
+        "system_prompt": build_system_content(
+            job.get("report"),
+            speaker,
+            job.get("style_examples"),
+            job.get("dialog_examples"),
+            job.get("style_signature"),
+        ),
+        "embedding_model": embedding_model_name(),
+        "chunk_days": days,
+    }
+    return encode_bundle(persona, documents, embeddings)
 
 async def process_analysis(job_id: str, target_speaker: str):
     """
@@ -184,26 +484,90 @@ async def process_analysis(job_id: str, target_speaker: str):
     try:
         file_path = jobs[job_id]["file_path"]
         logger.info("페르소나 리포트 생성: %s (%s)", job_id, target_speaker)
-        messages = parse_kakao_talk(file_path)
-        target_messages = [
-            m for m in messages if m.get("speaker") == target_speaker
-        ]
-        if not target_messages:
+        with PARSE_DURATION.time("analysis"):
+            analysis = await run_cpu_bound(analyze_speaker, file_path, target_speaker)
+        if not analysis["message_count"]:
             raise ValueError("선택된 화자의 메시지가 없습니다")
+        report_messages = analysis["report_messages"]
+        if report_messages is None:
+            # map_reduce 모드만 전체 메시지가 필요하므로 이때만 다시 읽음
+            by_speaker = await asyncio.to_thread(
+                read_messages_by_speaker, file_path, [target_speaker]
+            )
+            report_messages = by_speaker.get(target_speaker, [])
         jobs[job_id]["progress"] = 70
-        report = await generate_persona_report(target_messages, require_openai=True)
-        jobs[job_id]["style_examples"] = extract_style_examples(target_messages, 5)
-        jobs[job_id]["dialog_examples"] = extract_dialog_examples(messages, target_speaker, 3)
-        jobs[job_id]["style_signature"] = build_style_signature(target_messages)
-        jobs[job_id]["report"] = report
-        jobs[job_id]["progress"] = 100
-        jobs[job_id]["status"] = "done"
+        report = await generate_persona_report(
+            report_messages,
+            require_openai=True,
+            local_keywords=analysis["local_keywords"],
+            common_phrases=analysis["common_phrases"],
+            sample_messages=analysis["persona_sample"],
+            fallback_summary=analysis["fallback_summary"],
+        )
+        personas = jobs[job_id].setdefault("personas", {})
+        personas[target_speaker] = _persona_from_analysis(analysis, report)
+        _apply_persona(job_id, target_speaker)
         logger.info("작업 완료: %s", job_id)
     except Exception as e:
         logger.error("분석 처리 오류: %s - %s", job_id, str(e))
         jobs[job_id]["status"] = "error"
         jobs[job_id]["error"] = str(e)
 
+async def process_batch_analysis(job_id: str, preferred_speaker: str | None = None):
+    """
+    모든 화자의 페르소나 리포트를 한 번에 생성합니다.
+
+    파일은 한 번만 파싱하고, 화자별 리포트는 동시 호출 수를 제한해 병렬로 생성합니다.
+
+    Args:
+        job_id: 작업 ID
+        preferred_speaker: 완료 후 현재 페르소나로 지정할 화자(없으면 메시지가 가장 많은 화자)
+    """
+    try:
+        file_path = jobs[job_id]["file_path"]
+        logger.info("전체 화자 페르소나 리포트 생성: %s", job_id)
+        with PARSE_DURATION.time("batch_analysis"):
+            analyses = await run_cpu_bound(analyze_all_speakers, file_path)
+        if not analyses:
+            raise ValueError("분석할 화자가 없습니다")
+        if any(analysis["report_messages"] is None for analysis in analyses.values()):
+            # map_reduce 모드만 전체 메시지가 필요하므로 이때만 한 번 다시 읽어 화자별로 나눔
+            by_speaker = await asyncio.to_thread(read_messages_by_speaker, file_path)
+            for speaker, analysis in analyses.items():
+                analysis["report_messages"] = by_speaker.get(speaker, [])
+        jobs[job_id]["progress"] = 70
+        personas = jobs[job_id].setdefault("personas", {})
+        completed = 0
+
+        def _on_complete(speaker: str, report: dict | None, error: Exception | None):
+            nonlocal completed
+            completed += 1
+            jobs[job_id]["progress"] = 70 + 29 * completed // len(analyses)
+            if report is not None:
+                personas[speaker] = _persona_from_analysis(analyses[speaker], report)
+                jobs[job_id]["analyzed_speakers"] = list(personas)
+
+        results = await generate_persona_reports(
+            analyses, require_openai=True, on_complete=_on_complete
+        )
+        errors = [
+            f"{speaker}: {result}"
+            for speaker, result in results.items()
+            if isinstance(result, Exception)
+        ]
+        if len(errors) == len(results):
+            raise RuntimeError(errors[0])
+        if errors:
+            logger.warning("일부 화자 분석 실패: %s - %s", job_id, "; ".join(errors))
+        if preferred_speaker not in personas:
+            preferred_speaker = next(s for s in analyses if s in personas)
+        _apply_persona(job_id, preferred_speaker)
+        logger.info("전체 화자 작업 완료: %s (%d명)", job_id, len(personas))
+    except Exception as e:
+        logger.error("전체 화자 분석 처리 오류: %s - %s", job_id, str(e))
+        jobs[job_id]["status"] = "error"
+        jobs[job_id]["error"] = str(e)
+
 @app.get(
     "/jobs/{job_id}",
     response_model=JobResponse,
@@ -235,10 +599,13 @@ async def analyze_job(
     """
     선택된 화자로 분석을 시작합니다.
 
+    `all_speakers`가 true이면 모든 화자를 한 번에 분석하고, 이미 분석된 화자를
+    선택하면 다시 분석하지 않고 바로 전환합니다.
+
     Args:
         job_id: 작업 ID
         background_tasks: FastAPI 백그라운드 작업 관리자
-        payload: 요청 본문(화자 정보 포함)
+        payload: 요청 본문(target_speaker, all_speakers)
 
     Returns:
         dict: 처리 결과
@@ -249,12 +616,24 @@ async def analyze_job(
     if job_id not in jobs:
         raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
     target_speaker = payload.get("target_speaker")
-    if not target_speaker:
+    all_speakers = bool(payload.get("all_speakers"))
+    if not target_speaker and not all_speakers:
         raise HTTPException(status_code=400, detail="target_speaker가 필요합니다")
+    touch_job(jobs[job_id])
     speakers = jobs[job_id].get("speakers") or []
-    if target_speaker not in speakers:
+    if target_speaker and target_speaker not in speakers:
         raise HTTPException(status_code=400, detail="선택한 화자가 목록에 없습니다")
 
+    if all_speakers:
+        jobs[job_id]["status"] = "running"
+        jobs[job_id]["progress"] = 60
+        background_tasks.add_task(process_batch_analysis, job_id, target_speaker)
+        return {"ok": True}
+
+    if target_speaker in (jobs[job_id].get("personas") or {}):
+        _apply_persona(job_id, target_speaker)
+        return {"ok": True}
+
     jobs[job_id]["selected_speaker"] = target_speaker
     jobs[job_id]["status"] = "running"
     jobs[job_id]["progress"] = 60
@@ -295,9 +674,16 @@ async def confirm_persona(background_tasks: BackgroundTasks, payload: dict):
     if job_id not in jobs:
         raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
 
+    touch_job(jobs[job_id])
     if profile_data and jobs[job_id].get("report"):
         jobs[job_id]["report"]["profile"] = profile_data
-        
+    # 프로필이 바뀌었으므로 이전 페르소나로 만든 캐시 응답은 폐기
+    clear_response_cache(job_id)
+    background_tasks.add_task(_warm_reply_index, job_id)
+
+    if not os.path.exists(jobs[job_id]["file_path"]):
+        # 메모리가 이미 구축됐으면 프로필만 반영하고 임베딩은 하지 않음
+        return {"ok": True}
     background_tasks.add_task(
         confirm_persona_processing, 
         job_id, 
@@ -307,11 +693,112 @@ async def confirm_persona(background_tasks: BackgroundTasks, payload: dict):
     )
     return {"ok": True}
 
+@app.get("/jobs/{job_id}/bundle")
+async def export_bundle(job_id: str):
+    """
+    확정된 페르소나를 다른 노드로 옮길 수 있는 번들 파일로 내보냅니다.
+
+    번들에는 리포트/예시/컴파일된 시스템 프롬프트와 메모리 청크, 임베딩 행렬이 들어갑니다.
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        Response: 번들 바이너리
+
+    Raises:
+        HTTPException: 작업이 없거나 페르소나가 확정되지 않았거나 벡터 저장소가 준비되지 않았을 때
+    """
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    if job.get("status") != "done" or not job.get("report"):
+        raise HTTPException(status_code=400, detail="페르소나 분석이 완료되지 않았습니다")
+    if os.path.exists(job.get("file_path") or ""):
+        raise HTTPException(status_code=400, detail="페르소나를 확정한 뒤 내보낼 수 있습니다")
+    if not chroma_status()["ready"]:
+        raise HTTPException(status_code=503, detail="벡터 저장소가 준비되지 않았습니다")
+    data = await asyncio.to_thread(_build_bundle, job)
+    return Response(
+        content=data,
+        media_type=BUNDLE_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{job_id}.ltpb"'},
+    )
+
+@app.post("/bundles")
+async def import_bundle(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    """
+    번들 파일로 페르소나를 복원합니다. 파싱/분석/임베딩 없이 바로 채팅할 수 있습니다.
+
+    원래 작업 ID가 비어 있으면 그대로 쓰고, 이미 있으면 새 작업 ID를 만듭니다.
+
+    Args:
+        background_tasks: FastAPI 백그라운드 작업 관리자
+        file: 번들 파일
+
+    Returns:
+        dict: 복원된 작업 ID와 저장한 청크 수
+
+    Raises:
+        HTTPException: 번들 형식이 잘못됐거나 임베딩 모델이 다르거나 벡터 저장소가 준비되지 않았을 때
+    """
+    if not chroma_status()["ready"]:
+        raise HTTPException(status_code=503, detail="벡터 저장소가 준비되지 않았습니다")
+    try:
+        data = await file.read()
+    finally:
+        await file.close()
+    try:
+        persona, documents, embeddings = await asyncio.to_thread(decode_bundle, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if documents and persona.get("embedding_model") != embedding_model_name():
+        raise HTTPException(
+            status_code=400,
+            detail=f"임베딩 모델이 다릅니다: {persona.get('embedding_model')}",
+        )
+
+    job_id = persona.get("job_id")
+    if not job_id or job_id in jobs:
+        job_id = str(uuid.uuid4())
+    speaker = persona.get("speaker")
+    stored = await asyncio.to_thread(
+        import_memory_chunks, job_id, documents, embeddings, persona.get("chunk_days")
+    )
+    jobs[job_id] = {
+        "job_id": job_id,
+        "status": "done",
+        "progress": 100,
+        "file_path": "",
+        "speakers": persona.get("speakers") or [],
+        "import_state": persona.get("import_state"),
+        "personas": {
+            speaker: {
+                "report": persona.get("report"),
+                "style_examples": persona.get("style_examples") or [],
+                "dialog_examples": persona.get("dialog_examples") or [],
+                "reply_pairs": persona.get("reply_pairs") or [],
+                "style_signature": persona.get("style_signature") or {},
+                "timing_profile": persona.get("timing_profile"),
+                "style_state": restore_style_state(persona.get("style_state")),
+            }
+        },
+    }
+    _apply_persona(job_id, speaker)
+    touch_job(jobs[job_id])
+    if persona.get("import_state"):
+        rooms[persona["import_state"]["fingerprint"]] = job_id
+    background_tasks.add_task(_warm_reply_index, job_id)
+    logger.info("번들 복원: %s (청크 %s개)", job_id, stored)
+    return {"job_id": job_id, "chunks": stored}
+
 @app.post("/chat/stream")
 async def chat_stream(req: ChatRequest):
     """
     채팅 스트리밍 응답을 반환합니다.
 
+    같은 세션의 이전 스트림은 중단되고, 동시 스트림 한도를 넘으면 대기열에서 기다립니다.
+
     Args:
         req: 채팅 요청 데이터
 
@@ -319,28 +806,58 @@ async def chat_stream(req: ChatRequest):
         StreamingResponse: SSE 스트리밍 응답
 
     Raises:
-        HTTPException: 작업 상태가 유효하지 않을 때
+        HTTPException: 작업 상태가 유효하지 않거나 입장이 거절됐을 때(429는 Retry-After 포함)
     """
     if req.job_id not in jobs:
         raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
     job = jobs[req.job_id]
     if job.get("status") != "done" or not job.get("report"):
         raise HTTPException(status_code=400, detail="페르소나 분석이 완료되지 않았습니다")
-    return StreamingResponse(
-        stream_chat_response(
-            req.session_id,
-            req.message,
-            req.agent_enabled,
-            req.job_id,
-            job.get("report"),
-            job.get("selected_speaker") or "페르소나",
-            job.get("style_examples") or [],
-            job.get("dialog_examples") or [],
-            job.get("style_signature") or {},
-            req.style_mode,
-        ),
-        media_type="text/event-stream"
-    )
+    touch_job(job)
+    try:
+        ticket = await admit(req.session_id, req.job_id)
+    except AdmissionRejected as e:
+        headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+        raise HTTPException(status_code=e.status_code, detail=e.reason, headers=headers)
+    try:
+        if req.agent_enabled and settings.agent_enabled:
+            touch_session(req.session_id, {
+                "job_id": req.job_id,
+                "persona_report": job.get("report"),
+                "speaker_name": job.get("selected_speaker") or "페르소나",
+                "style_examples": job.get("style_examples") or [],
+                "dialog_examples": job.get("dialog_examples") or [],
+                "style_signature": job.get("style_signature") or {},
+                "timing_profile": job.get("timing_profile"),
+            })
+        else:
+            cancel_session(req.session_id)
+        release_tasks = BackgroundTasks()
+        release_tasks.add_task(release_ticket, ticket)
+        return StreamingResponse(
+            guarded_stream(ticket, stream_chat_response(
+                req.session_id,
+                req.message,
+                req.agent_enabled,
+                req.job_id,
+                job.get("report"),
+                job.get("selected_speaker") or "페르소나",
+                job.get("style_examples") or [],
+                job.get("dialog_examples") or [],
+                job.get("style_signature") or {},
+                req.style_mode,
+                req.include_timings,
+                job.get("reply_pairs") or [],
+            )),
+            media_type="text/event-stream",
+            # 프록시 버퍼링을 끄고 병합된 프레임을 즉시 전달
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            # 본문 전송 전에 연결이 끊겨 guarded_stream이 시작되지 않아도 슬롯 반납
+            background=release_tasks,
+        )
+    except BaseException:
+        ticket.release()
+        raise
 
 @app.get("/settings", response_model=Settings)
 def get_settings():
@@ -365,6 +882,8 @@ def update_settings(new_settings: Settings):
     """
     global settings
     settings = new_settings
+    if not settings.agent_enabled:
+        cancel_all_sessions()
     return settings
 
 @app.get("/agent/poll", response_model=AgentPollResponse)
@@ -380,5 +899,24 @@ def agent_poll(session_id: str):
     """
     return get_agent_poll(session_id, settings.agent_enabled)
 
+@app.get("/agent/stream")
+def agent_stream(session_id: str):
+    """
+    에이전트 선제 메시지를 SSE로 구독합니다.
+
+    Args:
+        session_id: 세션 ID
+
+    Returns:
+        StreamingResponse: SSE 스트리밍 응답
+    """
+    return StreamingResponse(
+        agent_event_stream(session_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
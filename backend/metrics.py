@@ -0,0 +1,326 @@
+"""
+모듈명: backend.metrics
+설명: Prometheus 텍스트 형식 지표 수집
+
+주요 기능:
+- Counter/Gauge/Histogram 지표(라벨 지원)
+- 컨텍스트 매니저/데코레이터 형태의 구간 측정
+- /metrics 응답용 텍스트 렌더링
+
+의존성:
+- 표준 라이브러리만 사용
+"""
+
+# 1. 표준 라이브러리
+import functools
+import inspect
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_registry: List["_Metric"] = []
+
+
+def _escape_label(value: str) -> str:
+    """
+    라벨 값을 Prometheus 형식으로 이스케이프합니다.
+    """
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """
+    라벨 이름/값을 {a="x",b="y"} 형식으로 변환합니다.
+    """
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """
+    지표 값을 문자열로 변환합니다.
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Timer:
+    """구간 소요 시간을 히스토그램에 기록하는 컨텍스트 매니저/데코레이터"""
+
+    def __init__(self, histogram: "Histogram", label_values: Tuple[str, ...] = ()):
+        self._histogram = histogram
+        self._label_values = label_values
+        self._started = 0.0
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - self._started
+        self._histogram.observe(self.elapsed, *self._label_values)
+
+    def __call__(self, func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with Timer(self._histogram, self._label_values):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Timer(self._histogram, self._label_values):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class _Metric:
+    """지표 공통 기반 클래스"""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            labels = _format_labels(self.labelnames, label_values)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """현재 값 게이지(콜백 함수로 수집 시점 계산 가능)"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, amount: float = 1.0, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, *label_values: str) -> None:
+        self.inc(-amount, *label_values)
+
+    def set_function(self, func: Callable[[], float]) -> None:
+        self._function = func
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        if self._function is not None:
+            lines.append(f"{self.name} {_format_value(float(self._function()))}")
+            return lines
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            labels = _format_labels(self.labelnames, label_values)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # 버킷별 개수 + 합계 + 개수
+                series = [0.0] * (len(self.buckets) + 2)
+                self._series[label_values] = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, *label_values: str) -> Timer:
+        return Timer(self, label_values)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for label_values, series in items:
+            cumulative = 0.0
+            for index, bound in enumerate(self.buckets):
+                cumulative += series[index]
+                labels = _format_labels(
+                    self.labelnames, label_values, f'le="{_format_value(bound)}"'
+                )
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+def render_metrics() -> str:
+    """
+    등록된 모든 지표를 Prometheus 텍스트 형식으로 렌더링합니다.
+
+    Returns:
+        str: 지표 텍스트
+    """
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# 파이프라인 지표
+PARSE_DURATION = Histogram(
+    "lasttalk_parse_duration_seconds", "파일 파싱 소요 시간", ["stage"]
+)
+PARSE_LINES_PER_SECOND = Histogram(
+    "lasttalk_parse_lines_per_second",
+    "파일 파싱 처리량(라인/초)",
+    buckets=(1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6),
+)
+PERSONA_LLM_LATENCY = Histogram(
+    "lasttalk_persona_llm_latency_seconds", "페르소나 리포트 LLM 호출 시간"
+)
+PERSONA_LLM_RETRIES = Counter(
+    "lasttalk_persona_llm_retries_total", "페르소나 리포트 LLM 호출 재시도 수"
+)
+EMBEDDING_LATENCY = Histogram(
+    "lasttalk_embedding_batch_latency_seconds", "임베딩 배치 요청 시간"
+)
+CHROMA_LATENCY = Histogram(
+    "lasttalk_chroma_latency_seconds", "ChromaDB 작업 시간", ["op"]
+)
+MEMORY_VECTOR_LATENCY = Histogram(
+    "lasttalk_memory_vector_latency_seconds", "양자화 벡터 저장소 작업 시간", ["op"]
+)
+MEMORY_CHUNKS = Counter(
+    "lasttalk_memory_chunks_total",
+    "벡터 메모리 청크 처리 결과(stored/skipped)",
+    ["result"],
+)
+RAG_DEADLINE_MISSED = Counter(
+    "lasttalk_rag_deadline_missed_total", "기한 초과로 RAG 없이 진행한 채팅 수"
+)
+
+# 채팅 지표
+CHAT_TTFT = Histogram("lasttalk_chat_ttft_seconds", "채팅 첫 토큰까지 시간")
+CHAT_STREAM_DURATION = Histogram(
+    "lasttalk_chat_stream_duration_seconds", "채팅 스트림 전체 시간"
+)
+CHAT_TOKENS_STREAMED = Counter(
+    "lasttalk_chat_tokens_streamed_total", "스트리밍한 업스트림 토큰(델타) 수"
+)
+CHAT_SSE_FRAMES = Counter(
+    "lasttalk_chat_sse_frames_total", "클라이언트로 전송한 채팅 SSE 텍스트 프레임 수"
+)
+CHAT_ACTIVE_STREAMS = Gauge("lasttalk_chat_active_streams", "진행 중인 채팅 스트림 수")
+CHAT_HEDGES = Counter(
+    "lasttalk_chat_hedge_total",
+    "채팅 헤지 요청 결과(sent/primary_won/hedge_won/deadline)",
+    ["result"],
+)
+CHAT_ADMISSION = Counter(
+    "lasttalk_chat_admission_total",
+    "채팅 스트림 입장 결과(admitted/queued/rejected/timeout/superseded)",
+    ["result"],
+)
+CHAT_QUEUE_WAIT = Histogram("lasttalk_chat_queue_wait_seconds", "채팅 입장 대기열 대기 시간")
+CHAT_RESPONSE_CACHE = Counter(
+    "lasttalk_chat_response_cache_total",
+    "채팅 응답 캐시 조회/저장 결과(hit/miss/store)",
+    ["result"],
+)
+CHAT_RESPONSE_CACHE_SAVED = Counter(
+    "lasttalk_chat_response_cache_saved_seconds_total",
+    "응답 캐시 적중으로 절약한 모델 응답 시간(초)",
+)
+
+# 보존 기한 정리 지표
+RETENTION_SWEEP_DURATION = Histogram(
+    "lasttalk_retention_sweep_seconds", "만료 데이터 정리 1회 소요 시간"
+)
+RETENTION_DELETED = Counter(
+    "lasttalk_retention_deleted_total",
+    "만료 데이터 정리로 삭제한 항목 수(jobs/orphan_jobs/chunks/temp_files/chat_sessions)",
+    ["kind"],
+)
+RETENTION_RECLAIMED_BYTES = Counter(
+    "lasttalk_retention_reclaimed_bytes_total",
+    "만료 데이터 정리로 회수한 디스크 용량(바이트, temp/vectors)",
+    ["store"],
+)
+
+# 에이전트 지표
+AGENT_MESSAGES = Counter(
+    "lasttalk_agent_messages_total",
+    "선제 메시지 처리 결과(push/outbox/discarded/failed)",
+    ["result"],
+)
+
+# 상태 지표(수집 시점 계산)
+JOB_QUEUE_DEPTH = Gauge("lasttalk_job_queue_depth", "대기/실행 중인 작업 수")
+JOBS_SIZE = Gauge("lasttalk_jobs", "메모리에 보관 중인 작업 수")
+CHAT_MEMORY_SIZE = Gauge("lasttalk_chat_memory_sessions", "대화 히스토리 보관 세션 수")
+CHAT_QUEUE_DEPTH = Gauge("lasttalk_chat_queue_depth", "입장 대기 중인 채팅 요청 수")
+AGENT_SESSIONS = Gauge("lasttalk_agent_sessions", "선제 메시지 체크인이 예약된 세션 수")
@@ -44,7 +44,11 @@ class JobResponse(BaseModel):
     report: Optional[PersonaReport] = None
     error: Optional[str] = None
     speakers: Optional[List[str]] = None
+    speaker_stats: Optional[Dict[str, Dict[str, Any]]] = None
+    speakers_partial: Optional[bool] = None
     selected_speaker: Optional[str] = None
+    analyzed_speakers: Optional[List[str]] = None
+    last_import: Optional[Dict[str, Any]] = None
 
 class ChatRequest(BaseModel):
     """채팅 요청 스키마"""
@@ -53,6 +57,7 @@ class ChatRequest(BaseModel):
     message: str
     agent_enabled: bool
     style_mode: str = "hybrid"
+    include_timings: bool = False
 
 class Settings(BaseModel):
     """에이전트 설정 스키마"""
@@ -5,15 +5,28 @@
 주요 기능:
 - 카카오톡 텍스트 포맷 파싱
 - 날짜/시간/화자/메시지 추출
+- 지정한 줄부터 부분 파싱(증분 가져오기용)
+- 본문을 만들지 않는 화자 사전 스캔(화자별 메시지 수, 첫/마지막 시각, 큰 파일은 앞/뒤 바이트 표본)
+- 메시지 레코드 해시 계산
 
 의존성:
 - 표준 라이브러리만 사용
 """
 
 # 1. 표준 라이브러리
+import hashlib
+import os
 import re
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
+
+ENCODINGS = ["utf-8-sig", "utf-8", "cp949", "euc-kr"]
+
+# 내보내기 머리말 줄(파싱/사전 스캔 모두 건너뜀)
+EXPORT_TITLE_SUFFIX = "카카오톡 대화"
+EXPORT_SAVED_PREFIX = "저장한 날짜"
+# 표본 스캔에서 뒤 구간 앞의 날짜 헤더를 찾을 때 거꾸로 읽는 블록 크기
+SCAN_BACKTRACK_BYTES = 1 << 16
 
 DATE_HEADER_PATTERN = re.compile(
     r"^-+\s+(?P<date>\d{4}년\s+\d{1,2}월\s+\d{1,2}일)\s+.+\s+-+$"
@@ -26,8 +39,20 @@ COMMA_PATTERN = re.compile(
     r"(?P<ampm>오전|오후)\s+(?P<time>\d{1,2}:\d{2}),\s*"
     r"(?P<speaker>[^:]+?)\s*:\s*(?P<text>.*)$"
 )
+# 사전 스캔용: 줄 단위 분할 없이 텍스트 전체에서 날짜 헤더와 메시지 머리(화자/시각)만 찾음
+# (위 패턴을 앞뒤 공백을 지우지 않은 줄에 맞게 옮긴 것, 공백은 줄바꿈을 넘지 않도록 [^\S\n] 사용)
+SCAN_PATTERN = re.compile(
+    r"^[^\S\n]*(?:"
+    r"-+[^\S\n]+(?P<header_date>\d{4}년[^\S\n]+\d{1,2}월[^\S\n]+\d{1,2}일)[^\S\n]+.+[^\S\n]+-+[^\S\n]*$"
+    r"|\[(?P<b_speaker>.+?)\][^\S\n]+\[(?P<b_ampm>오전|오후)[^\S\n]+(?P<b_time>\d{1,2}:\d{2})\][^\S\n]+\S"
+    r"|(?P<c_date>\d{4}[./년 ][^\S\n]?\d{1,2}[./월 ][^\S\n]?\d{1,2}일?)[^\S\n]+"
+    r"(?P<c_ampm>오전|오후)[^\S\n]+(?P<c_time>\d{1,2}:\d{2}),[^\S\n]*"
+    r"(?P<c_speaker>[^:\n]+?)[^\S\n]*:"
+    r")",
+    re.MULTILINE,
+)
 
-def _read_lines(file_path: str) -> List[str]:
+def _read_text(file_path: str) -> str:
     """
     여러 인코딩을 시도해 파일 내용을 읽습니다.
 
@@ -35,17 +60,53 @@ def _read_lines(file_path: str) -> List[str]:
         file_path: 대상 파일 경로
 
     Returns:
-        List[str]: 파일 라인 목록
+        str: 파일 내용(읽을 수 없으면 빈 문자열)
     """
-    encodings = ["utf-8-sig", "utf-8", "cp949", "euc-kr"]
-    for encoding in encodings:
+    for encoding in ENCODINGS:
         try:
-            return Path(file_path).read_text(encoding=encoding).splitlines()
+            return Path(file_path).read_text(encoding=encoding)
         except UnicodeDecodeError:
             continue
         except OSError:
-            return []
-    return []
+            return ""
+    return ""
+
+def _read_lines(file_path: str) -> List[str]:
+    """
+    여러 인코딩을 시도해 파일 내용을 줄 단위로 읽습니다.
+
+    Args:
+        file_path: 대상 파일 경로
+
+    Returns:
+        List[str]: 파일 라인 목록
+    """
+    return _read_text(file_path).splitlines()
+
+def read_kakao_lines(file_path: str) -> List[str]:
+    """
+    내보내기 파일을 줄 단위로 읽습니다(인코딩 자동 판별).
+
+    Args:
+        file_path: 대상 파일 경로
+
+    Returns:
+        List[str]: 파일 라인 목록
+    """
+    return _read_lines(file_path)
+
+def message_record_hash(message: Dict) -> str:
+    """
+    메시지 레코드(타임스탬프/화자/본문)의 해시를 계산합니다.
+
+    Args:
+        message: 파싱된 메시지
+
+    Returns:
+        str: 16자리 16진수 해시
+    """
+    record = f"{message.get('ts')}\x1f{message.get('speaker')}\x1f{message.get('text')}"
+    return hashlib.sha1(record.encode("utf-8")).hexdigest()[:16]
 
 def _build_timestamp(current_date: Optional[str], ampm: str, time: str) -> str:
     """
@@ -73,17 +134,42 @@ def parse_kakao_talk(file_path: str) -> List[Dict]:
     Returns:
         List[Dict]: 메시지 목록(타임스탬프/화자/본문 포함)
     """
+    return parse_kakao_lines(_read_lines(file_path))
+
+def parse_kakao_lines(
+    lines: List[str],
+    start_line: int = 0,
+    limit: Optional[int] = None,
+) -> List[Dict]:
+    """
+    내보내기 파일 라인 목록을 파싱합니다.
+
+    중간부터 파싱할 때는 앞쪽의 가장 가까운 날짜 헤더를 찾아 날짜를 이어받고,
+    시작 위치가 여러 줄 메시지 중간이면 그 메시지의 나머지 줄은 건너뜁니다.
+
+    Args:
+        lines: 파일 라인 목록
+        start_line: 파싱 시작 줄 번호(0부터)
+        limit: 최대 메시지 수(없으면 끝까지)
+
+    Returns:
+        List[Dict]: 메시지 목록(line_no는 파일 전체 기준)
+    """
     messages: List[Dict] = []
-    lines = _read_lines(file_path)
     current_msg: Optional[Dict] = None
     current_date: Optional[str] = None
+    for line_no in range(min(start_line, len(lines)) - 1, -1, -1):
+        date_header_match = DATE_HEADER_PATTERN.match(lines[line_no].strip())
+        if date_header_match:
+            current_date = date_header_match.group("date")
+            break
 
-    for line_no, raw_line in enumerate(lines):
-        line = raw_line.strip()
+    for line_no in range(start_line, len(lines)):
+        line = lines[line_no].strip()
         if not line:
             continue
 
-        if line.endswith("카카오톡 대화") or line.startswith("저장한 날짜"):
+        if line.endswith(EXPORT_TITLE_SUFFIX) or line.startswith(EXPORT_SAVED_PREFIX):
             continue
 
         date_header_match = DATE_HEADER_PATTERN.match(line)
@@ -95,6 +181,8 @@ def parse_kakao_talk(file_path: str) -> List[Dict]:
         if bracket_match:
             if current_msg:
                 messages.append(current_msg)
+                if limit is not None and len(messages) >= limit:
+                    return messages
             ts = _build_timestamp(
                 current_date,
                 bracket_match.group("ampm"),
@@ -112,6 +200,8 @@ def parse_kakao_talk(file_path: str) -> List[Dict]:
         if comma_match:
             if current_msg:
                 messages.append(current_msg)
+                if limit is not None and len(messages) >= limit:
+                    return messages
             ts = _build_timestamp(
                 comma_match.group("date"),
                 comma_match.group("ampm"),
@@ -132,3 +222,155 @@ def parse_kakao_talk(file_path: str) -> List[Dict]:
         messages.append(current_msg)
 
     return messages
+
+def _last_date_header(handle: Any, start: int, end: int, encoding: str) -> Optional[str]:
+    """
+    파일의 [start, end) 바이트 구간을 뒤에서부터 읽어 마지막 날짜 헤더의 날짜를 찾습니다.
+
+    날짜 헤더는 '-'로 시작하는 줄이므로(지원 인코딩에서 '-'와 줄바꿈 바이트는 다른 문자의
+    일부가 아님) 그런 줄만 디코딩해 확인합니다.
+    """
+    position = end
+    partial = b""
+    while position > start:
+        block_start = max(position - SCAN_BACKTRACK_BYTES, start)
+        handle.seek(block_start)
+        lines = (handle.read(position - block_start) + partial).split(b"\n")
+        # 블록 첫 줄은 앞쪽에서 잘렸을 수 있으므로 다음 블록과 이어 붙여 확인
+        partial = lines.pop(0) if block_start > start else b""
+        for line in reversed(lines):
+            if line.lstrip().startswith(b"-"):
+                match = DATE_HEADER_PATTERN.match(line.decode(encoding, "replace").strip())
+                if match:
+                    return match.group("date")
+        position = block_start
+    return None
+
+def _read_sample_texts(
+    file_path: str,
+    sample_bytes: int,
+) -> Tuple[List[str], Optional[str], bool]:
+    """
+    파일이 표본 크기의 두 배보다 크면 앞/뒤 sample_bytes만 읽어 디코딩합니다.
+
+    경계에서 잘린 줄은 버립니다(줄바꿈 바이트는 지원 인코딩에서 다른 문자의 일부가 아님).
+    뒤 구간이 날짜 헤더 없이 PC 형식 메시지로 시작하면 건너뛴 중간 구간의 마지막 날짜 헤더를 찾습니다.
+
+    Returns:
+        Tuple[List[str], Optional[str], bool]: 구간별 텍스트 목록, 중간 구간의 마지막 날짜
+            (없거나 필요 없으면 None), 표본 사용 여부
+    """
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        return [], None, False
+    if sample_bytes <= 0 or size <= sample_bytes * 2:
+        return [_read_text(file_path)], None, False
+    with open(file_path, "rb") as handle:
+        head = handle.read(sample_bytes)
+        handle.seek(size - sample_bytes)
+        tail = handle.read()
+        head = head[:head.rfind(b"\n") + 1]
+        cut = tail.find(b"\n") + 1
+        tail = tail[cut:]
+        for encoding in ENCODINGS:
+            try:
+                texts = [head.decode(encoding), tail.decode(encoding)]
+            except UnicodeDecodeError:
+                continue
+            middle_date = None
+            first = SCAN_PATTERN.search(texts[1])
+            if first is not None and first.group("b_speaker"):
+                middle_date = _last_date_header(
+                    handle, len(head), size - sample_bytes + cut, encoding
+                )
+            return texts, middle_date, True
+    return [], None, True
+
+def _title_line_starts(text: str) -> set:
+    """
+    내보내기 제목 줄(EXPORT_TITLE_SUFFIX로 끝나는 줄)의 시작 위치를 찾습니다.
+
+    parse_kakao_lines는 이 줄을 메시지로 보지 않으므로 사전 스캔도 같은 줄을 건너뜁니다.
+    저장한 날짜 줄은 메시지 머리 패턴과 맞지 않으므로 따로 찾지 않습니다.
+    """
+    starts = set()
+    index = text.find(EXPORT_TITLE_SUFFIX)
+    while index != -1:
+        end = index + len(EXPORT_TITLE_SUFFIX)
+        line_end = text.find("\n", end)
+        if not text[end:line_end if line_end != -1 else len(text)].strip():
+            starts.add(text.rfind("\n", 0, index) + 1)
+        index = text.find(EXPORT_TITLE_SUFFIX, end)
+    return starts
+
+def _match_timestamp(match: "re.Match", current_date: Optional[str]) -> str:
+    """
+    사전 스캔 매치에서 타임스탬프를 만듭니다.
+    """
+    if match.group("b_speaker"):
+        return _build_timestamp(current_date, match.group("b_ampm"), match.group("b_time"))
+    return _build_timestamp(match.group("c_date"), match.group("c_ampm"), match.group("c_time"))
+
+def _scan_text(
+    text: str,
+    stats: Dict[str, Dict[str, Any]],
+    current_date: Optional[str] = None,
+) -> Optional[str]:
+    """
+    텍스트에서 메시지 머리만 찾아 화자별 메시지 수와 첫/마지막 시각을 누적합니다.
+
+    메시지마다 화자 이름만 꺼내고, 시각은 화자별 첫/마지막 매치에서만 만듭니다.
+    current_date는 텍스트 앞쪽에서 이어받는 날짜이며, 끝난 시점의 날짜를 반환합니다.
+    """
+    counts: Dict[str, int] = {}
+    first: Dict[str, Tuple["re.Match", Optional[str]]] = {}
+    last_match: Dict[str, "re.Match"] = {}
+    last_date: Dict[str, Optional[str]] = {}
+    skipped = _title_line_starts(text)
+    for match in SCAN_PATTERN.finditer(text):
+        header_date, b_speaker, c_speaker = match.group("header_date", "b_speaker", "c_speaker")
+        if header_date:
+            current_date = header_date
+            continue
+        if skipped and match.start() in skipped:
+            continue
+        speaker = b_speaker or c_speaker
+        count = counts.get(speaker)
+        if count is None:
+            counts[speaker] = 1
+            first[speaker] = (match, current_date)
+        else:
+            counts[speaker] = count + 1
+        last_match[speaker] = match
+        last_date[speaker] = current_date
+    for speaker, count in counts.items():
+        first_ts = _match_timestamp(*first[speaker])
+        last_ts = _match_timestamp(last_match[speaker], last_date[speaker])
+        entry = stats.get(speaker)
+        if entry is None:
+            stats[speaker] = {"messages": count, "first_ts": first_ts, "last_ts": last_ts}
+        else:
+            entry["messages"] += count
+            entry["last_ts"] = last_ts
+    return current_date
+
+def scan_speakers(file_path: str, sample_bytes: int = 0) -> Dict[str, Any]:
+    """
+    메시지 본문을 만들지 않고 화자 목록과 화자별 메시지 수, 첫/마지막 시각만 빠르게 계산합니다.
+
+    Args:
+        file_path: 대화 내보내기 파일 경로
+        sample_bytes: 0보다 크고 파일이 그 두 배보다 크면 앞/뒤 이 바이트만 스캔(수는 표본 기준)
+
+    Returns:
+        Dict[str, Any]: speakers(정렬), speaker_stats(화자 -> messages/first_ts/last_ts), sampled
+    """
+    texts, middle_date, sampled = _read_sample_texts(file_path, sample_bytes)
+    stats: Dict[str, Dict[str, Any]] = {}
+    current_date = None
+    for text in texts:
+        current_date = _scan_text(text, stats, current_date)
+        # 뒤 구간은 건너뛴 중간 구간의 마지막 날짜 헤더(없으면 앞 구간 끝 날짜)를 이어받음
+        current_date = middle_date or current_date
+    return {"speakers": sorted(stats), "speaker_stats": stats, "sampled": sampled}
@@ -5,6 +5,7 @@
 주요 기능:
 - 기본 시스템 프롬프트 제공
 - 페르소나 시스템 프롬프트 조합
+- 선제 메시지 생성 지시문 제공
 
 의존성:
 - 표준 라이브러리만 사용
@@ -22,6 +23,12 @@ BASE_SYSTEM_PROMPT = (
     "과도한 공손함이나 상담사 톤을 피하고, 실제 대화처럼 답한다.\n"
 )
 
+PROACTIVE_INSTRUCTION = (
+    "(시스템 안내: 상대가 {idle_minutes}분 넘게 말이 없다. "
+    "평소 말투 그대로 네가 먼저 가볍게 말을 걸어라. "
+    "이전 대화 흐름이 있으면 이어가고, 한두 문장으로 짧게 보낸다. 이 안내는 언급하지 않는다.)"
+)
+
 
 def build_base_system_prompt() -> str:
     """
@@ -95,3 +102,10 @@ def build_persona_prompt(
         f"예시 대화(합성):\n{examples_text}\n"
         "위 지표를 따르되, 실제 발화 예시의 분위기와 리듬을 최우선으로 반영한다."
     )
+
+
+def build_proactive_instruction(idle_minutes: int) -> str:
+    """
+    선제 메시지 생성을 요청하는 지시문을 반환합니다.
+    """
+    return PROACTIVE_INSTRUCTION.format(idle_minutes=max(idle_minutes, 1))
@@ -0,0 +1,437 @@
+"""
+모듈명: backend.quantized_store
+설명: 페르소나 메모리용 양자화 벡터 저장소(선택 기능)
+
+주요 기능:
+- 작업별 임베딩을 int8(벡터별 스케일) 또는 float16 코드로 저장
+- 압축 코드로 근사 검색 후 소수 후보만 float16 원본 사본으로 다시 점수 계산(int8, 선택)
+- 거리는 ChromaDB 기본 공간과 같은 제곱 L2로 반환(RAG_MAX_DISTANCE 그대로 사용)
+- 검색용 코드는 최근 사용한 작업만 메모리에 유지(LRU), 재점수용 사본은 mmap으로 필요한 행만 읽음
+
+의존성:
+- numpy: 행렬 연산(chromadb 의존성으로 함께 설치, 처음 사용할 때 임포트)
+
+저장 형식(작업 디렉터리):
+    meta.json(codec, dim, rescore, generation, ids, documents, days)
+    + codes.{세대}.npy + norms.{세대}.npy
+    + int8이면 scales.{세대}.npy(벡터별 스케일), 재점수 사용 시 rescore.{세대}.npy(float16 사본)
+    배열을 새 세대 이름으로 쓴 뒤 meta.json을 원자적으로 교체하므로, 교체 전후 어느 시점에도
+    읽기 쪽은 완전한 한 세대만 봅니다.
+"""
+
+# 1. 표준 라이브러리
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# "", "int8", "float16"(비우면 ChromaDB에 float32로 저장)
+MEMORY_VECTOR_CODEC = os.getenv("MEMORY_VECTOR_CODEC", "").lower()
+MEMORY_VECTOR_CACHE_JOBS = int(os.getenv("MEMORY_VECTOR_CACHE_JOBS", "64"))
+# int8 저장 시 재점수용 float16 사본 보관 여부(recall을 높이지만 디스크는 float16보다 커짐)
+MEMORY_VECTOR_RESCORE = os.getenv("MEMORY_VECTOR_RESCORE", "0") == "1"
+# int8 근사 검색 후 다시 점수를 매길 후보 수(요청 수의 배수, 최소값)
+MEMORY_VECTOR_RESCORE_FACTOR = int(os.getenv("MEMORY_VECTOR_RESCORE_FACTOR", "4"))
+RESCORE_MIN_CANDIDATES = 32
+# 근사 점수 계산 시 한 번에 float32로 올릴 행 수(임시 메모리 상한)
+SEARCH_BLOCK_ROWS = 256
+SUPPORTED_CODECS = {"int8", "float16"}
+
+_lock = threading.Lock()
+# 작업 ID -> 불러온 저장소(최근 사용 순)
+_loaded: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def quantization_enabled() -> bool:
+    """
+    양자화 저장이 켜져 있는지 확인합니다.
+
+    Returns:
+        bool: 사용 여부
+    """
+    return MEMORY_VECTOR_CODEC in SUPPORTED_CODECS
+
+
+def _root() -> Path:
+    """
+    양자화 저장소 루트 경로를 반환합니다.
+    """
+    path = os.getenv("MEMORY_VECTOR_PATH")
+    if not path:
+        path = str(Path(__file__).resolve().parent / "data" / "vectors")
+    return Path(path)
+
+
+def _job_dir(job_id: str) -> Path:
+    """
+    작업 저장 디렉터리 경로를 반환합니다.
+    """
+    return _root() / Path(job_id).name
+
+
+def encode_vectors(matrix: Any, codec: str, rescore: bool = False) -> Dict[str, Any]:
+    """
+    float32 임베딩 행렬을 코드로 변환합니다.
+
+    int8은 벡터별 대칭 스케일(max|x| / 127)로 양자화하고, rescore면 재점수용 float16 사본을 함께 만듭니다.
+
+    Args:
+        matrix: (n, dim) float32 행렬
+        codec: "int8" 또는 "float16"
+        rescore: int8 재점수용 사본 생성 여부
+
+    Returns:
+        Dict[str, Any]: codes, norms(제곱 노름), int8이면 scales(와 rescore) 배열
+    """
+    import numpy as np
+
+    norms = np.einsum("ij,ij->i", matrix, matrix).astype(np.float32)
+    if codec == "float16":
+        return {"codes": matrix.astype(np.float16), "norms": norms}
+    scales = (np.abs(matrix).max(axis=1) / 127.0).astype(np.float32)
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    encoded = {"codes": codes, "norms": norms, "scales": scales}
+    if rescore:
+        encoded["rescore"] = matrix.astype(np.float16)
+    return encoded
+
+
+def search_codes(
+    arrays: Dict[str, Any],
+    codec: str,
+    query: Any,
+    n_results: int,
+    rescore_candidates: int | None = None,
+) -> Tuple[List[int], List[float]]:
+    """
+    코드 행렬에서 제곱 L2 거리가 가까운 행을 찾습니다.
+
+    Args:
+        arrays: encode_vectors 결과(또는 저장소에서 불러온 배열)
+        codec: "int8" 또는 "float16"
+        query: (dim,) float32 질의 벡터
+        n_results: 반환할 개수
+        rescore_candidates: int8 재점수 후보 수(기본: 요청 수 x MEMORY_VECTOR_RESCORE_FACTOR,
+            최소 32, 0이거나 재점수 사본이 없으면 근사 거리 그대로 사용)
+
+    Returns:
+        Tuple[List[int], List[float]]: 행 번호와 거리(가까운 순)
+    """
+    import numpy as np
+
+    codes = arrays["codes"]
+    total = codes.shape[0]
+    if total == 0 or n_results <= 0:
+        return [], []
+    scores = np.empty(total, dtype=np.float32)
+    for start in range(0, total, SEARCH_BLOCK_ROWS):
+        block = codes[start:start + SEARCH_BLOCK_ROWS].astype(np.float32)
+        scores[start:start + len(block)] = block @ query
+    if codec == "int8":
+        scores *= arrays["scales"]
+    query_norm = float(query @ query)
+    distances = query_norm + arrays["norms"] - 2 * scores
+
+    if rescore_candidates is None:
+        rescore_candidates = max(n_results * MEMORY_VECTOR_RESCORE_FACTOR, RESCORE_MIN_CANDIDATES)
+    if codec == "int8" and rescore_candidates > 0 and "rescore" in arrays:
+        # 근사 거리로 후보를 넉넉히 고른 뒤 float16 사본으로 다시 계산
+        limit = min(total, max(rescore_candidates, n_results))
+        candidates = np.argpartition(distances, limit - 1)[:limit]
+        candidates.sort()
+        rows = np.asarray(arrays["rescore"][candidates], dtype=np.float32)
+        distances = query_norm + arrays["norms"][candidates] - 2 * (rows @ query)
+    else:
+        candidates = np.arange(total)
+
+    count = min(n_results, len(candidates))
+    top = np.argpartition(distances, count - 1)[:count]
+    top = top[np.argsort(distances[top])]
+    return [int(candidates[i]) for i in top], [max(float(distances[i]), 0.0) for i in top]
+
+
+def _array_path(directory: Path, name: str, generation: int) -> Path:
+    """
+    세대별 배열 파일 경로를 반환합니다(세대 0은 세대 이름 없이 저장하던 이전 형식).
+    """
+    return directory / (f"{name}.{generation}.npy" if generation else f"{name}.npy")
+
+
+def _has_rescore(meta: Dict[str, Any]) -> bool:
+    """
+    저장소에 재점수용 사본이 있는지 확인합니다(이전 형식 int8은 항상 있음).
+    """
+    return meta["codec"] == "int8" and meta.get("rescore", True)
+
+
+def _load(job_id: str) -> Dict[str, Any] | None:
+    """
+    작업 저장소를 불러옵니다(검색용 코드는 메모리, 재점수용 사본은 mmap). 호출자가 잠금을 잡습니다.
+    """
+    import numpy as np
+
+    cached = _loaded.get(job_id)
+    if cached is not None:
+        _loaded.move_to_end(job_id)
+        return cached
+    directory = _job_dir(job_id)
+    meta_path = directory / "meta.json"
+    if not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    generation = meta.get("generation", 0)
+    store: Dict[str, Any] = {
+        "meta": meta,
+        "codes": np.load(_array_path(directory, "codes", generation)),
+        "norms": np.load(_array_path(directory, "norms", generation)),
+    }
+    if meta["codec"] == "int8":
+        store["scales"] = np.load(_array_path(directory, "scales", generation))
+    if _has_rescore(meta):
+        store["rescore"] = np.load(_array_path(directory, "rescore", generation), mmap_mode="r")
+    _loaded[job_id] = store
+    while len(_loaded) > MEMORY_VECTOR_CACHE_JOBS:
+        _loaded.popitem(last=False)
+    return store
+
+
+def _save(job_id: str, meta: Dict[str, Any], arrays: Dict[str, Any]) -> None:
+    """
+    배열을 새 세대 파일로 쓰고 meta.json을 원자적으로 교체한 뒤 이전 세대 파일을 지웁니다.
+
+    저장 중에도 meta.json은 항상 완전한 한 세대를 가리키므로 잠금 없이 읽는 has_vectors가
+    저장소를 없는 것으로 보지 않습니다. 호출자가 잠금을 잡습니다.
+    """
+    import numpy as np
+
+    directory = _job_dir(job_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    meta_path = directory / "meta.json"
+    generation = meta.get("generation", 0) + 1
+    meta = {**meta, "generation": generation}
+    keep = {"meta.json"}
+    for name, array in arrays.items():
+        path = _array_path(directory, name, generation)
+        np.save(path, array)
+        keep.add(path.name)
+    staging = directory / "meta.json.tmp"
+    staging.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    os.replace(staging, meta_path)
+    _loaded.pop(job_id, None)
+    for path in directory.iterdir():
+        if path.name not in keep:
+            path.unlink(missing_ok=True)
+
+
+def has_vectors(job_id: str | None) -> bool:
+    """
+    작업의 양자화 저장소가 있는지 확인합니다.
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        bool: 존재 여부
+    """
+    return bool(job_id) and (_job_dir(job_id) / "meta.json").exists()
+
+
+def existing_ids(job_id: str, ids: List[str]) -> set:
+    """
+    이미 저장된 청크 ID를 반환합니다.
+
+    Args:
+        job_id: 작업 ID
+        ids: 확인할 청크 ID 목록
+
+    Returns:
+        set: 저장된 ID 집합
+    """
+    with _lock:
+        store = _load(job_id)
+    if store is None:
+        return set()
+    return set(ids) & set(store["meta"]["ids"])
+
+
+def add_vectors(
+    job_id: str,
+    ids: List[str],
+    documents: List[str],
+    embeddings: List[List[float]],
+    days: List[int | None],
+) -> None:
+    """
+    청크와 임베딩을 양자화해 작업 저장소에 추가합니다(기존 청크 뒤에 이어 씀).
+
+    Args:
+        job_id: 작업 ID
+        ids: 청크 ID 목록
+        documents: 청크 텍스트 목록
+        embeddings: float 임베딩 목록
+        days: 청크별 날짜 서수 목록
+
+    Raises:
+        ValueError: 새 저장소인데 코덱이 꺼져 있거나, 임베딩 차원이 기존 저장소와 다를 때
+    """
+    import numpy as np
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    with _lock:
+        store = _load(job_id)
+        if store is None and not quantization_enabled():
+            raise ValueError(f"지원하지 않는 벡터 코덱입니다: {MEMORY_VECTOR_CODEC}")
+        # 코덱 설정을 끄면 기존 저장소는 원래 코덱으로 계속 씀
+        codec = MEMORY_VECTOR_CODEC if quantization_enabled() else store["meta"]["codec"]
+        if store is not None and store["meta"]["codec"] != codec:
+            # 코덱이 바뀌었으면 기존 벡터를 복원해 새 코덱으로 다시 저장
+            previous = restore_vectors(store)
+            matrix = np.concatenate([previous, matrix])
+            meta = {**store["meta"], "codec": codec, "rescore": MEMORY_VECTOR_RESCORE}
+            store = None
+        elif store is not None:
+            # 재점수 사본 여부는 저장소를 만들 때 정한 값을 유지(원본이 없어 나중에 만들 수 없음)
+            meta = {**store["meta"], "rescore": _has_rescore(store["meta"])}
+        else:
+            meta = {
+                "codec": codec,
+                "dim": matrix.shape[1],
+                "rescore": MEMORY_VECTOR_RESCORE,
+                "ids": [],
+                "documents": [],
+                "days": [],
+            }
+        if matrix.shape[1] != meta["dim"]:
+            raise ValueError("임베딩 차원이 기존 저장소와 다릅니다")
+        encoded = encode_vectors(matrix, codec, codec == "int8" and meta["rescore"])
+        if store is not None:
+            encoded = {
+                name: np.concatenate([np.asarray(store[name]), array])
+                for name, array in encoded.items()
+            }
+        meta["ids"] = meta["ids"] + list(ids)
+        meta["documents"] = meta["documents"] + list(documents)
+        meta["days"] = meta["days"] + list(days)
+        _save(job_id, meta, encoded)
+
+
+def restore_vectors(store: Dict[str, Any]) -> Any:
+    """
+    저장소의 벡터를 float32 행렬로 복원합니다(int8은 float16 사본, 없으면 코드 x 스케일).
+
+    Args:
+        store: 불러온 작업 저장소
+
+    Returns:
+        numpy.ndarray: (n, dim) float32 행렬
+    """
+    import numpy as np
+
+    if store["meta"]["codec"] == "float16":
+        return np.asarray(store["codes"], dtype=np.float32)
+    if "rescore" in store:
+        return np.asarray(store["rescore"], dtype=np.float32)
+    return store["codes"].astype(np.float32) * store["scales"][:, None]
+
+
+def query_vectors(
+    job_id: str,
+    embedding: List[float],
+    n_results: int,
+) -> Tuple[List[str], List[float], List[int | None]]:
+    """
+    작업 저장소에서 질의 임베딩과 가까운 청크를 찾습니다.
+
+    Args:
+        job_id: 작업 ID
+        embedding: 질의 임베딩
+        n_results: 반환할 개수
+
+    Returns:
+        Tuple: 청크 텍스트 목록, 제곱 L2 거리 목록, 날짜 서수 목록(가까운 순)
+    """
+    import numpy as np
+
+    with _lock:
+        store = _load(job_id)
+    if store is None:
+        return [], [], []
+    meta = store["meta"]
+    rows, distances = search_codes(
+        store, meta["codec"], np.asarray(embedding, dtype=np.float32), n_results
+    )
+    return (
+        [meta["documents"][row] for row in rows],
+        distances,
+        [meta["days"][row] for row in rows],
+    )
+
+
+def export_vectors(job_id: str) -> Tuple[List[str], List[List[float]], List[int | None]]:
+    """
+    작업 저장소의 청크와 (복원한) 임베딩, 날짜를 꺼냅니다(번들 내보내기용).
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        Tuple: 청크 텍스트 목록, 임베딩 목록, 날짜 서수 목록
+    """
+    with _lock:
+        store = _load(job_id)
+    if store is None:
+        return [], [], []
+    meta = store["meta"]
+    return list(meta["documents"]), restore_vectors(store).tolist(), list(meta["days"])
+
+
+def delete_vectors(job_id: str) -> int:
+    """
+    작업 저장소를 삭제합니다.
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        int: 삭제한 청크 수
+    """
+    with _lock:
+        _loaded.pop(job_id, None)
+        directory = _job_dir(job_id)
+        meta_path = directory / "meta.json"
+        count = 0
+        if meta_path.exists():
+            count = len(json.loads(meta_path.read_text(encoding="utf-8"))["ids"])
+        shutil.rmtree(directory, ignore_errors=True)
+    return count
+
+
+def disk_bytes(job_id: str) -> int:
+    """
+    작업 저장소의 디스크 사용량(바이트)을 계산합니다.
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        int: 파일 크기 합계
+    """
+    directory = _job_dir(job_id)
+    total = 0
+    if not directory.exists():
+        return total
+    for path in directory.iterdir():
+        try:
+            total += path.stat().st_size
+        except OSError:
+            # 저장 중 교체된 이전 세대 파일
+            continue
+    return total
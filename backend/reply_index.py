@@ -0,0 +1,188 @@
+"""
+모듈명: backend.reply_index
+설명: 실제 대화 쌍(상대 발화→페르소나 답장) 검색 인덱스
+
+주요 기능:
+- 상대 발화의 글자 1-gram/2-gram BM25 역색인 구축
+- 사용자 메시지와 가장 가까운 상대 발화를 찾아 페르소나의 실제 답장 반환
+- 채팅 턴마다 메시지와 비슷한 대화 쌍 상위 k개 선택(동적 few-shot, 질의당 처리량 상한)
+- 페르소나(작업/화자) 단위 인덱스 캐시(대화 쌍이 늘면 다시 구축)
+
+의존성:
+- 표준 라이브러리만 사용
+"""
+
+# 1. 표준 라이브러리
+import heapq
+import math
+import random
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# 3. 로컬 애플리케이션
+from backend.response_cache import normalize_message
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 질의 하나에서 점수를 더할 최대 역색인 항목 수(채팅 경로 지연 상한)
+SCORE_POSTINGS_BUDGET = 4000
+
+# 작업:화자 -> (구축 당시 대화 쌍 수, 인덱스)
+_indexes: Dict[str, Tuple[int, "ReplyIndex"]] = {}
+
+
+def _tokens(text: str) -> Counter:
+    """
+    정규화한 텍스트의 글자 1-gram과 2-gram 빈도를 계산합니다(띄어쓰기/형태소 분석 불필요).
+    """
+    normalized = normalize_message(text)
+    grams = Counter(normalized)
+    grams.update(normalized[i:i + 2] for i in range(len(normalized) - 1))
+    return grams
+
+
+class ReplyIndex:
+    """상대 발화 BM25 역색인(글자 n-gram별 문서 가중치를 미리 계산)"""
+
+    def __init__(self, pairs: List[Dict[str, str]]):
+        self.pairs = pairs
+        self.replies = [pair["persona"] for pair in pairs]
+        grams_by_doc = [_tokens(pair["user"]) for pair in pairs]
+        lengths = [sum(grams.values()) for grams in grams_by_doc]
+        avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_id, grams in enumerate(grams_by_doc):
+            for gram, tf in grams.items():
+                postings.setdefault(gram, []).append((doc_id, tf))
+        # 질의와 무관한 BM25 항(idf, 문서 길이 정규화)을 구축 시 한 번만 계산
+        total = len(pairs)
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for gram, docs in postings.items():
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            self._postings[gram] = [
+                (
+                    doc_id,
+                    idf * tf * (BM25_K1 + 1)
+                    / (tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_id] / avg_length)),
+                )
+                for doc_id, tf in docs
+            ]
+
+    def _scores(self, message: str) -> Dict[int, float]:
+        """
+        메시지와 글자가 겹치는 대화 쌍별 BM25 점수를 계산합니다.
+        """
+        scores: Dict[int, float] = {}
+        get = scores.get
+        # 드문(idf가 큰) n-gram부터 더하고, 처리량이 상한을 넘으면 흔한 n-gram은 생략
+        postings = sorted(
+            (self._postings[gram] for gram in _tokens(message) if gram in self._postings),
+            key=len,
+        )
+        visited = 0
+        for docs in postings:
+            if scores and visited + len(docs) > SCORE_POSTINGS_BUDGET:
+                break
+            visited += len(docs)
+            for doc_id, weight in docs:
+                scores[doc_id] = get(doc_id, 0.0) + weight
+        return scores
+
+    def search(self, message: str) -> Tuple[str, float] | None:
+        """
+        메시지와 가장 가까운 상대 발화의 답장을 찾습니다(동점이면 무작위).
+
+        Args:
+            message: 사용자 메시지
+
+        Returns:
+            Tuple[str, float] | None: (페르소나 답장, BM25 점수), 겹치는 글자가 없으면 None
+        """
+        scores = self._scores(message)
+        if not scores:
+            return None
+        best = max(scores.values())
+        doc_id = random.choice([doc for doc, score in scores.items() if score == best])
+        return self.replies[doc_id], best
+
+    def reply_for(self, message: str) -> Tuple[str, float]:
+        """
+        메시지에 대한 실제 답장을 찾고, 겹치는 글자가 없으면 임의의 답장을 점수 0으로 반환합니다.
+
+        Args:
+            message: 사용자 메시지
+
+        Returns:
+            Tuple[str, float]: (페르소나 답장, BM25 점수)
+        """
+        return self.search(message) or (random.choice(self.replies), 0.0)
+
+    def top_pairs(self, message: str, k: int) -> List[Dict[str, str]]:
+        """
+        메시지와 비슷한 대화 쌍을 점수 내림차순으로 최대 k개 반환합니다(같은 답장은 한 번만).
+
+        Args:
+            message: 사용자 메시지
+            k: 최대 개수
+
+        Returns:
+            List[Dict[str, str]]: 대화 쌍 목록
+        """
+        scores = self._scores(message)
+        ranked = heapq.nlargest(k * 2, scores.items(), key=lambda item: item[1])
+        selected: List[Dict[str, str]] = []
+        seen = set()
+        for doc_id, _ in ranked:
+            pair = self.pairs[doc_id]
+            if pair["persona"] in seen:
+                continue
+            seen.add(pair["persona"])
+            selected.append(pair)
+            if len(selected) >= k:
+                break
+        return selected
+
+
+def get_reply_index(
+    job_id: str | None,
+    speaker_name: str | None,
+    pairs: List[Dict[str, str]],
+    build: bool = True,
+) -> ReplyIndex | None:
+    """
+    페르소나의 인덱스를 반환하고, 없거나 대화 쌍 수가 바뀌었으면 다시 구축합니다.
+
+    구축은 대화 쌍 수천 개에 수백 ms가 걸리므로 이벤트 루프에서는 build=False로 먼저 확인하고
+    없을 때만 스레드에서 구축합니다.
+
+    Args:
+        job_id: 작업 ID
+        speaker_name: 화자 이름
+        pairs: 대화 쌍 목록({"user", "persona"})
+        build: 없을 때 구축할지 여부
+
+    Returns:
+        ReplyIndex | None: 인덱스(대화 쌍이 없거나 build=False인데 없으면 None)
+    """
+    if not pairs:
+        return None
+    key = f"{job_id}:{speaker_name}"
+    cached = _indexes.get(key)
+    if cached is None or cached[0] != len(pairs):
+        if not build:
+            return None
+        cached = (len(pairs), ReplyIndex(pairs))
+        _indexes[key] = cached
+    return cached[1]
+
+
+def clear_reply_index(job_id: str) -> None:
+    """
+    작업의 모든 화자 인덱스를 비웁니다.
+
+    Args:
+        job_id: 작업 ID
+    """
+    prefix = f"{job_id}:"
+    for key in [key for key in _indexes if key.startswith(prefix)]:
+        del _indexes[key]
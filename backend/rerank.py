@@ -0,0 +1,104 @@
+"""
+모듈명: backend.rerank
+설명: RAG 후보 청크 로컬 재정렬 및 중복 제거
+
+주요 기능:
+- 벡터 거리 + 글자 2-gram 어휘 겹침 + 대화 시점(최근일수록 가산) 가중 점수
+- 거리 임계값을 넘는 약한 후보 제외
+- 이미 고른 청크와 거의 같은 청크 제외(2-gram Jaccard)
+
+의존성:
+- 표준 라이브러리만 사용
+"""
+
+# 1. 표준 라이브러리
+from typing import Dict, List, Sequence
+
+# 3. 로컬 애플리케이션
+from backend.response_cache import normalize_message
+
+# 가중 점수 비율(거리, 어휘 겹침, 최근성)
+RERANK_WEIGHT_DISTANCE = 0.6
+RERANK_WEIGHT_LEXICAL = 0.3
+RERANK_WEIGHT_RECENCY = 0.1
+# 날짜 정보가 없는 청크의 최근성 점수
+RERANK_UNKNOWN_RECENCY = 0.5
+
+
+def _bigrams(text: str) -> set:
+    """
+    정규화한 텍스트의 글자 2-gram 집합을 만듭니다(한 글자면 그 글자).
+    """
+    normalized = normalize_message(text)
+    if len(normalized) < 2:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + 2] for i in range(len(normalized) - 1)}
+
+
+def _jaccard(left: set, right: set) -> float:
+    """
+    두 집합의 Jaccard 유사도를 계산합니다.
+    """
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def rerank_chunks(
+    query: str,
+    documents: Sequence[str],
+    distances: Sequence[float | None],
+    days: Sequence[int | None],
+    max_distance: float,
+    half_life_days: float,
+    dedup_threshold: float,
+) -> List[Dict[str, float | str]]:
+    """
+    벡터 검색 후보를 로컬 점수로 재정렬하고 약한 후보/거의 같은 후보를 제외합니다.
+
+    Args:
+        query: 사용자 메시지
+        documents: 후보 청크 텍스트 목록
+        distances: 후보별 벡터 거리(작을수록 가까움, 없으면 None)
+        days: 후보별 마지막 메시지 날짜 서수(없으면 None)
+        max_distance: 이 거리를 넘는 후보는 제외(0이면 거리 0인 후보만 사용)
+        half_life_days: 가장 최근 후보보다 이 일수만큼 오래되면 최근성 점수 절반(0 이하면 최근성 무시)
+        dedup_threshold: 이미 고른 청크와 2-gram Jaccard가 이 값 이상이면 제외
+
+    Returns:
+        List[Dict[str, float | str]]: 점수 내림차순 후보(document, score, distance)
+    """
+    known_days = [day for day in days if day is not None]
+    newest = max(known_days) if known_days else None
+    query_grams = _bigrams(query)
+    candidates = []
+    for document, distance, day in zip(documents, distances, days):
+        if distance is not None and distance > max_distance:
+            continue
+        grams = _bigrams(document)
+        if distance is None or max_distance <= 0:
+            # 거리 기준이 0 이하면 통과한 후보(거리 0)는 모두 최고 점수
+            distance_score = 1.0
+        else:
+            distance_score = max(0.0, 1 - distance / max_distance)
+        lexical = len(query_grams & grams) / len(query_grams) if query_grams else 0.0
+        if day is None or newest is None or half_life_days <= 0:
+            recency = RERANK_UNKNOWN_RECENCY
+        else:
+            recency = 0.5 ** ((newest - day) / half_life_days)
+        score = (
+            RERANK_WEIGHT_DISTANCE * distance_score
+            + RERANK_WEIGHT_LEXICAL * lexical
+            + RERANK_WEIGHT_RECENCY * recency
+        )
+        candidates.append((score, document, distance, grams))
+
+    candidates.sort(key=lambda item: item[0], reverse=True)
+    selected: List[Dict[str, float | str]] = []
+    selected_grams: List[set] = []
+    for score, document, distance, grams in candidates:
+        if any(_jaccard(grams, other) >= dedup_threshold for other in selected_grams):
+            continue
+        selected_grams.append(grams)
+        selected.append({"document": document, "score": round(score, 4), "distance": distance})
+    return selected
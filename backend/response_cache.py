@@ -0,0 +1,227 @@
+"""
+모듈명: backend.response_cache
+설명: 페르소나별 짧은 인사/반응 메시지 응답 캐시(선택 기능)
+
+주요 기능:
+- 메시지 정규화(공백/문장부호 제거, 반복 문자 축약) 키로 조회
+- 임베딩 코사인 유사도 기반 근사 조회(임계값 설정 시)
+- 키마다 여러 후보 응답을 모아 돌아가며 반환(후보가 다 모이기 전에는 모델 호출)
+- 페르소나(작업/화자/모드) 단위 LRU 보관 및 작업 단위 무효화
+
+의존성:
+- 표준 라이브러리만 사용
+"""
+
+# 1. 표준 라이브러리
+import math
+import operator
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+# 3. 로컬 애플리케이션
+from backend.metrics import CHAT_RESPONSE_CACHE, CHAT_RESPONSE_CACHE_SAVED
+
+CHAT_RESPONSE_CACHE_ENABLED = os.getenv("CHAT_RESPONSE_CACHE", "0") == "1"
+CHAT_CACHE_CANDIDATES = int(os.getenv("CHAT_CACHE_CANDIDATES", "3"))
+# 최근 히스토리 메시지 수가 이 값 이하일 때만 사용(대화 초반)
+CHAT_CACHE_MAX_HISTORY = int(os.getenv("CHAT_CACHE_MAX_HISTORY", "2"))
+CHAT_CACHE_MAX_CHARS = int(os.getenv("CHAT_CACHE_MAX_CHARS", "12"))
+# 0이면 정규화 키 일치만 사용
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "0"))
+CHAT_CACHE_MAX_KEYS = int(os.getenv("CHAT_CACHE_MAX_KEYS", "256"))
+
+_SEPARATOR_PATTERN = re.compile(r"[\s\.,!?~…^\-_'\"]+")
+_REPEAT_PATTERN = re.compile(r"(.)\1{2,}")
+
+# 페르소나 범위 -> (정규화 키 -> 항목), 항목 순서는 최근 사용 순
+_scopes: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = {}
+
+
+def cache_scope(job_id: str | None, speaker_name: str | None, mode: str) -> str:
+    """
+    페르소나 단위 캐시 범위 이름을 만듭니다.
+
+    Args:
+        job_id: 작업 ID
+        speaker_name: 화자 이름
+        mode: 스타일 모드
+
+    Returns:
+        str: 캐시 범위 이름
+    """
+    return f"{job_id}:{speaker_name}:{mode}"
+
+
+def normalize_message(text: str) -> str:
+    """
+    공백/문장부호를 지우고 세 번 이상 반복된 문자를 두 번으로 줄입니다.
+
+    예: "ㅋㅋㅋㅋㅋ" -> "ㅋㅋ", "안녕!!" -> "안녕", "잘 자~" -> "잘자"
+
+    Args:
+        text: 사용자 메시지
+
+    Returns:
+        str: 정규화된 키
+    """
+    normalized = _SEPARATOR_PATTERN.sub("", text.lower())
+    return _REPEAT_PATTERN.sub(r"\1\1", normalized)
+
+
+def is_cacheable(message: str, history_length: int) -> bool:
+    """
+    캐시를 적용할 메시지인지 확인합니다(짧은 메시지, 대화 초반).
+
+    Args:
+        message: 사용자 메시지
+        history_length: 최근 히스토리 메시지 수
+
+    Returns:
+        bool: 적용 여부
+    """
+    if not CHAT_RESPONSE_CACHE_ENABLED or history_length > CHAT_CACHE_MAX_HISTORY:
+        return False
+    key = normalize_message(message)
+    return 0 < len(key) <= CHAT_CACHE_MAX_CHARS
+
+
+def _unit(vector: List[float]) -> List[float]:
+    """
+    벡터를 단위 길이로 정규화합니다.
+    """
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _find_entry(
+    entries: "OrderedDict[str, Dict[str, Any]]",
+    key: str,
+    embedding: List[float] | None,
+) -> Tuple[str, Dict[str, Any]] | None:
+    """
+    정규화 키 일치, 없으면 임베딩 유사도 임계값 이상인 가장 가까운 항목을 찾습니다.
+    """
+    entry = entries.get(key)
+    if entry is not None:
+        return key, entry
+    if CHAT_CACHE_SIMILARITY <= 0 or not embedding:
+        return None
+    query = _unit(embedding)
+    best: Tuple[float, str] | None = None
+    for candidate_key, candidate in entries.items():
+        vector = candidate.get("embedding")
+        if not vector or len(vector) != len(query):
+            continue
+        score = sum(map(operator.mul, query, vector))
+        if score >= CHAT_CACHE_SIMILARITY and (best is None or score > best[0]):
+            best = (score, candidate_key)
+    if best is None:
+        return None
+    return best[1], entries[best[1]]
+
+
+def needs_embedding(scope: str, message: str) -> bool:
+    """
+    정규화 키로 적중할 수 없어 유사도 조회용 임베딩이 필요한지 확인합니다.
+
+    Args:
+        scope: 캐시 범위
+        message: 사용자 메시지
+
+    Returns:
+        bool: 임베딩 필요 여부(유사도 조회가 꺼져 있으면 False)
+    """
+    if CHAT_CACHE_SIMILARITY <= 0:
+        return False
+    entry = _scopes.get(scope, {}).get(normalize_message(message))
+    return entry is None or len(entry["replies"]) < CHAT_CACHE_CANDIDATES
+
+
+def lookup_cached_reply(
+    scope: str,
+    message: str,
+    embedding: List[float] | None = None,
+) -> Tuple[str, float] | None:
+    """
+    후보 응답이 모두 모인 키면 다음 차례의 응답을 반환합니다.
+
+    Args:
+        scope: 캐시 범위(cache_scope 결과)
+        message: 사용자 메시지
+        embedding: 메시지 임베딩(유사도 조회용, 선택)
+
+    Returns:
+        Tuple[str, float] | None: (응답, 해당 키의 평균 모델 응답 시간(ms)), 없으면 None
+    """
+    entries = _scopes.get(scope)
+    found = _find_entry(entries, normalize_message(message), embedding) if entries else None
+    if found is None or len(found[1]["replies"]) < CHAT_CACHE_CANDIDATES:
+        CHAT_RESPONSE_CACHE.inc(1, "miss")
+        return None
+    key, entry = found
+    entries.move_to_end(key)
+    reply = entry["replies"][entry["cursor"] % len(entry["replies"])]
+    entry["cursor"] += 1
+    CHAT_RESPONSE_CACHE.inc(1, "hit")
+    return reply, entry["completion_ms"]
+
+
+def store_cached_reply(
+    scope: str,
+    message: str,
+    reply: str,
+    completion_ms: float,
+    embedding: List[float] | None = None,
+) -> None:
+    """
+    모델이 생성한 응답을 후보로 추가합니다(같은 응답/가득 찬 키는 무시).
+
+    Args:
+        scope: 캐시 범위
+        message: 사용자 메시지
+        reply: 모델 응답
+        completion_ms: 모델 응답 완료까지 시간(ms)
+        embedding: 메시지 임베딩(선택)
+    """
+    entries = _scopes.setdefault(scope, OrderedDict())
+    key = normalize_message(message)
+    entry = entries.get(key)
+    if entry is None:
+        entry = {"replies": [], "cursor": 0, "completion_ms": 0.0, "embedding": None}
+        entries[key] = entry
+    entries.move_to_end(key)
+    if embedding and entry["embedding"] is None:
+        entry["embedding"] = _unit(embedding)
+    if reply in entry["replies"] or len(entry["replies"]) >= CHAT_CACHE_CANDIDATES:
+        return
+    count = len(entry["replies"])
+    entry["completion_ms"] = (entry["completion_ms"] * count + completion_ms) / (count + 1)
+    entry["replies"].append(reply)
+    CHAT_RESPONSE_CACHE.inc(1, "store")
+    while len(entries) > CHAT_CACHE_MAX_KEYS:
+        entries.popitem(last=False)
+
+
+def record_cache_saving(saved_ms: float) -> None:
+    """
+    캐시 적중으로 절약한 시간을 기록합니다.
+
+    Args:
+        saved_ms: 모델 평균 응답 시간 - 캐시 응답 시간(ms)
+    """
+    if saved_ms > 0:
+        CHAT_RESPONSE_CACHE_SAVED.inc(saved_ms / 1000)
+
+
+def clear_response_cache(job_id: str) -> None:
+    """
+    작업의 모든 페르소나 캐시를 비웁니다(페르소나 수정 시).
+
+    Args:
+        job_id: 작업 ID
+    """
+    prefix = f"{job_id}:"
+    for scope in [scope for scope in _scopes if scope.startswith(prefix)]:
+        del _scopes[scope]
@@ -0,0 +1,296 @@
+"""
+모듈명: backend.retention
+설명: 작업 보존 기한(TTL) 관리 및 만료 데이터 정리
+
+주요 기능:
+- 작업별 보존 기한 계산(분석 완료/미완료 작업, 마지막 활동 시각 기준)
+- 백그라운드 주기 정리: 만료 작업의 벡터 메모리, 임시 파일, 대화 히스토리, 캐시를 배치 삭제
+- 이 프로세스가 저장했지만 작업 목록에서 사라진 벡터 메모리(선택)와 방치된 업로드 임시 파일 정리
+- 삭제/회수 용량 지표와 상태 제공
+
+의존성:
+- 표준 라이브러리만 사용(벡터 저장소 삭제는 backend.chat)
+"""
+
+# 1. 표준 라이브러리
+import asyncio
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import Any, Dict, List
+
+# 3. 로컬 애플리케이션
+from backend.agent import cancel_job_sessions
+from backend.chat import clear_chat_memory, delete_memory_chunks, memory_job_ids
+from backend.metrics import RETENTION_DELETED, RETENTION_RECLAIMED_BYTES, RETENTION_SWEEP_DURATION
+from backend.quantized_store import disk_bytes, has_vectors
+from backend.reply_index import clear_reply_index
+from backend.response_cache import clear_response_cache
+
+logger = logging.getLogger(__name__)
+
+# 분석 완료 작업 보존 기한(마지막 채팅/가져오기 이후 초, 0이면 무기한)
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", "2592000"))
+# 분석 전/실패/확정 전 작업 보존 기한(0이면 무기한)
+PENDING_JOB_TTL_SECONDS = float(os.getenv("PENDING_JOB_TTL_SECONDS", "86400"))
+# 작업이 참조하지 않는 업로드 임시 파일 보존 기한
+TEMP_FILE_TTL_SECONDS = float(os.getenv("TEMP_FILE_TTL_SECONDS", "86400"))
+RETENTION_SWEEP_INTERVAL_S = float(os.getenv("RETENTION_SWEEP_INTERVAL_S", "600"))
+RETENTION_BATCH_SIZE = max(int(os.getenv("RETENTION_BATCH_SIZE", "50")), 1)
+# 이 프로세스가 저장했지만 작업 목록에 없는 작업의 벡터 메모리 삭제 여부
+# (작업 목록은 메모리에만 있으므로 재시작 전/다른 프로세스의 청크는 대상이 아님)
+RETENTION_DELETE_ORPHANS = os.getenv("RETENTION_DELETE_ORPHANS", "0") == "1"
+
+# 업로드/증분 가져오기 임시 파일 이름: "{작업 ID}_{파일명}", "import_{UUID}_{파일명}"
+TEMP_FILE_PATTERN = re.compile(
+    r"^(import_)?[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}_"
+)
+
+# 이전 정리 때 작업 목록에 없던 작업 ID(두 번 연속 없으면 삭제, 번들 복원 중인 작업 보호)
+_orphan_candidates: set = set()
+_sweeper_task: asyncio.Task | None = None
+_last_sweep: Dict[str, Any] = {}
+_totals: Dict[str, float] = {}
+
+
+def touch_job(job: Dict[str, Any]) -> None:
+    """
+    작업의 마지막 활동 시각을 갱신합니다(보존 기한 기준).
+
+    Args:
+        job: 작업 상태
+    """
+    job["last_active"] = time.time()
+
+
+def job_ttl(job: Dict[str, Any]) -> float:
+    """
+    작업 상태에 맞는 보존 기한(초)을 반환합니다.
+
+    Args:
+        job: 작업 상태
+
+    Returns:
+        float: 보존 기한(0이면 무기한)
+    """
+    return JOB_TTL_SECONDS if job.get("status") == "done" else PENDING_JOB_TTL_SECONDS
+
+
+def is_expired(job: Dict[str, Any], now: float) -> bool:
+    """
+    작업이 보존 기한을 넘었는지 확인합니다(증분 가져오기 중인 작업은 제외).
+
+    Args:
+        job: 작업 상태
+        now: 현재 시각(epoch 초)
+
+    Returns:
+        bool: 만료 여부
+    """
+    ttl = job_ttl(job)
+    if ttl <= 0 or (job.get("last_import") or {}).get("status") == "running":
+        return False
+    return now - job.get("last_active", now) > ttl
+
+
+def _remove_file(path: str) -> int:
+    """
+    파일을 삭제하고 회수한 바이트를 반환합니다(없으면 0).
+    """
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+    except OSError:
+        return 0
+    return size
+
+
+def _purge_job_data(job_ids: List[str], file_paths: List[str]) -> Dict[str, int]:
+    """
+    작업들의 임시 파일과 벡터 메모리를 삭제합니다(스레드 실행용).
+
+    Returns:
+        Dict[str, int]: temp_files/temp_bytes/chunks/vector_bytes
+    """
+    removed = [_remove_file(path) for path in file_paths if path and os.path.exists(path)]
+    vector_bytes = sum(disk_bytes(job_id) for job_id in job_ids if has_vectors(job_id))
+    return {
+        "temp_files": len(removed),
+        "temp_bytes": sum(removed),
+        "chunks": delete_memory_chunks(job_ids),
+        "vector_bytes": vector_bytes,
+    }
+
+
+def _sweep_temp_files(known_paths: set, now: float) -> Dict[str, int]:
+    """
+    작업이 참조하지 않고 보존 기한을 넘은 업로드 임시 파일을 삭제합니다(스레드 실행용).
+
+    Returns:
+        Dict[str, int]: temp_files/temp_bytes
+    """
+    count = 0
+    reclaimed = 0
+    if TEMP_FILE_TTL_SECONDS <= 0:
+        return {"temp_files": 0, "temp_bytes": 0}
+    for entry in os.scandir(tempfile.gettempdir()):
+        if not TEMP_FILE_PATTERN.match(entry.name) or entry.path in known_paths:
+            continue
+        try:
+            if not entry.is_file() or now - entry.stat().st_mtime <= TEMP_FILE_TTL_SECONDS:
+                continue
+        except OSError:
+            continue
+        size = _remove_file(entry.path)
+        if size or not os.path.exists(entry.path):
+            count += 1
+            reclaimed += size
+    return {"temp_files": count, "temp_bytes": reclaimed}
+
+
+def _expire_in_memory(job_id: str, rooms: Dict[str, str]) -> int:
+    """
+    작업의 메모리 상태(대화방 연결, 선제 메시지 예약, 히스토리, 캐시)를 정리합니다.
+
+    Returns:
+        int: 삭제한 대화 세션 수
+    """
+    for fingerprint in [key for key, value in rooms.items() if value == job_id]:
+        del rooms[fingerprint]
+    cancel_job_sessions(job_id)
+    clear_response_cache(job_id)
+    clear_reply_index(job_id)
+    return clear_chat_memory(job_id)
+
+
+async def sweep(
+    jobs: Dict[str, Dict[str, Any]],
+    rooms: Dict[str, str],
+    now: float | None = None,
+) -> Dict[str, Any]:
+    """
+    만료 작업과 고아 데이터를 배치 단위로 정리합니다.
+
+    작업 목록에서 먼저 빼서 새 요청을 막은 뒤, 파일/벡터 삭제는 스레드에서 실행합니다.
+
+    Args:
+        jobs: 작업 저장소(main.jobs)
+        rooms: 대화방 식별자 -> 작업 ID(main.rooms)
+        now: 기준 시각(기본: 현재)
+
+    Returns:
+        Dict[str, Any]: 정리 결과(삭제 수, 회수 바이트, 소요 시간)
+    """
+    now = time.time() if now is None else now
+    started = time.perf_counter()
+    result = {
+        "jobs": 0, "orphan_jobs": 0, "chunks": 0, "temp_files": 0, "chat_sessions": 0,
+        "temp_bytes": 0, "vector_bytes": 0,
+    }
+
+    expired = [job_id for job_id, job in list(jobs.items()) if is_expired(job, now)]
+    for start in range(0, len(expired), RETENTION_BATCH_SIZE):
+        batch = expired[start:start + RETENTION_BATCH_SIZE]
+        file_paths = []
+        for job_id in batch:
+            job = jobs.pop(job_id, None) or {}
+            file_paths.append(job.get("file_path") or "")
+            result["chat_sessions"] += _expire_in_memory(job_id, rooms)
+        purged = await asyncio.to_thread(_purge_job_data, batch, file_paths)
+        result["jobs"] += len(batch)
+        for key, value in purged.items():
+            result[key] += value
+
+    if RETENTION_DELETE_ORPHANS:
+        global _orphan_candidates
+        orphans = memory_job_ids() - set(jobs)
+        confirmed = sorted(orphans & _orphan_candidates)
+        _orphan_candidates = orphans - set(confirmed)
+        for start in range(0, len(confirmed), RETENTION_BATCH_SIZE):
+            batch = confirmed[start:start + RETENTION_BATCH_SIZE]
+            purged = await asyncio.to_thread(_purge_job_data, batch, [])
+            result["orphan_jobs"] += len(batch)
+            result["chunks"] += purged["chunks"]
+            result["vector_bytes"] += purged["vector_bytes"]
+
+    known_paths = {job.get("file_path") for job in list(jobs.values())}
+    for key, value in (await asyncio.to_thread(_sweep_temp_files, known_paths, now)).items():
+        result[key] += value
+
+    elapsed = time.perf_counter() - started
+    RETENTION_SWEEP_DURATION.observe(elapsed)
+    for kind in ("jobs", "orphan_jobs", "chunks", "temp_files", "chat_sessions"):
+        if result[kind]:
+            RETENTION_DELETED.inc(result[kind], kind)
+    for store, key in (("temp", "temp_bytes"), ("vectors", "vector_bytes")):
+        if result[key]:
+            RETENTION_RECLAIMED_BYTES.inc(result[key], store)
+    for key, value in result.items():
+        _totals[key] = _totals.get(key, 0) + value
+    result["duration_ms"] = round(elapsed * 1000, 2)
+    result["finished_at"] = time.time()
+    _last_sweep.clear()
+    _last_sweep.update(result)
+    if any(result[kind] for kind in ("jobs", "orphan_jobs", "chunks", "temp_files")):
+        logger.info("만료 데이터 정리: %s", result)
+    return result
+
+
+async def _sweeper_loop(jobs: Dict[str, Dict[str, Any]], rooms: Dict[str, str]) -> None:
+    """
+    RETENTION_SWEEP_INTERVAL_S마다 만료 데이터를 정리합니다.
+    """
+    while True:
+        await asyncio.sleep(RETENTION_SWEEP_INTERVAL_S)
+        try:
+            await sweep(jobs, rooms)
+        except Exception as e:
+            logger.error("만료 데이터 정리 오류: %s", str(e))
+
+
+def start_retention_sweeper(jobs: Dict[str, Dict[str, Any]], rooms: Dict[str, str]) -> None:
+    """
+    만료 데이터 정리 루프를 시작합니다(이벤트 루프 안에서 호출, 주기가 0이면 시작하지 않음).
+
+    Args:
+        jobs: 작업 저장소
+        rooms: 대화방 식별자 -> 작업 ID
+    """
+    global _sweeper_task
+    if _sweeper_task is not None or RETENTION_SWEEP_INTERVAL_S <= 0:
+        return
+    _sweeper_task = asyncio.create_task(_sweeper_loop(jobs, rooms))
+
+
+async def stop_retention_sweeper() -> None:
+    """
+    만료 데이터 정리 루프를 종료합니다.
+    """
+    global _sweeper_task
+    if _sweeper_task is None:
+        return
+    _sweeper_task.cancel()
+    await asyncio.gather(_sweeper_task, return_exceptions=True)
+    _sweeper_task = None
+
+
+def retention_status() -> Dict[str, Any]:
+    """
+    보존 기한 설정과 마지막/누적 정리 결과를 반환합니다.
+
+    Returns:
+        Dict[str, Any]: settings, last_sweep, totals
+    """
+    return {
+        "settings": {
+            "job_ttl_seconds": JOB_TTL_SECONDS,
+            "pending_job_ttl_seconds": PENDING_JOB_TTL_SECONDS,
+            "temp_file_ttl_seconds": TEMP_FILE_TTL_SECONDS,
+            "sweep_interval_seconds": RETENTION_SWEEP_INTERVAL_S,
+            "delete_orphans": RETENTION_DELETE_ORPHANS,
+        },
+        "last_sweep": dict(_last_sweep),
+        "totals": dict(_totals),
+    }
@@ -33,6 +33,33 @@ export const api = {
       400: apiErrorSchema
     }
   },
+  importExport: {
+    method: "POST" as const,
+    path: "/api/import",
+    // 같은 대화방의 새 내보내기 파일(FormData), 새 메시지만 기존 작업에 반영
+    responses: {
+      200: z.object({ job_id: z.string() }),
+      404: apiErrorSchema,
+      409: apiErrorSchema
+    }
+  },
+  exportBundle: {
+    method: "GET" as const,
+    path: "/api/jobs/:job_id/bundle", // 응답은 번들 바이너리(application/x-lasttalk-bundle)
+    responses: {
+      400: apiErrorSchema,
+      404: apiErrorSchema
+    }
+  },
+  importBundle: {
+    method: "POST" as const,
+    path: "/api/bundles",
+    // 입력은 번들 파일 FormData
+    responses: {
+      200: z.object({ job_id: z.string(), chunks: z.number() }),
+      400: apiErrorSchema
+    }
+  },
   getJob: {
     method: "GET" as const,
     path: "/api/jobs/:job_id",
@@ -95,6 +122,10 @@ export const api = {
       200: agentPollResponseSchema
     }
   },
+  agentStream: {
+    method: "GET" as const,
+    path: "/api/agent/stream", // 쿼리 파라미터: session_id, SSE로 선제 메시지 푸시
+  },
   health: {
     method: "GET" as const,
     path: "/api/health",
@@ -66,7 +66,20 @@ export const jobResponseSchema = z.object({
   report: personaReportSchema.optional(),
   error: z.string().optional(),
   speakers: z.array(z.string()).optional(),
+  speaker_stats: z
+    .record(
+      z.object({
+        messages: z.number(),
+        first_ts: z.string().nullable().optional(),
+        last_ts: z.string().nullable().optional(),
+      }),
+    )
+    .nullable()
+    .optional(),
+  speakers_partial: z.boolean().nullable().optional(),
   selected_speaker: z.string().optional(),
+  analyzed_speakers: z.array(z.string()).optional(),
+  last_import: z.record(z.any()).nullable().optional(),
 });
 export type JobResponse = z.infer<typeof jobResponseSchema>;
 
@@ -78,7 +91,8 @@ export const chatRequestSchema = z.object({
   job_id: z.string(),
   message: z.string(),
   agent_enabled: z.boolean(),
-  style_mode: z.enum(["prompt", "rag", "hybrid"]).optional(),
+  style_mode: z.enum(["prompt", "rag", "hybrid", "retrieve"]).optional(),
+  include_timings: z.boolean().optional(),
 });
 export type ChatRequest = z.infer<typeof chatRequestSchema>;
 
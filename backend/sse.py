@@ -0,0 +1,134 @@
+"""
+모듈명: backend.sse
+설명: SSE 프레임 생성 및 델타 병합(coalescing)
+
+주요 기능:
+- SSE data/주석(하트비트) 프레임 생성
+- 업스트림 델타를 시간 창/바이트 기준으로 묶어 프레임 수 감소
+- 유휴 시 하트비트 신호 발생
+
+의존성:
+- 표준 라이브러리만 사용
+"""
+
+# 1. 표준 라이브러리
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict
+
+# 0이면 델타마다 프레임 전송(기존 동작)
+SSE_COALESCE_MS = float(os.getenv("SSE_COALESCE_MS", "30"))
+SSE_COALESCE_BYTES = int(os.getenv("SSE_COALESCE_BYTES", "512"))
+# 0이면 하트비트 비활성화
+SSE_HEARTBEAT_S = float(os.getenv("SSE_HEARTBEAT_S", "15"))
+
+HEARTBEAT_FRAME = ": keep-alive\n\n"
+
+
+def sse_event(payload: Dict[str, Any]) -> str:
+    """
+    페이로드를 SSE data 프레임으로 직렬화합니다.
+
+    Args:
+        payload: JSON 직렬화할 데이터
+
+    Returns:
+        str: SSE 프레임 문자열
+    """
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def coalesce_deltas(
+    deltas: AsyncIterator[str],
+    window_ms: float | None = None,
+    max_bytes: int | None = None,
+    heartbeat_s: float | None = None,
+) -> AsyncIterator[str | None]:
+    """
+    텍스트 델타를 묶어서 내보냅니다. 유휴 상태가 이어지면 None(하트비트)을 내보냅니다.
+
+    첫 델타는 첫 토큰 지연을 늘리지 않도록 즉시 내보내고, 이후 델타는
+    window_ms 동안 모으거나 max_bytes에 도달하면 한 번에 내보냅니다.
+
+    Args:
+        deltas: 업스트림 텍스트 델타 비동기 이터레이터
+        window_ms: 병합 시간 창(ms, 0이면 병합하지 않음)
+        max_bytes: 병합 최대 바이트(0이면 크기 제한 없음)
+        heartbeat_s: 하트비트 간격(초, 0이면 비활성화)
+
+    Yields:
+        str | None: 병합된 텍스트 또는 하트비트(None)
+    """
+    window = (SSE_COALESCE_MS if window_ms is None else window_ms) / 1000
+    limit = SSE_COALESCE_BYTES if max_bytes is None else max_bytes
+    heartbeat = SSE_HEARTBEAT_S if heartbeat_s is None else heartbeat_s
+
+    if window <= 0 and heartbeat <= 0:
+        async for delta in deltas:
+            yield delta
+        return
+
+    # 델타마다의 비용은 리스트 추가뿐이고, 대기(타임아웃)는 프레임마다 한 번만 발생
+    pending: list[str] = []
+    pending_bytes = 0
+    idle = False
+    finished = False
+    error: BaseException | None = None
+    wake = asyncio.Event()
+
+    async def _pump() -> None:
+        nonlocal pending_bytes, finished, error
+        try:
+            async for delta in deltas:
+                pending.append(delta)
+                pending_bytes += len(delta.encode("utf-8"))
+                if idle or (limit > 0 and pending_bytes >= limit):
+                    wake.set()
+        except Exception as e:
+            error = e
+        finally:
+            finished = True
+            wake.set()
+
+    pump_task = asyncio.create_task(_pump())
+    sent_first = False
+    try:
+        while True:
+            if not pending and not finished:
+                idle = True
+                try:
+                    await asyncio.wait_for(wake.wait(), heartbeat if heartbeat > 0 else None)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                finally:
+                    idle = False
+                    wake.clear()
+            if (
+                pending
+                and sent_first
+                and window > 0
+                and not finished
+                and not (limit > 0 and pending_bytes >= limit)
+            ):
+                try:
+                    await asyncio.wait_for(wake.wait(), window)
+                except asyncio.TimeoutError:
+                    pass
+                wake.clear()
+            if pending:
+                # 첫 델타는 첫 토큰 지연을 늘리지 않도록 즉시 전송
+                sent_first = True
+                text = "".join(pending)
+                pending.clear()
+                pending_bytes = 0
+                yield text
+            elif finished:
+                break
+        if error is not None:
+            raise error
+    finally:
+        # 소비 측이 끊겨도 업스트림 이터레이터의 정리(finally)가 끝나도록 취소 완료까지 대기
+        pump_task.cancel()
+        await asyncio.gather(pump_task, return_exceptions=True)
@@ -0,0 +1,425 @@
+"""
+모듈명: backend.workers
+설명: CPU 집약 작업용 프로세스 풀 관리
+
+주요 기능:
+- 전용 프로세스 풀 생성/종료
+- 파일 파싱/화자 추출을 이벤트 루프 밖에서 실행(본문 없이 화자만 찾는 사전 스캔 포함)
+- 스타일 예시/대화 예시/시그니처 계산을 이벤트 루프 밖에서 실행
+- 전체 화자 일괄 분석(한 번 파싱, 한 번 순회로 화자별 분할)
+- 분석 결과는 파생 데이터만 반환(전체 메시지는 map_reduce 리포트가 필요할 때만 다시 읽음)
+- 같은 대화방의 새 내보내기에서 겹치는 지점 이후 메시지만 파싱(증분 가져오기)
+
+의존성:
+- 표준 라이브러리만 사용
+"""
+
+# 1. 표준 라이브러리
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List
+
+# 2. 로컬 애플리케이션
+from backend.parser import (
+    message_record_hash,
+    parse_kakao_lines,
+    parse_kakao_talk,
+    read_kakao_lines,
+    scan_speakers,
+)
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 0이면 프로세스 풀 대신 기본 스레드 풀에서 실행
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "2"))
+
+# 대화방 식별에 쓰는 앞쪽 메시지 수, 겹치는 지점 확인에 쓰는 마지막 메시지 수
+IMPORT_HEAD_MESSAGES = 20
+IMPORT_TAIL_MESSAGES = 8
+# 이전 마지막 메시지 위치 앞쪽으로 먼저 탐색할 줄 수(찾지 못하면 전체 탐색)
+IMPORT_WINDOW_LINES = 500
+# 화자별로 보관할 실제 대화 쌍 수(retrieve 모드 검색 대상, 최근 것 우선)
+REPLY_PAIRS_MAX = int(os.getenv("REPLY_PAIRS_MAX", "5000"))
+DIALOG_EXAMPLE_COUNT = 3
+# 0보다 크면 이 값의 두 배보다 큰 업로드는 앞/뒤 이 바이트만 사전 스캔(전체 파싱 후 화자 목록 보정)
+SPEAKER_SCAN_SAMPLE_BYTES = int(os.getenv("SPEAKER_SCAN_SAMPLE_BYTES", "0"))
+
+_process_pool: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor | None:
+    """
+    CPU 작업 전용 프로세스 풀을 생성하거나 반환합니다.
+
+    Returns:
+        ProcessPoolExecutor | None: 프로세스 풀(비활성화 시 None)
+    """
+    global _process_pool
+    if WORKER_PROCESSES <= 0:
+        return None
+    if _process_pool is None:
+        # 서버 스레드 상태를 복제하지 않도록 spawn 방식 사용
+        _process_pool = ProcessPoolExecutor(
+            max_workers=WORKER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info("프로세스 풀 생성: 워커 %s개", WORKER_PROCESSES)
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """
+    프로세스 풀을 종료합니다.
+    """
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+        logger.info("프로세스 풀 종료")
+
+
+async def run_cpu_bound(func: Callable, *args, **kwargs) -> Any:
+    """
+    CPU 집약 함수를 프로세스 풀에서 실행합니다.
+
+    Args:
+        func: 모듈 최상위에 정의된(피클 가능한) 함수
+        *args: 위치 인자
+        **kwargs: 키워드 인자
+
+    Returns:
+        Any: 함수 반환값
+    """
+    pool = get_process_pool()
+    if pool is None:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, partial(func, *args, **kwargs))
+
+
+def extract_speakers(messages: List[Dict]) -> List[str]:
+    """
+    메시지 목록에서 화자 목록을 추출합니다.
+
+    Args:
+        messages: 파싱된 메시지 목록
+
+    Returns:
+        List[str]: 정렬된 화자 목록
+    """
+    speakers = {m.get("speaker") for m in messages if m.get("speaker")}
+    return sorted(speakers)
+
+
+def extract_speaker_stats(messages: List[Dict]) -> Dict[str, Dict[str, Any]]:
+    """
+    화자별 메시지 수와 첫/마지막 메시지 시각을 계산합니다.
+
+    Args:
+        messages: 파싱된 메시지 목록(시간순)
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 화자 -> messages/first_ts/last_ts
+    """
+    stats: Dict[str, Dict[str, Any]] = {}
+    for message in messages:
+        speaker = message.get("speaker")
+        if not speaker:
+            continue
+        entry = stats.get(speaker)
+        if entry is None:
+            stats[speaker] = {"messages": 1, "first_ts": message["ts"], "last_ts": message["ts"]}
+        else:
+            entry["messages"] += 1
+            entry["last_ts"] = message["ts"]
+    return stats
+
+
+def scan_upload(file_path: str) -> Dict[str, Any]:
+    """
+    업로드 파일에서 화자 목록과 화자별 메시지 수만 빠르게 추출합니다(워커 프로세스용).
+
+    Args:
+        file_path: 대화 내보내기 파일 경로
+
+    Returns:
+        Dict[str, Any]: speakers, speaker_stats, sampled(앞/뒤 표본만 스캔했는지)
+    """
+    return scan_speakers(file_path, SPEAKER_SCAN_SAMPLE_BYTES)
+
+
+def parse_upload(file_path: str) -> Dict[str, Any]:
+    """
+    업로드 파일을 파싱해 화자 목록과 증분 가져오기 상태를 반환합니다(워커 프로세스용).
+
+    Args:
+        file_path: 대화 내보내기 파일 경로
+
+    Returns:
+        Dict[str, Any]: 메시지 수, 마지막 메시지까지의 라인 수, 화자 목록/통계, 가져오기 상태
+    """
+    messages = parse_kakao_talk(file_path)
+    return {
+        "message_count": len(messages),
+        "line_count": messages[-1]["line_no"] + 1 if messages else 0,
+        "speakers": extract_speakers(messages),
+        "speaker_stats": extract_speaker_stats(messages),
+        "import_state": build_import_state(messages),
+    }
+
+
+def room_fingerprint(messages: List[Dict]) -> str:
+    """
+    앞쪽 메시지 레코드 해시로 대화방 식별자를 계산합니다.
+
+    Args:
+        messages: 시간순 메시지 목록(앞쪽 IMPORT_HEAD_MESSAGES개 이상이면 충분)
+
+    Returns:
+        str: 대화방 식별 해시
+    """
+    digest = hashlib.sha1()
+    for message in messages[:IMPORT_HEAD_MESSAGES]:
+        digest.update(message_record_hash(message).encode("ascii"))
+    return digest.hexdigest()
+
+
+def build_import_state(messages: List[Dict]) -> Dict[str, Any]:
+    """
+    다음 증분 가져오기에 필요한 상태(대화방 식별자, 마지막 메시지 해시, 마지막 줄 번호)를 만듭니다.
+
+    Args:
+        messages: 시간순 메시지 목록
+
+    Returns:
+        Dict[str, Any]: 증분 가져오기 상태
+    """
+    return {
+        "fingerprint": room_fingerprint(messages),
+        "tail_hashes": [message_record_hash(m) for m in messages[-IMPORT_TAIL_MESSAGES:]],
+        "last_line_no": messages[-1]["line_no"] if messages else 0,
+    }
+
+
+def read_room_fingerprint(file_path: str) -> str:
+    """
+    파일 앞부분만 파싱해 대화방 식별자를 계산합니다(워커 프로세스용).
+
+    Args:
+        file_path: 대화 내보내기 파일 경로
+
+    Returns:
+        str: 대화방 식별 해시
+    """
+    lines = read_kakao_lines(file_path)
+    return room_fingerprint(parse_kakao_lines(lines, limit=IMPORT_HEAD_MESSAGES))
+
+
+def _find_overlap(messages: List[Dict], tail_hashes: List[str]) -> int | None:
+    """
+    이전 내보내기의 마지막 메시지들과 해시가 연속으로 일치하는 위치(마지막 일치 인덱스)를 찾습니다.
+    """
+    if not tail_hashes:
+        return None
+    size = len(tail_hashes)
+    hashes = [message_record_hash(m) for m in messages]
+    for index in range(size - 1, len(hashes)):
+        if hashes[index] == tail_hashes[-1] and hashes[index - size + 1:index + 1] == tail_hashes:
+            return index
+    return None
+
+
+def parse_incremental(file_path: str, import_state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    같은 대화방의 새 내보내기에서 이전 내보내기 이후 메시지만 파싱합니다(워커 프로세스용).
+
+    이전 마지막 메시지 위치 근처부터 파싱해 마지막 메시지 해시가 연속으로 일치하는 지점을 찾고,
+    그 뒤의 메시지만 반환합니다. 근처에서 찾지 못하면 전체를 파싱해 다시 찾습니다.
+
+    Args:
+        file_path: 새 내보내기 파일 경로
+        import_state: 이전 가져오기 상태(build_import_state 결과)
+
+    Returns:
+        Dict[str, Any]: new_messages, style_states(화자별 집계 상태), speakers,
+            reply_pairs(화자별 새 대화 쌍), import_state, full_scan
+
+    Raises:
+        ValueError: 다른 대화방이거나 겹치는 지점을 찾지 못했을 때
+    """
+    from backend.chat import build_style_state, extract_dialog_examples_by_speaker
+
+    lines = read_kakao_lines(file_path)
+    head = parse_kakao_lines(lines, limit=IMPORT_HEAD_MESSAGES)
+    if room_fingerprint(head) != import_state["fingerprint"]:
+        raise ValueError("다른 대화방의 내보내기 파일입니다")
+
+    tail_hashes = import_state["tail_hashes"]
+    start_line = max(import_state["last_line_no"] - IMPORT_WINDOW_LINES, 0)
+    messages = parse_kakao_lines(lines, start_line)
+    overlap = _find_overlap(messages, tail_hashes)
+    full_scan = False
+    if overlap is None and start_line > 0:
+        full_scan = True
+        messages = parse_kakao_lines(lines)
+        overlap = _find_overlap(messages, tail_hashes)
+    if overlap is None:
+        raise ValueError("이전 내보내기와 겹치는 구간을 찾지 못했습니다")
+
+    new_messages = messages[overlap + 1:]
+    by_speaker: Dict[str, List[Dict]] = {}
+    for message in new_messages:
+        by_speaker.setdefault(message.get("speaker"), []).append(message)
+    state = build_import_state(messages)
+    state["fingerprint"] = import_state["fingerprint"]
+    return {
+        "new_messages": new_messages,
+        "style_states": {
+            speaker: build_style_state(speaker_messages)
+            for speaker, speaker_messages in by_speaker.items()
+            if speaker
+        },
+        "speakers": extract_speakers(new_messages),
+        # 이전 마지막 메시지에 대한 답장부터 포함
+        "reply_pairs": extract_dialog_examples_by_speaker(messages[overlap:], None),
+        "import_state": state,
+        "full_scan": full_scan,
+    }
+
+
+def _build_speaker_analysis(
+    messages: List[Dict],
+    target_speaker: str,
+    target_indices: List[int],
+    reply_pairs: List[Dict[str, str]],
+    timing_profile: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    한 화자의 스타일 분석 결과를 계산합니다(워커 프로세스용).
+    """
+    # 워커 프로세스에서만 필요한 모듈이므로 지연 임포트
+    from backend.chat import (
+        build_fallback_summary,
+        build_style_state,
+        extract_style_examples,
+        select_report_messages,
+        select_representative_messages,
+        style_artifacts_from_state,
+    )
+
+    target_messages = [messages[idx] for idx in target_indices]
+    style_state = build_style_state(target_messages)
+    artifacts = style_artifacts_from_state(style_state)
+    # 전체 메시지 목록은 부모 프로세스로 피클링하면 비용이 커서 파생 데이터만 반환
+    return {
+        "message_count": len(target_messages),
+        "report_messages": select_report_messages(target_messages),
+        "fallback_summary": build_fallback_summary(target_messages),
+        "style_examples": extract_style_examples(target_messages, 5),
+        "dialog_examples": reply_pairs[:DIALOG_EXAMPLE_COUNT],
+        "reply_pairs": reply_pairs[-REPLY_PAIRS_MAX:] if REPLY_PAIRS_MAX > 0 else [],
+        "style_signature": artifacts["style_signature"],
+        "local_keywords": artifacts["local_keywords"],
+        "common_phrases": artifacts["common_phrases"],
+        "persona_sample": select_representative_messages(
+            messages,
+            target_speaker,
+            stats=artifacts["keyword_stats"],
+            target_indices=target_indices,
+        ),
+        "timing_profile": timing_profile,
+        "style_state": style_state,
+    }
+
+
+def analyze_speaker(file_path: str, target_speaker: str) -> Dict[str, Any]:
+    """
+    선택된 화자의 스타일 분석 결과를 계산합니다(워커 프로세스용).
+
+    Args:
+        file_path: 대화 내보내기 파일 경로
+        target_speaker: 분석 대상 화자 이름
+
+    Returns:
+        Dict[str, Any]: 메시지 수, 리포트용 메시지(map_reduce 모드는 None) 및 스타일 분석 결과
+    """
+    from backend.chat import build_timing_profile, extract_dialog_examples
+
+    messages = parse_kakao_talk(file_path)
+    target_indices = [
+        idx for idx, m in enumerate(messages) if m.get("speaker") == target_speaker
+    ]
+    if not target_indices:
+        return {"message_count": 0}
+    return _build_speaker_analysis(
+        messages,
+        target_speaker,
+        target_indices,
+        extract_dialog_examples(messages, target_speaker, None),
+        build_timing_profile(messages, target_speaker),
+    )
+
+
+def read_messages_by_speaker(
+    file_path: str,
+    speakers: List[str] | None = None,
+) -> Dict[str, List[Dict]]:
+    """
+    파일을 파싱해 화자별 메시지 목록으로 나눕니다(map_reduce 리포트용, 스레드 실행용).
+
+    Args:
+        file_path: 대화 내보내기 파일 경로
+        speakers: 남길 화자 목록(없으면 전체)
+
+    Returns:
+        Dict[str, List[Dict]]: 화자 -> 시간순 메시지 목록
+    """
+    wanted = set(speakers) if speakers is not None else None
+    by_speaker: Dict[str, List[Dict]] = {}
+    for message in parse_kakao_talk(file_path):
+        speaker = message.get("speaker")
+        if speaker and (wanted is None or speaker in wanted):
+            by_speaker.setdefault(speaker, []).append(message)
+    return by_speaker
+
+
+def analyze_all_speakers(file_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    파일을 한 번 파싱하고 한 번의 순회로 화자별 메시지를 나눠 모든 화자를 분석합니다(워커 프로세스용).
+
+    Args:
+        file_path: 대화 내보내기 파일 경로
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 화자별 분석 결과(메시지 수 내림차순)
+    """
+    from backend.chat import build_timing_profiles, extract_dialog_examples_by_speaker
+
+    messages = parse_kakao_talk(file_path)
+    indices_by_speaker: Dict[str, List[int]] = {}
+    for idx, message in enumerate(messages):
+        speaker = message.get("speaker")
+        if speaker:
+            indices_by_speaker.setdefault(speaker, []).append(idx)
+    reply_pairs = extract_dialog_examples_by_speaker(messages, None)
+    timing_profiles = build_timing_profiles(messages)
+    ordered = sorted(indices_by_speaker.items(), key=lambda item: -len(item[1]))
+    return {
+        speaker: _build_speaker_analysis(
+            messages,
+            speaker,
+            target_indices,
+            reply_pairs.get(speaker, []),
+            timing_profiles.get(speaker) or {
+                "active_hours": [0] * 24,
+                "reinitiate_gap_seconds": None,
+            },
+        )
+        for speaker, target_indices in ordered
+    }
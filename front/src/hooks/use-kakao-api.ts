@@ -7,7 +7,7 @@ import {
   type Settings,
   type AgentPollResponse
 } from "@shared/schema";
-import { useState, useCallback, useRef } from "react";
+import { useState, useCallback, useEffect, useRef } from "react";
 
 // 파일 업로드 훅
 export function useUploadFile() {
@@ -58,12 +58,12 @@ export function useJobStatus(jobId: string | null, forcePolling: boolean = false
     refetchInterval: (query) => {
       const data = query.state.data;
       if (!data) return 1000;
-      // 완료 또는 오류 상태면 폴링 중지
+      // 완료 또는 오류 상태면 폴링 중지(표본 스캔 화자 목록은 전체 파싱으로 보정될 때까지 폴링)
       if (
         !forcePolling && (
           data.status === "done" ||
           data.status === "error" ||
-          data.status === "awaiting_selection"
+          (data.status === "awaiting_selection" && !data.speakers_partial)
         )
       ) {
           return false;
@@ -144,6 +144,10 @@ const normalizeJobResponse = (raw: unknown, jobId: string | null): JobResponse =
     selected_speaker: typeof data.selected_speaker === "string"
       ? data.selected_speaker
       : undefined,
+    speaker_stats: data.speaker_stats && typeof data.speaker_stats === "object"
+      ? (data.speaker_stats as JobResponse["speaker_stats"])
+      : undefined,
+    speakers_partial: data.speakers_partial === true,
   };
 };
 
@@ -209,17 +213,26 @@ export function useSettings() {
   return { ...query, update: mutation };
 }
 
-// 에이전트 폴링 훅
-export function useAgentPoll(sessionId: string) {
-  return useQuery({
-    queryKey: ["agent-poll", sessionId],
-    queryFn: async () => {
-      const res = await fetch(`${api.agentPoll.path}?session_id=${sessionId}`);
-      if (!res.ok) throw new Error("폴링 실패");
-      return api.agentPoll.responses[200].parse(await res.json());
-    },
-    refetchInterval: 3000, // 3초마다 폴링
-  });
+// 에이전트 선제 메시지 구독 훅(SSE)
+export function useAgentStream(sessionId: string, onMessage: (message: string) => void) {
+  const onMessageRef = useRef(onMessage);
+  onMessageRef.current = onMessage;
+
+  useEffect(() => {
+    // 폴링 대신 SSE 구독(연결이 끊기면 EventSource가 자동 재연결)
+    const source = new EventSource(`${api.agentStream.path}?session_id=${sessionId}`);
+    source.onmessage = (event) => {
+      try {
+        const parsed = JSON.parse(event.data);
+        if (typeof parsed?.message === "string" && parsed.message) {
+          onMessageRef.current(parsed.message);
+        }
+      } catch {
+        // 잘못된 프레임은 무시
+      }
+    };
+    return () => source.close();
+  }, [sessionId]);
 }
 
 // 채팅 스트리밍 훅(POST + ReadableStream)
@@ -244,21 +257,35 @@ export function useChatStream() {
         signal: abortControllerRef.current.signal,
       });
 
+      // 같은 세션의 새 요청으로 대체된 경우 조용히 종료
+      if (res.status === 409) return;
+      if (res.status === 429) {
+        const retryAfter = res.headers.get("Retry-After");
+        throw new Error(
+          `요청이 많습니다. ${retryAfter ? `${retryAfter}초 후` : "잠시 후"} 다시 시도하세요`
+        );
+      }
       if (!res.ok) throw new Error(res.statusText);
       if (!res.body) throw new Error("응답 본문이 없습니다");
 
       const reader = res.body.getReader();
       const decoder = new TextDecoder();
+      let pending = "";
 
       while (true) {
         const { done, value } = await reader.read();
         if (done) break;
         
-        const chunk = decoder.decode(value, { stream: true });
         // 백엔드가 SSE 형식("data: ...")을 보낼 수 있으므로 파싱 처리
-        
-        const lines = chunk.split("\n");
+        // 병합된 프레임이 읽기 경계에서 잘릴 수 있어 마지막 미완성 줄은 다음 읽기로 넘김
+        pending += decoder.decode(value, { stream: true });
+        const lines = pending.split("\n");
+        pending = lines.pop() ?? "";
         for (const line of lines) {
+            if (line.startsWith(":")) {
+                // 하트비트 주석 프레임 무시
+                continue;
+            }
             if (line.startsWith("data: ")) {
                 const content = line.slice(6);
                 // [DONE] 처리
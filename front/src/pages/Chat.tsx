@@ -1,6 +1,6 @@
 import { useState, useRef, useEffect } from "react";
 import { useRoute } from "wouter";
-import { useChatStream, useAgentPoll, useJobStatus } from "@/hooks/use-kakao-api";
+import { useChatStream, useAgentStream, useJobStatus } from "@/hooks/use-kakao-api";
 import { Layout } from "@/components/Layout";
 import { ChatBubble } from "@/components/ChatBubble";
 import { Input } from "@/components/ui/input";
@@ -19,14 +19,13 @@ export default function Chat() {
   const [match, params] = useRoute("/chat/:jobId");
   const jobId = params?.jobId || "demo";
   const [sessionId] = useState(() => uuidv4());
-  const [styleMode, setStyleMode] = useState<"prompt" | "rag" | "hybrid">("hybrid");
+  const [styleMode, setStyleMode] = useState<"prompt" | "rag" | "hybrid" | "retrieve">("hybrid");
   
   const [input, setInput] = useState("");
   const [messages, setMessages] = useState<Message[]>([]);
   const scrollRef = useRef<HTMLDivElement>(null);
   
   const { sendMessage, isLoading: isStreaming } = useChatStream();
-  const { data: agentPoll } = useAgentPoll(sessionId);
   const { data: job } = useJobStatus(jobId);
   const personaName = job?.selected_speaker || "페르소나";
 
@@ -37,12 +36,8 @@ export default function Chat() {
     }
   }, [messages, isStreaming]);
 
-  // 에이전트 폴링 메시지 처리(선제 메시지)
-  useEffect(() => {
-    if (agentPoll?.should_send && agentPoll.message) {
-        addMessage(agentPoll.message, false);
-    }
-  }, [agentPoll]);
+  // 에이전트 선제 메시지 처리(SSE 푸시)
+  useAgentStream(sessionId, (message) => addMessage(message, false));
 
   const addMessage = (text: string, isUser: boolean) => {
     setMessages(prev => [...prev, {
@@ -131,12 +126,13 @@ export default function Chat() {
                 {[
                     { key: "prompt", label: "프롬프트" },
                     { key: "rag", label: "RAG" },
-                    { key: "hybrid", label: "혼합" }
+                    { key: "hybrid", label: "혼합" },
+                    { key: "retrieve", label: "실제 답장" }
                 ].map((item) => (
                     <button
                         key={item.key}
                         type="button"
-                        onClick={() => setStyleMode(item.key as "prompt" | "rag" | "hybrid")}
+                        onClick={() => setStyleMode(item.key as "prompt" | "rag" | "hybrid" | "retrieve")}
                         aria-pressed={styleMode === item.key}
                         className={`text-[11px] px-2 py-1 rounded-full border transition ${
                             styleMode === item.key
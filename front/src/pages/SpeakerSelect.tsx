@@ -62,6 +62,7 @@ export default function SpeakerSelect() {
   }
 
   const speakers = job?.speakers ?? [];
+  const speakerStats = job?.speaker_stats ?? {};
 
   const handleStart = () => {
     if (!jobId || !selected || analysisRequested) return;
@@ -112,7 +113,15 @@ export default function SpeakerSelect() {
               }`}
             >
               <span className="absolute left-0 top-0 h-full w-1 rounded-l-xl bg-kakao-brown/80" style={{ opacity: selected === speaker ? 1 : 0 }} />
-              <span className="pl-2">{speaker}</span>
+              <span className="pl-2 flex flex-col">
+                <span>{speaker}</span>
+                {speakerStats[speaker] && (
+                  <span className="text-xs font-normal text-slate-500">
+                    메시지 {speakerStats[speaker].messages.toLocaleString()}개
+                    {job?.speakers_partial ? "+" : ""}
+                  </span>
+                )}
+              </span>
               <CheckCircle2 className={`w-4 h-4 ${selected === speaker ? "text-kakao-brown" : "text-transparent"}`} />
             </button>
           ))}